@@ -1,10 +1,47 @@
-from flask import Flask, request, jsonify
+import time
+_inicio_carga = time.perf_counter()
+
+from flask import Flask, Response, request, jsonify, make_response, stream_with_context, g, has_request_context
+from flask.json.provider import DefaultJSONProvider
 import numpy as np
-import sympy as sp
+import os
 import re
-from sympy.parsing.latex import parse_latex
-from sympy import symbols
-from sympy.utilities.lambdify import lambdify
+import json
+import struct
+import ast
+import threading
+import hashlib
+import hmac
+import importlib.metadata
+import inspect
+import shutil
+import tempfile
+import bisect
+import math
+import multiprocessing
+from collections import OrderedDict
+from types import SimpleNamespace
+from fractions import Fraction
+from functools import lru_cache, reduce, wraps
+from contextlib import contextmanager
+from math import gcd, lcm
+from multiprocessing import shared_memory
+import multiprocessing.connection
+import signal
+
+# Codificadores opcionales para las respuestas binarias y compactas
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Tiempos de arranque en segundos, visibles en GET /arranque
+TIEMPOS_ARRANQUE = {"importacion_base": time.perf_counter() - _inicio_carga}
+
 # Configuración para permitir consultas de cualquier origen (CORS)
 
 app = Flask(__name__)
@@ -19,228 +56,2213 @@ def after_request(response):
 def home():
     return 'API de Métodos Numéricos para Integración'
 
-# Función para evaluar expresiones LaTeX de forma general
-# Esta función no depende de casos específicos, sino que utiliza
-# el poder del módulo sympy para convertir cualquier expresión LaTeX válida
 
-# Función para evaluar expresiones matemáticas de forma segura
-def evaluar_funcion(funcion, x, formato="python"):
+# Instrumentación de las rutas de integración
+# Cada petición acumula en flask.g el tiempo de sus fases (importación de
+# sympy, parseo del LaTeX, lambdify, caché en disco, evaluación vectorizada,
+# reintentos escalares, evaluación simbólica con subs().evalf() y
+# serialización) y cuántas veces se evaluó la función. El desglose se envía en
+# la cabecera Server-Timing y se agrega en histogramas y contadores que
+# GET /metricas expone en el formato de texto de Prometheus.
+RUTAS_INSTRUMENTADAS = (
+    "/trapecio", "/boole", "/simpson38", "/simpson13", "/simpson_abierto", "/newton_cotes",
+    "/adaptativo", "/gauss_legendre", "/romberg", "/comparar", "/lote"
+)
+LIMITES_SEGUNDOS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+LIMITES_EVALUACIONES = (1, 10, 100, 1000, 10_000, 100_000, 1_000_000, 10_000_000)
+
+
+class Histograma:
+    def __init__(self, limites):
+        self.limites = limites
+        self.cuentas = [0] * (len(limites) + 1)
+        self.suma = 0.0
+        self.total = 0
+
+    def observar(self, valor):
+        self.cuentas[bisect.bisect_left(self.limites, valor)] += 1
+        self.suma += valor
+        self.total += 1
+
+    def lineas(self, nombre, etiquetas):
+        acumulado = 0
+        for limite, cuenta in zip(self.limites + ("+Inf",), self.cuentas):
+            acumulado += cuenta
+            yield f'{nombre}_bucket{{{etiquetas},le="{limite}"}} {acumulado}'
+        yield f"{nombre}_sum{{{etiquetas}}} {self.suma!r}"
+        yield f"{nombre}_count{{{etiquetas}}} {self.total}"
+
+
+class Metricas:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.peticiones = {}
+        self.latencia = {}
+        self.fases = {}
+        self.evaluaciones = {}
+        self.respaldos = {}
+
+    def registrar(self, ruta, metodo, estado, duracion, fases, evaluaciones, respaldos):
+        with self._lock:
+            clave = (ruta, metodo, estado)
+            self.peticiones[clave] = self.peticiones.get(clave, 0) + 1
+            self.latencia.setdefault(ruta, Histograma(LIMITES_SEGUNDOS)).observar(duracion)
+            for fase, segundos in fases.items():
+                self.fases.setdefault((ruta, fase), Histograma(LIMITES_SEGUNDOS)).observar(segundos)
+            self.evaluaciones.setdefault(ruta, Histograma(LIMITES_EVALUACIONES)).observar(evaluaciones)
+            for tipo, cantidad in respaldos.items():
+                self.respaldos[(ruta, tipo)] = self.respaldos.get((ruta, tipo), 0) + cantidad
+
+    def texto(self):
+        with self._lock:
+            lineas = [
+                "# HELP integracion_peticiones_total Peticiones atendidas por ruta, método HTTP y código de estado.",
+                "# TYPE integracion_peticiones_total counter"
+            ]
+            for (ruta, metodo, estado), cuenta in sorted(self.peticiones.items()):
+                lineas.append(f'integracion_peticiones_total{{ruta="{ruta}",metodo="{metodo}",estado="{estado}"}} {cuenta}')
+            lineas += [
+                "# HELP integracion_latencia_segundos Duración total de la petición.",
+                "# TYPE integracion_latencia_segundos histogram"
+            ]
+            for ruta, histograma in sorted(self.latencia.items()):
+                lineas.extend(histograma.lineas("integracion_latencia_segundos", f'ruta="{ruta}"'))
+            lineas += [
+                "# HELP integracion_fase_segundos Tiempo de cada fase dentro de la petición.",
+                "# TYPE integracion_fase_segundos histogram"
+            ]
+            for (ruta, fase), histograma in sorted(self.fases.items()):
+                lineas.extend(histograma.lineas("integracion_fase_segundos", f'ruta="{ruta}",fase="{fase}"'))
+            lineas += [
+                "# HELP integracion_evaluaciones Evaluaciones de la función por petición.",
+                "# TYPE integracion_evaluaciones histogram"
+            ]
+            for ruta, histograma in sorted(self.evaluaciones.items()):
+                lineas.extend(histograma.lineas("integracion_evaluaciones", f'ruta="{ruta}"'))
+            lineas += [
+                "# HELP integracion_respaldos_total Puntos que necesitaron evaluación escalar o simbólica.",
+                "# TYPE integracion_respaldos_total counter"
+            ]
+            for (ruta, tipo), cuenta in sorted(self.respaldos.items()):
+                lineas.append(f'integracion_respaldos_total{{ruta="{ruta}",tipo="{tipo}"}} {cuenta}')
+            return "\n".join(lineas) + "\n"
+
+
+metricas = Metricas()
+
+
+# Fuera de una petición (en los trabajadores de evaluación) las mediciones se
+# acumulan en el objeto de este hilo y se devuelven al proceso principal
+_medicion_local = threading.local()
+
+
+def medicion_actual():
+    if has_request_context():
+        # El objeto real y no el proxy, para poder usarlo desde otros hilos
+        return g._get_current_object() if "fases" in g else None
+    return getattr(_medicion_local, "medicion", None)
+
+
+def instrumentando():
+    return medicion_actual() is not None
+
+
+@contextmanager
+def medir(fase):
+    medicion = medicion_actual()
+    if medicion is None:
+        yield
+        return
+    inicio = time.perf_counter()
+    try:
+        yield
+    finally:
+        medicion.fases[fase] = medicion.fases.get(fase, 0.0) + time.perf_counter() - inicio
+
+
+def contar_evaluaciones(cantidad):
+    medicion = medicion_actual()
+    if medicion is not None:
+        medicion.evaluaciones += cantidad
+        progreso = getattr(medicion, "progreso", None)
+        if progreso is not None:
+            # En un trabajador: el proceso principal lo lee aunque tenga que terminarlo
+            progreso.value = medicion.evaluaciones
+
+
+def contar_respaldo(tipo, cantidad=1):
+    medicion = medicion_actual()
+    if cantidad and medicion is not None:
+        medicion.respaldos[tipo] = medicion.respaldos.get(tipo, 0) + cantidad
+
+
+def instantanea_medicion():
+    # Contadores actuales, para descartar una evaluación cuyos valores no se usan
+    medicion = medicion_actual()
+    if medicion is None:
+        return None
+    return medicion.evaluaciones, dict(medicion.respaldos)
+
+
+def restaurar_medicion(instantanea):
+    medicion = medicion_actual()
+    if medicion is None or instantanea is None:
+        return
+    medicion.evaluaciones, respaldos = instantanea
+    medicion.respaldos.clear()
+    medicion.respaldos.update(respaldos)
+
+
+def ruta_peticion():
+    return request.url_rule.rule if request.url_rule is not None else None
+
+
+@app.before_request
+def iniciar_medicion():
+    if ruta_peticion() in RUTAS_INSTRUMENTADAS:
+        g.inicio_peticion = time.perf_counter()
+        g.fases = {}
+        g.evaluaciones = 0
+        g.respaldos = {}
+        return iniciar_presupuesto()
+
+
+def iniciar_presupuesto():
+    datos = request.get_json(silent=True) if request.method == 'POST' else request.args
+    segundos = TIEMPO_MAXIMO_PETICION
+    pedido = datos.get('tiempo_limite') if isinstance(datos, dict) else None
+    if pedido is not None:
+        try:
+            pedido = float(pedido)
+        except (TypeError, ValueError):
+            pedido = 0
+        if not pedido > 0:
+            return jsonify({"error": "El parámetro 'tiempo_limite' debe ser un número positivo de segundos"}), 400
+        segundos = min(segundos, pedido)
+    g.presupuesto = Presupuesto(segundos, MAX_EVALUACIONES_PETICION)
+
+
+@app.after_request
+def cabecera_server_timing(response):
+    if instrumentando():
+        g.estado = response.status_code
+        total = time.perf_counter() - g.inicio_peticion
+        partes = [f"{fase};dur={segundos * 1000:.3f}" for fase, segundos in g.fases.items()]
+        partes.append(f"total;dur={total * 1000:.3f}")
+        partes.append(f'evaluaciones;desc="{g.evaluaciones}"')
+        response.headers["Server-Timing"] = ", ".join(partes)
+        response.headers["Timing-Allow-Origin"] = "*"
+    return response
+
+
+@app.teardown_request
+def registrar_medicion(error=None):
+    # En las respuestas en streaming se ejecuta al terminar de enviar el cuerpo,
+    # así que las métricas incluyen también la evaluación de los bloques
+    if instrumentando():
+        metricas.registrar(ruta_peticion(), request.method, g.get("estado", 500),
+                           time.perf_counter() - g.inicio_peticion, g.fases, g.evaluaciones, g.respaldos)
+
+
+class ProveedorJSONMedido(DefaultJSONProvider):
+    def response(self, *args, **kwargs):
+        with medir("serializacion"):
+            return super().response(*args, **kwargs)
+
+
+app.json = ProveedorJSONMedido(app)
+
+
+# Presupuesto por petición
+# Cada petición de integración tiene un tiempo máximo (TIEMPO_MAXIMO_PETICION,
+# que el cliente puede reducir con 'tiempo_limite') y un máximo de
+# evaluaciones de la función (MAX_EVALUACIONES_PETICION). Al vencer el plazo la
+# petición responde 408; con un 'tiempo_limite' propio la evaluación corre en
+# un proceso trabajador que se termina en ese momento (ver "Evaluación aislada"). Superar el máximo de evaluaciones o
+# el n máximo del método responde 422.
+TIEMPO_MAXIMO_PETICION = float(os.environ.get("TIEMPO_MAXIMO_PETICION", 30))
+MAX_EVALUACIONES_PETICION = int(os.environ.get("MAX_EVALUACIONES_PETICION", 20_000_000))
+# Puntos evaluados entre dos comprobaciones en los niveles punto a punto
+PUNTOS_ENTRE_CONTROLES = 64
+
+# n máximo por método (en Gauss-Legendre, orden * paneles; en el adaptativo,
+# 'max_evaluaciones'). La variable LIMITES_N acepta un objeto JSON que
+# sobrescribe algunos valores.
+LIMITES_N = {
+    "trapecio": 10_000_000,
+    "simpson13": 10_000_000,
+    "simpson38": 10_000_000,
+    "boole": 10_000_000,
+    "simpson_abierto": 10_000_000,
+    "newton_cotes": 10_000_000,
+    "gauss_legendre": 10_000_000,
+    "comparar": 10_000_000,
+    "adaptativo": 1_000_000,
+}
+LIMITES_N.update(json.loads(os.environ.get("LIMITES_N", "{}")))
+
+
+class PresupuestoExcedido(Exception):
+    def __init__(self, mensaje, estado, progreso):
+        # Los argumentos van a la excepción para que se pueda enviar entre procesos
+        super().__init__(mensaje, estado, progreso)
+        self.estado = estado
+        self.progreso = progreso
+        # Estimación parcial que algunos métodos añaden al interrumpirse
+        self.parcial = None
+
+    def __str__(self):
+        return self.args[0]
+
+
+class Presupuesto:
+    def __init__(self, segundos, max_evaluaciones, restante=None):
+        # 'restante' es para los trabajadores, que reciben un plazo ya empezado
+        ahora = time.perf_counter()
+        restante = segundos if restante is None else restante
+        self.segundos = segundos
+        self.inicio = ahora - (segundos - restante)
+        self.limite = ahora + restante
+        self.max_evaluaciones = max_evaluaciones
+
+    def restante(self):
+        return max(self.limite - time.perf_counter(), 0.0)
+
+
+def progreso_presupuesto(medicion, presupuesto):
+    return {
+        "evaluaciones": medicion.evaluaciones,
+        "segundos": time.perf_counter() - presupuesto.inicio,
+        "tiempo_maximo": presupuesto.segundos,
+        "max_evaluaciones": presupuesto.max_evaluaciones
+    }
+
+
+def tiempo_agotado(medicion, presupuesto):
+    return PresupuestoExcedido(f"Se superó el tiempo máximo de {presupuesto.segundos:g} s por petición",
+                               408, progreso_presupuesto(medicion, presupuesto))
+
+
+def tiempo_restante():
+    # Segundos que le quedan a la petición actual (None si no tiene presupuesto)
+    presupuesto = getattr(medicion_actual(), "presupuesto", None)
+    return None if presupuesto is None else presupuesto.restante()
+
+
+def verificar_presupuesto(nuevas=0):
+    medicion = medicion_actual()
+    presupuesto = getattr(medicion, "presupuesto", None)
+    if presupuesto is None:
+        return
+    if time.perf_counter() >= presupuesto.limite:
+        raise tiempo_agotado(medicion, presupuesto)
+    if medicion.evaluaciones + nuevas > presupuesto.max_evaluaciones:
+        raise PresupuestoExcedido(f"La petición necesita más de {presupuesto.max_evaluaciones} evaluaciones de la función",
+                                  422, progreso_presupuesto(medicion, presupuesto))
+
+
+def validar_n(metodo, n):
+    limite = LIMITES_N.get(metodo)
+    if limite is not None and n > limite:
+        raise PresupuestoExcedido(f"El parámetro 'n' ({n}) supera el máximo de {limite} para el método {metodo}",
+                                  422, {"n": n, "max_n": limite})
+
+
+def detalle_error(e):
+    if isinstance(e, PresupuestoExcedido):
+        detalle = {"error": str(e), "progreso": e.progreso}
+        if e.parcial is not None:
+            detalle["parcial"] = e.parcial
+        return detalle
+    if isinstance(e, PuntosSingulares):
+        return {"error": str(e), "singulares": e.abscisas, "total_singulares": e.total}
+    return {"error": str(e)}
+
+
+def responder_error(e):
+    return jsonify(detalle_error(e)), e.estado if isinstance(e, PresupuestoExcedido) else 400
+
+# Caché LRU de funciones compiladas
+# Parsear LaTeX y generar la función con lambdify es lo más costoso de cada
+# petición, así que guardamos el resultado por (expresión, formato) y lo
+# compartimos entre todos los endpoints de integración.
+# Con 'ttl' (segundos) las entradas además caducan pasado ese tiempo.
+# Si varias peticiones piden a la vez una clave que no está en la caché, solo
+# la primera la construye y las demás esperan su resultado (single-flight).
+# Cada una espera como mucho lo que le queda de su propio plazo. Si la que
+# construye agota su presupuesto, ese error es solo suyo: no se reparte y la
+# primera de las que esperaban vuelve a construir el valor con el suyo.
+class Vuelo:
+    def __init__(self):
+        self.evento = threading.Event()
+        self.valor = None
+        self.error = None
+        self.esperando = 0
+        self.relevo = False
+
+
+class CacheLRU:
+    def __init__(self, capacidad=256, ttl=None):
+        self.capacidad = capacidad
+        self.ttl = ttl
+        self._datos = OrderedDict()
+        self._lock = threading.Lock()
+        self.aciertos = 0
+        self.fallos = 0
+        self.desalojos = 0
+        self.expirados = 0
+        self._en_curso = {}
+        self.coalescidas = 0
+        self.max_esperando = 0
+
+    def _vigente(self, clave):
+        # Debe llamarse con el lock tomado
+        if clave not in self._datos:
+            return False
+        if self.ttl is not None and self._datos[clave][1] < time.monotonic():
+            del self._datos[clave]
+            self.expirados += 1
+            return False
+        return True
+
+    def obtener(self, clave, construir, guardar=True):
+        while True:
+            with self._lock:
+                if self._vigente(clave):
+                    self._datos.move_to_end(clave)
+                    self.aciertos += 1
+                    return self._datos[clave][0]
+                vuelo = self._en_curso.get(clave)
+                if vuelo is None:
+                    vuelo = self._en_curso[clave] = Vuelo()
+                    self.fallos += 1
+                    break
+                vuelo.esperando += 1
+                self.coalescidas += 1
+                self.max_esperando = max(self.max_esperando, vuelo.esperando)
+
+            # Otra petición ya está construyendo este valor: esperamos su resultado
+            if not vuelo.evento.wait(tiempo_restante()):
+                verificar_presupuesto()
+                continue
+            if vuelo.relevo:
+                continue
+            if vuelo.error is not None:
+                raise vuelo.error
+            return vuelo.valor
+
+        # Construimos fuera del lock para no bloquear a otros hilos mientras se parsea
+        try:
+            vuelo.valor = construir()
+        except PresupuestoExcedido:
+            vuelo.relevo = True
+            raise
+        except Exception as e:
+            vuelo.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._en_curso[clave]
+                if vuelo.error is None and not vuelo.relevo and guardar:
+                    expira = time.monotonic() + self.ttl if self.ttl is not None else None
+                    self._datos[clave] = (vuelo.valor, expira)
+                    self._datos.move_to_end(clave)
+                    while len(self._datos) > self.capacidad:
+                        self._datos.popitem(last=False)
+                        self.desalojos += 1
+            vuelo.evento.set()
+        return vuelo.valor
+
+    def limpiar(self):
+        with self._lock:
+            self._datos.clear()
+
+    def estadisticas(self):
+        with self._lock:
+            return {
+                "capacidad": self.capacidad,
+                "tamano": len(self._datos),
+                "aciertos": self.aciertos,
+                "fallos": self.fallos,
+                "desalojos": self.desalojos,
+                "expirados": self.expirados,
+                "ttl": self.ttl,
+                "en_curso": len(self._en_curso),
+                "coalescidas": self.coalescidas,
+                "max_esperando": self.max_esperando
+            }
+
+
+cache_funciones = CacheLRU(capacidad=256)
+
+
+def reemplazar_e_exponencial(expr):
+    # Reemplaza e^{...} por \exp{...} usando regex
+    pattern = r"e\s*\^\s*\{([^}]*)\}"
+    return re.sub(pattern, r"\\exp{\1}", expr)
+
+
+# Carga diferida de sympy y del parser de LaTeX (que arrastra el runtime de
+# antlr). Es lo más lento del arranque, así que solo se importa con la
+# primera expresión LaTeX; '/', '/metodos' y el formato python no lo necesitan.
+_lock_sympy = threading.RLock()
+_modulos_sympy = None
+_parser_latex = None
+
+
+def cargar_sympy():
+    global _modulos_sympy
+    if _modulos_sympy is None:
+        with _lock_sympy:
+            if _modulos_sympy is None:
+                inicio = time.perf_counter()
+                import sympy
+                from sympy.utilities.lambdify import lambdify
+                TIEMPOS_ARRANQUE["importacion_sympy"] = time.perf_counter() - inicio
+
+                _modulos_sympy = SimpleNamespace(sympy=sympy, lambdify=lambdify)
+    return _modulos_sympy
+
+
+def cargar_parser_latex():
+    global _parser_latex
+    if _parser_latex is None:
+        with _lock_sympy:
+            if _parser_latex is None:
+                cargar_sympy()
+                inicio = time.perf_counter()
+                from sympy.parsing.latex import parse_latex
+                # El runtime de antlr se carga en la primera llamada al parser
+                parse_latex("x")
+                TIEMPOS_ARRANQUE["importacion_latex"] = time.perf_counter() - inicio
+
+                _parser_latex = parse_latex
+    return _parser_latex
+
+
+# Caché persistente en disco de expresiones LaTeX compiladas
+# Cada instancia nueva (p. ej. en Vercel) empieza con la caché en memoria
+# vacía; con CACHE_EXPRESIONES_DIR (p. ej. /tmp/cache_expresiones) se guarda
+# por cada expresión su forma canónica, la expresión de sympy serializada con
+# srepr y el código que genera lambdify, de modo que se puede reconstruir sin
+# volver a parsear. CACHE_EXPRESIONES_EMPAQUETADA apunta opcionalmente a un
+# directorio de solo lectura distribuido junto con el código. Las entradas se
+# guardan bajo un subdirectorio con las versiones de sympy y NumPy, y se
+# desalojan las más antiguas al superar el tamaño o el número de entradas.
+# Al cargarlas se ejecuta su código (y sympify evalúa el srepr), así que cada
+# entrada se firma con HMAC-SHA256 usando CACHE_EXPRESIONES_CLAVE y se ignora
+# la que no trae una firma válida: quien pueda escribir en el directorio (p. ej.
+# /tmp) no puede inyectar código sin la clave. Sin clave no hay caché en disco.
+FORMATO_CACHE_DISCO = 2
+
+
+# Nombre de los subdirectorios por versión; solo estos se borran al cambiar de
+# versión. Las versiones siguen PEP 440 (1.12, 2.0.0rc1, 1.13.dev0, 1.0+local):
+# un directorio como v2-sympy1.12-numpy1.26.bak no se toca
+_VERSION_PAQUETE = r"\d+(?:\.\d+)*(?:(?:a|b|rc)\d+)?(?:\.post\d+)?(?:\.dev\d+)?(?:\+[a-z0-9.]+)?"
+PATRON_VERSION_CACHE_DISCO = re.compile(
+    rf"v\d+-sympy(?:{_VERSION_PAQUETE}|desconocida)-numpy{_VERSION_PAQUETE}")
+
+
+def version_cache_disco():
+    try:
+        version_sympy = importlib.metadata.version("sympy")
+    except importlib.metadata.PackageNotFoundError:
+        version_sympy = "desconocida"
+    return f"v{FORMATO_CACHE_DISCO}-sympy{version_sympy}-numpy{np.__version__}"
+
+
+def espacio_nombres_numpy():
+    # Nombres disponibles para el código generado por lambdify al cargarlo del disco
+    return {**vars(np), "numpy": np}
+
+
+class ExpresionSerializada:
+    # Sustituye a la expresión de sympy cuando la función se cargó del disco:
+    # solo se reconstruye (importando sympy) si hace falta la evaluación simbólica
+    def __init__(self, srepr, canonica, fuente=None):
+        self.srepr = srepr
+        self.canonica = canonica
+        self.fuente = fuente
+        self._expresion = None
+
+    def expresion(self):
+        if self._expresion is None:
+            self._expresion = cargar_sympy().sympy.sympify(self.srepr)
+        return self._expresion
+
+    def subs(self, *args, **kwargs):
+        return self.expresion().subs(*args, **kwargs)
+
+    def __str__(self):
+        return self.canonica
+
+
+class CacheDisco:
+    def __init__(self, directorio, max_bytes, max_entradas, clave, directorio_lectura=None):
+        self.version = version_cache_disco()
+        self._clave = clave.encode("utf-8")
+        self.directorio = os.path.join(directorio, self.version)
+        self.directorio_lectura = os.path.join(directorio_lectura, self.version) if directorio_lectura else None
+        self.max_bytes = max_bytes
+        self.max_entradas = max_entradas
+        self._lock = threading.Lock()
+        self.aciertos = 0
+        self.fallos = 0
+        self.escrituras = 0
+        self.desalojos = 0
+        self.errores = 0
+        self.rechazadas = 0
+        os.makedirs(self.directorio, exist_ok=True)
+        self._borrar_versiones_antiguas(directorio)
+        self._podar()
+
+    def _borrar_versiones_antiguas(self, directorio):
+        # El directorio puede ser compartido (p. ej. /tmp): solo se tocan los
+        # subdirectorios creados por esta caché para otras versiones
+        for nombre in os.listdir(directorio):
+            ruta = os.path.join(directorio, nombre)
+            if nombre != self.version and PATRON_VERSION_CACHE_DISCO.fullmatch(nombre) \
+                    and os.path.isdir(ruta) and not os.path.islink(ruta):
+                shutil.rmtree(ruta, ignore_errors=True)
+
+    def _nombre(self, clave):
+        return hashlib.sha256(json.dumps(clave, ensure_ascii=False).encode("utf-8")).hexdigest() + ".json"
+
+    def _firma(self, contenido):
+        mensaje = json.dumps(contenido, sort_keys=True, ensure_ascii=False).encode("utf-8")
+        return hmac.new(self._clave, mensaje, hashlib.sha256).hexdigest()
+
+    def leer(self, clave):
+        nombre = self._nombre(clave)
+        for directorio in (self.directorio, self.directorio_lectura):
+            if directorio is None:
+                continue
+            ruta = os.path.join(directorio, nombre)
+            try:
+                with open(ruta, encoding="utf-8") as archivo:
+                    entrada = json.load(archivo)
+            except FileNotFoundError:
+                continue
+            except (OSError, ValueError):
+                with self._lock:
+                    self.errores += 1
+                continue
+            firma = entrada.pop("firma", None) if isinstance(entrada, dict) else None
+            if not isinstance(firma, str) or not hmac.compare_digest(firma, self._firma(entrada)):
+                with self._lock:
+                    self.rechazadas += 1
+                continue
+            if entrada.get("version") != self.version or entrada.get("clave") != list(clave):
+                continue
+            if directorio == self.directorio:
+                try:
+                    # Marca de uso para el desalojo LRU
+                    os.utime(ruta)
+                except OSError:
+                    pass
+            with self._lock:
+                self.aciertos += 1
+            return entrada
+        with self._lock:
+            self.fallos += 1
+        return None
+
+    def guardar(self, clave, entrada):
+        ruta = os.path.join(self.directorio, self._nombre(clave))
+        try:
+            descriptor, temporal = tempfile.mkstemp(dir=self.directorio, suffix=".tmp")
+            contenido = {**entrada, "version": self.version, "clave": list(clave)}
+            contenido["firma"] = self._firma(contenido)
+            with os.fdopen(descriptor, "w", encoding="utf-8") as archivo:
+                json.dump(contenido, archivo, ensure_ascii=False)
+            os.replace(temporal, ruta)
+        except OSError:
+            with self._lock:
+                self.errores += 1
+            return
+        with self._lock:
+            self.escrituras += 1
+        self._podar()
+
+    def _archivos(self):
+        archivos = []
+        for nombre in os.listdir(self.directorio):
+            if nombre.endswith(".json"):
+                try:
+                    info = os.stat(os.path.join(self.directorio, nombre))
+                except OSError:
+                    continue
+                archivos.append((info.st_mtime, info.st_size, nombre))
+        return archivos
+
+    def _podar(self):
+        with self._lock:
+            archivos = sorted(self._archivos())
+            total = sum(tamano for _, tamano, _ in archivos)
+            while archivos and (total > self.max_bytes or len(archivos) > self.max_entradas):
+                _, tamano, nombre = archivos.pop(0)
+                try:
+                    os.remove(os.path.join(self.directorio, nombre))
+                except OSError:
+                    pass
+                total -= tamano
+                self.desalojos += 1
+
+    def limpiar(self):
+        with self._lock:
+            for _, _, nombre in self._archivos():
+                try:
+                    os.remove(os.path.join(self.directorio, nombre))
+                except OSError:
+                    pass
+
+    def estadisticas(self):
+        with self._lock:
+            archivos = self._archivos()
+            return {
+                "directorio": self.directorio,
+                "version": self.version,
+                "entradas": len(archivos),
+                "bytes": sum(tamano for _, tamano, _ in archivos),
+                "max_bytes": self.max_bytes,
+                "max_entradas": self.max_entradas,
+                "aciertos": self.aciertos,
+                "fallos": self.fallos,
+                "escrituras": self.escrituras,
+                "desalojos": self.desalojos,
+                "errores": self.errores,
+                "rechazadas": self.rechazadas
+            }
+
+
+cache_disco = None
+if os.environ.get("CACHE_EXPRESIONES_DIR") and os.environ.get("CACHE_EXPRESIONES_CLAVE"):
+    try:
+        cache_disco = CacheDisco(
+            os.environ["CACHE_EXPRESIONES_DIR"],
+            max_bytes=int(float(os.environ.get("CACHE_EXPRESIONES_MAX_MB", 20)) * 1024 * 1024),
+            max_entradas=int(os.environ.get("CACHE_EXPRESIONES_MAX_ENTRADAS", 5000)),
+            clave=os.environ["CACHE_EXPRESIONES_CLAVE"],
+            directorio_lectura=os.environ.get("CACHE_EXPRESIONES_EMPAQUETADA")
+        )
+    except OSError:
+        cache_disco = None
+
+
+def serializar_compilada(expr_sympy, f_numeric):
+    if isinstance(expr_sympy, ExpresionSerializada):
+        # Cargada del disco: se vuelve a serializar sin importar sympy
+        return {"canonica": expr_sympy.canonica, "srepr": expr_sympy.srepr, "fuente": expr_sympy.fuente}
+    modulos = cargar_sympy()
+    entrada = {"canonica": str(expr_sympy), "srepr": modulos.sympy.srepr(expr_sympy), "fuente": None}
+    # El código de lambdify solo se guarda si todos los nombres que usa se
+    # resuelven igual en el espacio de nombres que se reconstruye al cargar
+    try:
+        fuente = inspect.getsource(f_numeric)
+    except (OSError, TypeError):
+        return entrada
+    espacio = espacio_nombres_numpy()
+    globales = f_numeric.__globals__
+    if all((nombre in globales) == (nombre in espacio) and globales.get(nombre) is espacio.get(nombre)
+           for nombre in f_numeric.__code__.co_names):
+        entrada["fuente"] = fuente
+    return entrada
+
+
+def cargar_compilada(entrada):
+    expr_sympy = ExpresionSerializada(entrada["srepr"], entrada["canonica"], entrada.get("fuente"))
+    if entrada.get("fuente"):
+        espacio = espacio_nombres_numpy()
+        exec(entrada["fuente"], espacio)
+        return expr_sympy, espacio["_lambdifygenerated"]
+    # Sin código reutilizable: se reconstruye la expresión (sin pasar por el
+    # parser de LaTeX) y se vuelve a generar la función numérica
+    expr = expr_sympy.expresion()
+    return expr, cargar_sympy().lambdify('x', expr, 'numpy')
+
+
+# parse_latex devuelve \ln y \log como log(a, E), que lambdify traduce a
+# log(a, e): NumPy toma el segundo argumento como 'out', la llamada falla y
+# todos los puntos bajan al nivel mpmath. Se reescriben con un solo argumento.
+def normalizar_logaritmos(expr):
+    sympy = cargar_sympy().sympy
+
+    def un_argumento(logaritmo):
+        argumento, base = logaritmo.args
+        if base == sympy.E:
+            return sympy.log(argumento)
+        return sympy.log(argumento) / sympy.log(base)
+
+    return expr.replace(lambda e: isinstance(e, sympy.log) and len(e.args) == 2, un_argumento)
+
+
+# Función para compilar expresiones LaTeX de forma general
+# Esta función no depende de casos específicos, sino que utiliza
+# el poder del módulo sympy para convertir cualquier expresión LaTeX válida
+def compilar_latex(funcion):
+    if cache_disco is not None:
+        with medir("disco"):
+            entrada = cache_disco.leer(["latex", funcion])
+            if entrada is not None:
+                try:
+                    return cargar_compilada(entrada)
+                except Exception:
+                    pass
+
+    # Preprocesar para soportar tanto 'e^{...}' como '\exp{...}'
+    funcion_preprocesada = reemplazar_e_exponencial(funcion)
+    with medir("importacion"):
+        parse_latex = cargar_parser_latex()
+        lambdify = cargar_sympy().lambdify
+    try:
+        # Paso 1: Convertir la expresión LaTeX a expresión simbólica
+        with medir("parseo"):
+            expr_sympy = normalizar_logaritmos(parse_latex(funcion_preprocesada))
+            # Otras letras (p. ej. \operatorname{erf} leído como o*p*e*...) y
+            # funciones que sympy no conoce (\Gamma(x)) no se pueden evaluar en
+            # ningún nivel: se rechazan antes de recorrer los puntos por los respaldos
+            libres = sorted(str(simbolo) for simbolo in expr_sympy.free_symbols if str(simbolo) != "x")
+            if libres:
+                raise ValueError(f"Variables no permitidas: {', '.join(libres)}")
+            desconocidas = sorted({str(f.func) for f in expr_sympy.atoms(cargar_sympy().sympy.core.function.AppliedUndef)})
+            if desconocidas:
+                raise ValueError(f"Funciones no reconocidas: {', '.join(desconocidas)}")
+        # Paso 2: Crear una función numérica a partir de la expresión simbólica
+        with medir("lambdify"):
+            f_numeric = lambdify('x', expr_sympy, 'numpy')
+    except Exception as e_parse:
+        raise ValueError(f"No se pudo evaluar la expresión LaTeX. Error: {str(e_parse)}")
+
+    if cache_disco is not None:
+        try:
+            with medir("disco"):
+                cache_disco.guardar(["latex", funcion], serializar_compilada(expr_sympy, f_numeric))
+        except Exception:
+            pass
+    return expr_sympy, f_numeric
+
+
+# min y max de Python, elemento a elemento: max(x, 0) funciona igual con un
+# número que con el arreglo de nodos
+def minimo(*args):
+    return reduce(np.minimum, args) if len(args) > 1 else np.min(args[0])
+
+
+def maximo(*args):
+    return reduce(np.maximum, args) if len(args) > 1 else np.max(args[0])
+
+
+# Nombres permitidos en las expresiones de formato python. Todas son funciones
+# de NumPy (o equivalentes elemento a elemento de las de Python), de modo que
+# la expresión compilada funciona igual con un número que con un arreglo
+# completo de nodos.
+FUNCIONES_PERMITIDAS = {
+    "sin": np.sin, "cos": np.cos, "tan": np.tan,
+    "asin": np.arcsin, "acos": np.arccos, "atan": np.arctan,
+    "arcsin": np.arcsin, "arccos": np.arccos, "arctan": np.arctan,
+    "sinh": np.sinh, "cosh": np.cosh, "tanh": np.tanh,
+    "asinh": np.arcsinh, "acosh": np.arccosh, "atanh": np.arctanh,
+    "arcsinh": np.arcsinh, "arccosh": np.arccosh, "arctanh": np.arctanh,
+    "exp": np.exp, "log": np.log, "log10": np.log10, "log2": np.log2,
+    "sqrt": np.sqrt, "cbrt": np.cbrt, "abs": np.abs, "fabs": np.fabs,
+    "floor": np.floor, "ceil": np.ceil, "sign": np.sign,
+    "log1p": np.log1p, "expm1": np.expm1, "hypot": np.hypot,
+    "atan2": np.arctan2, "arctan2": np.arctan2,
+    "min": minimo, "max": maximo, "minimum": np.minimum, "maximum": np.maximum,
+    "pow": np.power, "power": np.power, "round": np.round, "where": np.where,
+    "pi": np.pi, "e": np.e,
+}
+
+# Prefijos aceptados para llamar a las mismas funciones (np.sin, math.sin, ...)
+MODULOS_PERMITIDOS = ("np", "numpy", "math")
+
+NODOS_PERMITIDOS = (
+    ast.Expression, ast.BinOp, ast.UnaryOp, ast.Constant, ast.Name, ast.Load,
+    ast.Call, ast.Attribute, ast.Compare, ast.IfExp, ast.BoolOp,
+    ast.Add, ast.Sub, ast.Mult, ast.Div, ast.FloorDiv, ast.Mod, ast.Pow,
+    ast.UAdd, ast.USub, ast.Not, ast.And, ast.Or,
+    ast.Eq, ast.NotEq, ast.Lt, ast.LtE, ast.Gt, ast.GtE,
+)
+
+
+def validar_expresion_python(arbol):
+    for nodo in ast.walk(arbol):
+        if not isinstance(nodo, NODOS_PERMITIDOS):
+            raise ValueError(f"Operación no permitida: {type(nodo).__name__}")
+        if isinstance(nodo, ast.Constant):
+            if not isinstance(nodo.value, (int, float)):
+                raise ValueError(f"Constante no permitida: {nodo.value!r}")
+            # Las constantes se evalúan como float: con enteros de Python,
+            # 9**9**8 o 10**10**10 se calcularían con precisión arbitraria y
+            # ocuparían el proceso durante minutos
+            try:
+                nodo.value = float(nodo.value)
+            except OverflowError:
+                raise ValueError("Constante demasiado grande para un número de punto flotante")
+        if isinstance(nodo, ast.Name) and nodo.id != "x" and nodo.id not in FUNCIONES_PERMITIDAS \
+                and nodo.id not in MODULOS_PERMITIDOS:
+            raise ValueError(f"Nombre no permitido: {nodo.id}")
+        if isinstance(nodo, ast.Attribute):
+            if not (isinstance(nodo.value, ast.Name) and nodo.value.id in MODULOS_PERMITIDOS
+                    and nodo.attr in FUNCIONES_PERMITIDAS):
+                raise ValueError(f"Atributo no permitido: {nodo.attr}")
+        if isinstance(nodo, ast.Call) and (nodo.keywords or not isinstance(nodo.func, (ast.Name, ast.Attribute))):
+            raise ValueError("Llamada a función no permitida")
+
+
+# Función para compilar expresiones en formato python
+# Se valida el árbol sintáctico contra la lista blanca y se compila una sola
+# vez; el resultado se evalúa sin acceso a builtins ni a los globales del módulo.
+def compilar_python(funcion):
+    arbol = ast.parse(funcion.strip(), mode="eval")
+    validar_expresion_python(arbol)
+    codigo = compile(arbol, "<funcion>", "eval")
+
+    modulo = SimpleNamespace(**FUNCIONES_PERMITIDAS)
+    espacio_nombres = {"__builtins__": {}, **FUNCIONES_PERMITIDAS}
+    espacio_nombres.update({nombre: modulo for nombre in MODULOS_PERMITIDOS})
+
+    def f_numeric(x):
+        return eval(codigo, espacio_nombres, {"x": x})
+
+    return None, f_numeric
+
+
+def obtener_funcion_compilada(funcion, formato="python"):
+    if formato == "latex":
+        return cache_funciones.obtener((funcion, formato), lambda: compilar_latex(funcion))
+    return cache_funciones.obtener((funcion, formato), lambda: compilar_python(funcion))
+
+
+# Función para evaluar expresiones matemáticas de forma segura
+def evaluar_funcion(funcion, x, formato="python"):
+    try:
+        if formato == "latex":
+            expr_sympy, f_numeric = obtener_funcion_compilada(funcion, formato)
+            # Paso 3: Evaluar la función numérica con el valor de x
+            try:
+                resultado = f_numeric(x)
+                if isinstance(resultado, complex):
+                    if abs(resultado.imag) < 1e-10:
+                        return float(resultado.real)
+                    else:
+                        return float(abs(resultado))
+                return float(resultado)
+            except Exception as e_eval:
+                x_symbol = cargar_sympy().sympy.Symbol('x')
+                resultado = expr_sympy.subs(x_symbol, x).evalf()
+                return float(resultado)
+        else:
+            # Evaluación de la expresión python ya validada y compilada
+            expr_sympy, f_numeric = obtener_funcion_compilada(funcion, formato)
+            return f_numeric(x)
+    except Exception as e:
+        raise ValueError(f"Error al evaluar la función: {str(e)}")
+
+
+# Parte real si la parte imaginaria es despreciable, módulo en caso contrario
+# (misma regla que en la evaluación escalar)
+def parte_real(resultado):
+    resultado = np.asarray(resultado)
+    if np.iscomplexobj(resultado):
+        resultado = np.where(np.abs(resultado.imag) < 1e-10, resultado.real, np.abs(resultado))
+    return resultado.astype(float)
+
+
+def evaluar_arreglo(f_numeric, xs):
+    # None si la función no admite el arreglo
+    try:
+        with np.errstate(all='ignore'):
+            return np.array(np.broadcast_to(parte_real(f_numeric(xs)), xs.shape))
+    except Exception:
+        return None
+
+
+def obtener_funcion_mpmath(funcion, expr_sympy):
+    # Misma expresión generada con mpmath: sin desbordamientos de float y con
+    # funciones que NumPy no tiene o no admite con esos argumentos
+    def construir():
+        expresion = expr_sympy.expresion() if isinstance(expr_sympy, ExpresionSerializada) else expr_sympy
+        return cargar_sympy().lambdify('x', expresion, 'mpmath')
+    return cache_funciones.obtener((funcion, "mpmath"), construir)
+
+
+# La función no es finita en algunos nodos (polos, desbordamientos): la
+# integral no existe como número y JSON no admite NaN ni infinito, así que se
+# responde 400 con las abscisas afectadas (como mucho MAX_PUNTOS_SINGULARES)
+MAX_PUNTOS_SINGULARES = 10
+
+
+class PuntosSingulares(ValueError):
+    def __init__(self, abscisas, total):
+        # Los argumentos van a la excepción para que se pueda enviar entre procesos
+        super().__init__(abscisas, total)
+        self.abscisas = abscisas
+        self.total = total
+
+    def __str__(self):
+        lista = ", ".join(f"{x:g}" for x in self.abscisas)
+        resto = f" y {self.total - len(self.abscisas)} más" if self.total > len(self.abscisas) else ""
+        return f"Error al evaluar la función: no toma un valor finito en x = {lista}{resto}"
+
+
+def evaluar_mpmath(f_mpmath, x):
+    # Devuelve (valor, singular); valor None si hay que pasar al nivel simbólico
+    try:
+        resultado = complex(f_mpmath(x))
+    except ZeroDivisionError:
+        return np.nan, True
+    except Exception:
+        return None, False
+    valor = resultado.real if abs(resultado.imag) < 1e-10 else abs(resultado)
+    if np.isinf(valor):
+        return valor, True
+    if np.isnan(valor):
+        return None, False
+    return valor, False
+
+
+def evaluar_mpmath_arreglo(f_mpmath, xs):
+    # Una sola llamada sobre el bloque; None si algún punto lanza una excepción
+    try:
+        with np.errstate(all='ignore'):
+            return parte_real(np.frompyfunc(f_mpmath, 1, 1)(xs).astype(complex))
+    except Exception:
+        return None
+
+
+# Evaluación por lotes: llama a la función una sola vez sobre todo el arreglo
+# de nodos y solo los puntos con resultado no finito (o todos, si la llamada
+# falla) bajan a los niveles siguientes:
+#   1. NumPy en complejo sobre los puntos pendientes (raíces y logaritmos de
+#      negativos, arcsin fuera de [-1, 1], ...).
+#   2. LaTeX: la expresión generada con mpmath sobre los pendientes, por
+#      bloques y sin sympy; solo un bloque con algún punto que lanza una
+#      excepción se recorre punto a punto. Los polos (división entre cero o
+#      resultado infinito) se marcan como singulares sin pasar al nivel
+#      simbólico.
+#   3. LaTeX: subs().evalf() solo para los que siguen pendientes; python:
+#      la evaluación escalar de siempre.
+# La cantidad de puntos resueltos en cada nivel se acumula por petición. Si al
+# final queda algún valor no finito se lanza PuntosSingulares (400).
+def evaluar_funcion_vectorizada(funcion, xs, formato="python"):
+    xs = np.asarray(xs, dtype=float)
+    try:
+        expr_sympy, f_numeric = obtener_funcion_compilada(funcion, formato)
+    except Exception as e:
+        raise ValueError(f"Error al evaluar la función: {str(e)}")
+    verificar_presupuesto(xs.size)
+    if evaluacion_aislada():
+        return evaluar_en_trabajador(funcion, formato, xs)
+    # Cada punto se cuenta al resolverse, en el nivel que lo resuelve, para
+    # que el progreso de una petición interrumpida sea real
+    with medir("evaluacion"):
+        valores = evaluar_arreglo(f_numeric, xs)
+    if valores is None:
+        valores = np.full(xs.shape, np.nan)
+    pendientes = np.flatnonzero(~np.isfinite(valores))
+    contar_evaluaciones(xs.size - pendientes.size)
+    if pendientes.size == 0:
+        return valores
+
+    with medir("complejo"):
+        complejos = evaluar_arreglo(f_numeric, xs[pendientes].astype(complex))
+    if complejos is not None:
+        resueltos = np.isfinite(complejos)
+        valores[pendientes[resueltos]] = complejos[resueltos]
+        contar_evaluaciones(int(np.count_nonzero(resueltos)))
+        contar_respaldo("complejo", int(np.count_nonzero(resueltos)))
+        pendientes = pendientes[~resueltos]
+
+    if formato == "latex":
+        if pendientes.size:
+            with medir("mpmath"):
+                f_mpmath = obtener_funcion_mpmath(funcion, expr_sympy)
+                restantes = []
+                for inicio in range(0, pendientes.size, PUNTOS_ENTRE_CONTROLES):
+                    verificar_presupuesto()
+                    bloque = pendientes[inicio:inicio + PUNTOS_ENTRE_CONTROLES]
+                    resultados = evaluar_mpmath_arreglo(f_mpmath, xs[bloque])
+                    if resultados is not None:
+                        # Los infinitos son polos; NaN pasa al nivel simbólico
+                        resueltos = ~np.isnan(resultados)
+                        valores[bloque[resueltos]] = resultados[resueltos]
+                        singulares = int(np.count_nonzero(np.isinf(resultados)))
+                        contar_evaluaciones(int(np.count_nonzero(resueltos)))
+                        contar_respaldo("mpmath", int(np.count_nonzero(resueltos)) - singulares)
+                        contar_respaldo("singular", singulares)
+                        restantes.extend(bloque[~resueltos])
+                        continue
+                    # Algún punto del bloque lanza una excepción: uno a uno
+                    for i in bloque:
+                        valor, singular = evaluar_mpmath(f_mpmath, float(xs[i]))
+                        if valor is None:
+                            restantes.append(i)
+                            continue
+                        valores[i] = valor
+                        contar_evaluaciones(1)
+                        contar_respaldo("singular" if singular else "mpmath")
+            pendientes = restantes
+        if len(pendientes):
+            with medir("simbolico"):
+                x_symbol = cargar_sympy().sympy.Symbol('x')
+                for i in pendientes:
+                    verificar_presupuesto()
+                    try:
+                        valores[i] = float(expr_sympy.subs(x_symbol, float(xs[i])).evalf())
+                    except Exception as e:
+                        raise ValueError(f"Error al evaluar la función: {str(e)}")
+                    contar_evaluaciones(1)
+                    contar_respaldo("simbolico")
+    elif pendientes.size:
+        with medir("respaldo"):
+            for k, i in enumerate(pendientes):
+                if k % PUNTOS_ENTRE_CONTROLES == 0:
+                    verificar_presupuesto()
+                valores[i] = evaluar_funcion(funcion, float(xs[i]), formato)
+                contar_evaluaciones(1)
+                contar_respaldo("escalar")
+
+    singulares = np.flatnonzero(~np.isfinite(valores))
+    if singulares.size:
+        raise PuntosSingulares(xs[singulares[:MAX_PUNTOS_SINGULARES]].tolist(), int(singulares.size))
+    return valores
+
+
+def niveles_evaluacion():
+    # Puntos resueltos en cada nivel de evaluación durante la petición
+    medicion = medicion_actual()
+    if medicion is None:
+        return None
+    return {"numpy": medicion.evaluaciones - sum(medicion.respaldos.values()), **medicion.respaldos}
+
+
+# Evaluación aislada en procesos trabajadores
+# Una llamada a la función compilada no se puede interrumpir desde otro hilo
+# (p. ej. x^{9^{9^{9}}}, una sola potencia de enteros enorme), así que la
+# evaluación puede correr en un proceso trabajador que recibe el plazo
+# restante y se termina si no responde a tiempo. Cuesta el arranque del
+# trabajador (unas décimas de segundo la primera vez) y la copia de los datos,
+# por lo que por defecto solo se usa en las peticiones que piden un
+# 'tiempo_limite' menor que el del servidor; EVALUACION_AISLADA=1 la usa
+# siempre y EVALUACION_AISLADA=0 nunca. Sin ella, o si el entorno no permite
+# crear procesos, se evalúa en el hilo de la petición y el plazo solo se
+# comprueba entre llamadas. Los trabajadores se crean con 'spawn' (sin los
+# hilos ni los locks del servidor) la primera vez que hacen falta y se
+# reutilizan; reciben la función LaTeX ya compilada (el código generado por
+# lambdify) y la guardan en su propia caché. 'spawn' vuelve a importar el
+# módulo principal: un script que importe este módulo y atienda peticiones sin
+# servidor debe proteger su código con if __name__ == "__main__".
+EVALUACION_AISLADA = os.environ.get("EVALUACION_AISLADA", "")
+TRABAJADORES_EVALUACION = int(os.environ.get("TRABAJADORES_EVALUACION", os.cpu_count() or 1))
+# Margen tras el plazo para recibir el error del propio trabajador (con su
+# progreso exacto) antes de terminarlo
+ESPERA_CANCELACION = 0.05
+# Desde este tamaño los nodos y los valores van por memoria compartida en
+# lugar de copiarse por el pipe del trabajador
+MIN_PUNTOS_COMPARTIDOS = 65_536
+
+
+class TrabajadorEvaluacion:
+    def __init__(self):
+        contexto = multiprocessing.get_context("spawn")
+        self.conexion, extremo = contexto.Pipe()
+        # Evaluaciones de la petición vistas desde el trabajador; se puede
+        # leer aunque haya que terminarlo a mitad de una llamada
+        self.progreso = contexto.Value("q", 0, lock=False)
+        self.proceso = contexto.Process(target=atender_tareas, args=(extremo, self.progreso),
+                                        name="evaluacion", daemon=True)
+        self.proceso.start()
+        extremo.close()
+        # Claves (funcion, formato) cuya forma compilada ya tiene el trabajador
+        self.compiladas = set()
+
+    def enviar(self, tarea, args, plazo, compiladas):
+        # Las expresiones compiladas viajan solo la primera vez
+        nuevas = {clave: entrada for clave, entrada in compiladas.items() if clave not in self.compiladas}
+        if len(self.compiladas) + len(nuevas) > cache_funciones.capacidad:
+            # La caché del trabajador ya habrá desalojado las más antiguas
+            self.compiladas.clear()
+        self.progreso.value = plazo["evaluaciones"]
+        self.conexion.send((tarea, args, plazo, nuevas))
+        self.compiladas.update(nuevas)
+
+    def terminar(self):
+        self.proceso.kill()
+        self.proceso.join()
+        self.conexion.close()
+
+
+class PoolTrabajadores:
+    def __init__(self, capacidad):
+        self.capacidad = capacidad
+        self._cupos = threading.BoundedSemaphore(capacidad)
+        self._lock = threading.Lock()
+        self._libres = []
+        self.disponible = True
+        self.creados = 0
+        self.terminados = 0
+
+    def tomar(self, cantidad, espera):
+        # Hasta 'cantidad' trabajadores: el primero se espera como mucho
+        # 'espera' segundos (lista vacía si no se libera ninguno), los demás
+        # solo si están libres en ese momento
+        if not self._cupos.acquire(timeout=espera):
+            return []
+        cupos = 1
+        while cupos < cantidad and self._cupos.acquire(blocking=False):
+            cupos += 1
+        trabajadores = []
+        try:
+            while len(trabajadores) < cupos:
+                with self._lock:
+                    trabajador = self._libres.pop() if self._libres else None
+                if trabajador is None:
+                    trabajador = TrabajadorEvaluacion()
+                    with self._lock:
+                        self.creados += 1
+                trabajadores.append(trabajador)
+        except OSError:
+            # El entorno no permite crear procesos (p. ej. algunas plataformas serverless)
+            self.disponible = False
+            for _ in range(cupos - len(trabajadores)):
+                self._cupos.release()
+            if not trabajadores:
+                raise
+        return trabajadores
+
+    def devolver(self, trabajador):
+        with self._lock:
+            self._libres.append(trabajador)
+        self._cupos.release()
+
+    def descartar(self, trabajador):
+        trabajador.terminar()
+        try:
+            # El reemplazo arranca ya, para que la siguiente petición no espere a que cargue
+            reemplazo = TrabajadorEvaluacion()
+        except OSError:
+            reemplazo = None
+        with self._lock:
+            self.terminados += 1
+            if reemplazo is not None:
+                self._libres.append(reemplazo)
+                self.creados += 1
+        self._cupos.release()
+
+
+trabajadores_evaluacion = PoolTrabajadores(TRABAJADORES_EVALUACION)
+
+
+def hay_trabajadores():
+    # Solo dentro de una petición con presupuesto (no en los propios trabajadores)
+    return trabajadores_evaluacion.disponible and has_request_context() \
+        and getattr(medicion_actual(), "presupuesto", None) is not None
+
+
+def evaluacion_aislada():
+    if EVALUACION_AISLADA == "0" or not hay_trabajadores():
+        return False
+    if EVALUACION_AISLADA == "1":
+        return True
+    return medicion_actual().presupuesto.segundos < TIEMPO_MAXIMO_PETICION
+
+
+def atender_tareas(conexion, progreso):
+    # Bucle de un trabajador: recibe (tarea, argumentos, plazo, expresiones
+    # compiladas nuevas) y responde (estado, valor, mediciones de la tarea)
+    # Ctrl+C en el servidor: el proceso principal se encarga de terminarlo
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    while True:
+        try:
+            tarea, args, plazo, compiladas = conexion.recv()
+        except EOFError:
+            return
+        for clave, entrada in compiladas.items():
+            try:
+                cache_funciones.obtener(clave, lambda: cargar_compilada(entrada))
+            except Exception:
+                # Se vuelve a compilar desde el LaTeX al evaluarla
+                pass
+        medicion = SimpleNamespace(
+            fases={}, evaluaciones=plazo["evaluaciones"], respaldos={}, progreso=progreso,
+            presupuesto=Presupuesto(plazo["segundos"], plazo["max_evaluaciones"], plazo["restante"])
+        )
+        _medicion_local.medicion = medicion
+        try:
+            respuesta = ("ok", tarea(*args))
+        except (PresupuestoExcedido, PuntosSingulares) as e:
+            respuesta = ("error", e)
+        except Exception as e:
+            # No todas las excepciones se pueden reconstruir en el otro proceso;
+            # las rutas solo usan su mensaje
+            respuesta = ("error", ValueError(str(e)))
+        finally:
+            _medicion_local.medicion = None
+        conexion.send((*respuesta, {
+            "fases": medicion.fases,
+            "evaluaciones": medicion.evaluaciones - plazo["evaluaciones"],
+            "respaldos": medicion.respaldos
+        }))
+
+
+def ejecutar_en_trabajadores(trabajadores, tareas, compiladas, sumar_fases=True):
+    # Una tarea (función, argumentos) por trabajador; devuelve sus resultados
+    # en orden. 'compiladas' son las expresiones que necesitan las tareas y se
+    # envían a los trabajadores que aún no las tienen. Al vencer el plazo
+    # termina los que siguen ocupados y lanza 408.
+    medicion = medicion_actual()
+    presupuesto = medicion.presupuesto
+    plazo = {
+        "segundos": presupuesto.segundos,
+        "restante": presupuesto.restante(),
+        "max_evaluaciones": presupuesto.max_evaluaciones,
+        "evaluaciones": medicion.evaluaciones
+    }
+    resultados = [None] * len(tareas)
+    pendientes = {}
+    rotos = []
+    error = None
+    try:
+        for k, (trabajador, (tarea, args)) in enumerate(zip(trabajadores, tareas)):
+            try:
+                trabajador.enviar(tarea, args, plazo, compiladas)
+            except OSError:
+                rotos.append(trabajador)
+                raise ValueError("Error al evaluar la función: el proceso de evaluación terminó inesperadamente")
+            pendientes[trabajador.conexion] = (k, trabajador)
+        while pendientes and error is None:
+            espera = presupuesto.limite + ESPERA_CANCELACION - time.perf_counter()
+            listas = multiprocessing.connection.wait(list(pendientes), timeout=max(espera, 0))
+            if not listas:
+                break
+            for conexion in listas:
+                k, trabajador = pendientes.pop(conexion)
+                try:
+                    estado, valor, mediciones = conexion.recv()
+                except (EOFError, OSError):
+                    # El proceso murió (p. ej. sin memoria)
+                    rotos.append(trabajador)
+                    error = ValueError("Error al evaluar la función: el proceso de evaluación terminó inesperadamente")
+                    continue
+                contar_evaluaciones(mediciones["evaluaciones"])
+                for tipo, cantidad in mediciones["respaldos"].items():
+                    contar_respaldo(tipo, cantidad)
+                if sumar_fases:
+                    for fase, segundos in mediciones["fases"].items():
+                        medicion.fases[fase] = medicion.fases.get(fase, 0.0) + segundos
+                if estado == "ok":
+                    resultados[k] = valor
+                elif error is None:
+                    error = valor
+        # Los que siguen ocupados se terminan: o venció el plazo o ya hay un error
+        for _, trabajador in pendientes.values():
+            contar_evaluaciones(trabajador.progreso.value - plazo["evaluaciones"])
+    finally:
+        ocupados = [trabajador for _, trabajador in pendientes.values()]
+        for trabajador in trabajadores:
+            if trabajador in ocupados or trabajador in rotos:
+                trabajadores_evaluacion.descartar(trabajador)
+            else:
+                trabajadores_evaluacion.devolver(trabajador)
+    if error is None and pendientes:
+        error = tiempo_agotado(medicion, presupuesto)
+    if error is not None:
+        if isinstance(error, PresupuestoExcedido):
+            # El progreso de la petición completa, no solo el del trabajador
+            error.progreso = progreso_presupuesto(medicion, presupuesto)
+        raise error
+    return resultados
+
+
+def tomar_trabajadores(cantidad):
+    medicion = medicion_actual()
+    trabajadores = trabajadores_evaluacion.tomar(cantidad, medicion.presupuesto.restante())
+    if not trabajadores:
+        # Todos ocupados hasta el final del plazo
+        raise tiempo_agotado(medicion, medicion.presupuesto)
+    return trabajadores
+
+
+def compiladas_para_trabajador(funcion, formato):
+    # Lo que necesita un trabajador para no volver a parsear el LaTeX (las
+    # expresiones python se compilan en el trabajador sin costo apreciable)
+    if formato != "latex":
+        return {}
+    expr_sympy, f_numeric = obtener_funcion_compilada(funcion, formato)
+    entrada = cache_funciones.obtener((funcion, "trabajador"), lambda: serializar_compilada(expr_sympy, f_numeric))
+    return {(funcion, formato): entrada}
+
+
+def vistas_compartidas(memorias, total):
+    return [np.ndarray((total,), dtype=float, buffer=memoria.buf) for memoria in memorias]
+
+
+def crear_compartidas(cantidad, total):
+    # None si el entorno no permite crear memoria compartida
+    memorias = []
+    try:
+        for _ in range(cantidad):
+            memorias.append(shared_memory.SharedMemory(create=True, size=max(total, 1) * 8))
+    except OSError:
+        liberar_compartidas(memorias)
+        return None
+    return memorias
+
+
+def liberar_compartidas(memorias):
+    for memoria in memorias:
+        try:
+            memoria.close()
+        except BufferError:
+            # Aún hay vistas vivas (p. ej. en la traza de un error): se
+            # cierra cuando el recolector libere el objeto
+            pass
+        memoria.unlink()
+
+
+def evaluar_bloque_compartido(nombres, total, inicio, fin, funcion, formato):
+    # Se ejecuta en el trabajador: lee los nodos de su tramo y escribe f(nodos)
+    # en memoria compartida. Si también hay pesos devuelve la suma ponderada parcial.
+    memorias = [shared_memory.SharedMemory(name=nombre) for nombre in nombres]
+    try:
+        vistas = vistas_compartidas(memorias, total)
+        nodos, valores = vistas[0], vistas[1]
+        valores[inicio:fin] = evaluar_funcion_vectorizada(funcion, nodos[inicio:fin], formato)
+        parcial = float(np.dot(vistas[2][inicio:fin], valores[inicio:fin])) if len(vistas) > 2 else None
+        # Las vistas deben liberarse antes de cerrar la memoria compartida
+        del vistas, nodos, valores
+        return parcial
+    finally:
+        for memoria in memorias:
+            try:
+                memoria.close()
+            except BufferError:
+                pass
+
+
+def evaluar_en_trabajador(funcion, formato, xs):
+    compiladas = compiladas_para_trabajador(funcion, formato)
+    medicion = medicion_actual()
+    inicio = time.perf_counter()
+    fases_previas = sum(medicion.fases.values())
+    memorias = crear_compartidas(2, xs.size) if xs.size >= MIN_PUNTOS_COMPARTIDOS else None
+    vistas = None
+    try:
+        if memorias is None:
+            tarea = (evaluar_funcion_vectorizada, (funcion, xs, formato))
+        else:
+            vistas = vistas_compartidas(memorias, xs.size)
+            vistas[0][:] = xs
+            tarea = (evaluar_bloque_compartido,
+                     ([memoria.name for memoria in memorias], xs.size, 0, xs.size, funcion, formato))
+        try:
+            trabajadores = tomar_trabajadores(1)
+        except OSError:
+            # A partir de aquí se evalúa en el hilo de la petición
+            return evaluar_funcion_vectorizada(funcion, xs, formato)
+        resultado = ejecutar_en_trabajadores(trabajadores, [tarea], compiladas)[0]
+        return resultado if vistas is None else vistas[1].copy()
+    finally:
+        vistas = None
+        if memorias is not None:
+            liberar_compartidas(memorias)
+        # Costo propio del aislamiento: esperar o crear el trabajador y copiar
+        # los datos (las fases del trabajador ya se sumaron por separado)
+        propias = time.perf_counter() - inicio - (sum(medicion.fases.values()) - fases_previas)
+        medicion.fases["aislamiento"] = medicion.fases.get("aislamiento", 0.0) + max(propias, 0.0)
+
+
+# Evaluación paralela opcional ('paralelo': true)
+# Con n muy grande y expresiones costosas un solo proceso usa un solo núcleo.
+# Los nodos y los pesos se copian a memoria compartida y se reparten en
+# tramos entre varios trabajadores de evaluación (los mismos de la
+# evaluación aislada, con el mismo plazo). Cada uno escribe f(nodos) en otro
+# bloque compartido y devuelve la suma ponderada parcial de su tramo. Por
+# debajo de MIN_NODOS_PARALELO, con PROCESOS_EVALUACION=1, o si el entorno no
+# permite crear procesos o memoria compartida (p. ej. en algunas plataformas
+# serverless) se evalúa como cualquier otra petición.
+PROCESOS_EVALUACION = int(os.environ.get("PROCESOS_EVALUACION", os.cpu_count() or 1))
+MIN_NODOS_PARALELO = int(os.environ.get("MIN_NODOS_PARALELO", 200_000))
+
+
+def evaluar_paralelo(funcion, formato, nodos, pesos):
+    # Devuelve (valores, suma ponderada) o None si no se pudo repartir
+    total = nodos.size
+    memorias = crear_compartidas(3, total)
+    if memorias is None:
+        return None
+    vistas = None
+    try:
+        vistas = vistas_compartidas(memorias, total)
+        vistas[0][:] = nodos
+        vistas[2][:] = pesos
+        compiladas = compiladas_para_trabajador(funcion, formato)
+        try:
+            # Los que estén libres, al menos uno; si solo hay uno el cálculo queda como el aislado
+            trabajadores = tomar_trabajadores(PROCESOS_EVALUACION)
+        except OSError:
+            return None
+        nombres = [memoria.name for memoria in memorias]
+        limites = np.linspace(0, total, len(trabajadores) + 1).astype(int)
+        tareas = [(evaluar_bloque_compartido, (nombres, total, int(inicio), int(fin), funcion, formato))
+                  for inicio, fin in zip(limites[:-1], limites[1:])]
+        parciales = ejecutar_en_trabajadores(trabajadores, tareas, compiladas, sumar_fases=False)
+        return vistas[1].copy(), math.fsum(parciales)
+    finally:
+        vistas = None
+        liberar_compartidas(memorias)
+
+
+def evaluar_ponderado(funcion, formato, nodos, pesos, paralelo=False):
+    # f(nodos) y la suma ponderada, en paralelo si se pidió y vale la pena
+    if paralelo and PROCESOS_EVALUACION > 1 and nodos.size >= MIN_NODOS_PARALELO and hay_trabajadores():
+        try:
+            # Los errores de la expresión se detectan antes de repartir el trabajo
+            obtener_funcion_compilada(funcion, formato)
+        except Exception as e:
+            raise ValueError(f"Error al evaluar la función: {str(e)}")
+        verificar_presupuesto(nodos.size)
+        with medir("paralelo"):
+            resultado = evaluar_paralelo(funcion, formato, nodos, pesos)
+        if resultado is not None:
+            return resultado
+    valores = evaluar_funcion_vectorizada(funcion, nodos, formato)
+    return valores, float(np.dot(pesos, valores))
+
+
+# Motor genérico de cuadratura de Newton-Cotes
+# Cada regla se describe por el número de subintervalos de un panel y si es
+# abierta o cerrada. A partir de eso se obtiene el patrón de coeficientes
+# enteros, el vector de pesos compuesto para cualquier n y la integral como
+# un único producto punto entre los pesos y f(nodos).
+REGLAS_NEWTON_COTES = {
+    "trapecio": {
+        "nombre": "Trapecio", "intervalos": 1, "abierta": False, "n_defecto": 10,
+        "formula": "(h/2) * [f(a) + 2*f(x1) + 2*f(x2) + ... + 2*f(xn-1) + f(b)]"
+    },
+    "simpson13": {
+        "nombre": "Simpson 1/3", "intervalos": 2, "abierta": False, "n_defecto": 2, "ajuste_arriba": True,
+        "formula": "(h/3) * [f(x0) + 4f(x1) + 2f(x2) + 4f(x3) + ... + f(xn)]"
+    },
+    "simpson38": {
+        "nombre": "Simpson 3/8", "intervalos": 3, "abierta": False, "n_defecto": 3,
+        "formula": "(3h/8) * [f(x0) + 3f(x1) + 3f(x2) + 2f(x3) + 3f(x4) + ... + f(xn)]"
+    },
+    "boole": {
+        "nombre": "Jorge Boole", "intervalos": 4, "abierta": False, "n_defecto": 4,
+        "formula": "(2h/45)[7f(x₀) + 32f(x₁) + 12f(x₂) + 32f(x₃) + 7f(x₄)]"
+    },
+    "simpson_abierto": {
+        "nombre": "Simpson Abierto 1/3", "intervalos": 4, "abierta": True, "n_defecto": 4,
+        "formula": "(4h/3) [2f(x₁) - f(x₂) + 2f(x₃)]"
+    },
+}
+
+MAX_PUNTOS_NEWTON_COTES = 11
+
+
+@lru_cache(maxsize=None)
+def coeficientes_newton_cotes(intervalos, abierta=False):
+    # Nodos del panel en unidades de h: 0..m (cerrada) o 1..m-1 (abierta)
+    nodos = list(range(1, intervalos)) if abierta else list(range(intervalos + 1))
+    k = len(nodos)
+    if k == 0:
+        raise ValueError("La regla necesita al menos un punto de evaluación")
+
+    # Los pesos integran exactamente los polinomios de grado menor que k:
+    # sum(w_i * t_i^j) = m^(j+1) / (j+1). Se resuelve con fracciones exactas.
+    matriz = [
+        [Fraction(t) ** j for t in nodos] + [Fraction(intervalos ** (j + 1), j + 1)]
+        for j in range(k)
+    ]
+    for col in range(k):
+        pivote = next(fila for fila in range(col, k) if matriz[fila][col] != 0)
+        matriz[col], matriz[pivote] = matriz[pivote], matriz[col]
+        for fila in range(k):
+            if fila != col and matriz[fila][col] != 0:
+                razon = matriz[fila][col] / matriz[col][col]
+                matriz[fila] = [x - razon * y for x, y in zip(matriz[fila], matriz[col])]
+    pesos = [matriz[i][k] / matriz[i][i] for i in range(k)]
+    if abierta:
+        pesos = [Fraction(0)] + pesos + [Fraction(0)]
+
+    # Expresar los pesos como factor * (coeficientes enteros), p. ej. (2/45)[7, 32, 12, 32, 7]
+    denominador = lcm(*(p.denominator for p in pesos))
+    enteros = [int(p * denominador) for p in pesos]
+    divisor = gcd(*enteros)
+    return tuple(e // divisor for e in enteros), Fraction(divisor, denominador)
+
+
+def pesos_compuestos(patron, n):
+    # Suma el patrón de cada panel sobre el vector de pesos; los nodos que
+    # comparten dos paneles acumulan ambos coeficientes
+    m = len(patron) - 1
+    pesos = np.zeros(n + 1, dtype=int)
+    for k, coef in enumerate(patron):
+        pesos[k:n - m + k + 1:m] += coef
+    return pesos
+
+
+def ajustar_n(n, intervalos, hacia_arriba=False):
+    if n < 1:
+        raise ValueError("El número de subintervalos 'n' debe ser positivo")
+    # Asegurar que n es múltiplo del número de subintervalos de un panel
+    if n % intervalos != 0:
+        n = (n // intervalos + (1 if hacia_arriba else 0)) * intervalos
+    return max(n, intervalos)
+
+
+def malla_newton_cotes(a, b, n, intervalos, abierta=False):
+    patron, factor = coeficientes_newton_cotes(intervalos, abierta)
+    h = (b - a) / n
+    nodos = np.linspace(a, b, n + 1)
+    pesos = pesos_compuestos(patron, n)
+
+    # Solo se evalúan los nodos con peso distinto de cero (en las reglas
+    # abiertas los extremos de cada panel no se evalúan)
+    indices = np.flatnonzero(pesos)
+    return {
+        "n": n,
+        "h": h,
+        "indices": indices,
+        "nodos": nodos[indices],
+        "pesos": pesos[indices],
+        "patron": patron,
+        "factor": factor
+    }
+
+
+def aplicar_pesos(calculo, valores, suma=None):
+    calculo["valores"] = valores
+    if suma is None:
+        suma = float(np.dot(calculo["pesos"], valores))
+    calculo["resultado"] = float(calculo["factor"]) * calculo["h"] * suma
+    return calculo
+
+
+def integrar_newton_cotes(funcion, formato, a, b, n, intervalos, abierta=False, paralelo=False):
+    calculo = malla_newton_cotes(a, b, n, intervalos, abierta)
+    return aplicar_pesos(calculo, *evaluar_ponderado(funcion, formato, calculo["nodos"], calculo["pesos"], paralelo))
+
+
+def malla_regla(metodo, a, b, n):
+    regla = REGLAS_NEWTON_COTES[metodo]
+    n = ajustar_n(n, regla["intervalos"], regla.get("ajuste_arriba", False))
+    return malla_newton_cotes(a, b, n, regla["intervalos"], regla["abierta"])
+
+
+def integrar_regla(metodo, funcion, formato, a, b, n, paralelo=False):
+    calculo = malla_regla(metodo, a, b, n)
+    return aplicar_pesos(calculo, *evaluar_ponderado(funcion, formato, calculo["nodos"], calculo["pesos"], paralelo))
+
+
+# Modo barrido: varios intervalos [a, b] (listas en 'a' y/o 'b') o integral
+# acumulada ('acumulado': true) con una sola evaluación vectorizada
+MAX_NODOS_BARRIDO = 5_000_000
+
+
+def es_barrido(data):
+    return isinstance(data, dict) and (
+        isinstance(data.get('a'), list) or isinstance(data.get('b'), list) or bool(data.get('acumulado'))
+    )
+
+
+def barrido_regla(metodo, funcion, formato, a, b, n):
+    regla = REGLAS_NEWTON_COTES[metodo]
+    try:
+        a, b = np.broadcast_arrays(np.asarray(a, dtype=float), np.asarray(b, dtype=float))
+    except (ValueError, TypeError):
+        a = b = None
+    if a is None or a.ndim != 1 or a.size == 0:
+        raise ValueError("'a' y 'b' deben ser números o listas de números de igual longitud")
+    n = ajustar_n(n, regla["intervalos"], regla.get("ajuste_arriba", False))
+    if a.size * (n + 1) > MAX_NODOS_BARRIDO:
+        raise ValueError(f"El barrido excede el máximo de {MAX_NODOS_BARRIDO} nodos")
+
+    # Malla de referencia en [0, 1] trasladada a cada intervalo: matriz intervalos × nodos
+    referencia = malla_newton_cotes(0.0, 1.0, n, regla["intervalos"], regla["abierta"])
+    anchos = b - a
+    nodos = a[:, None] + anchos[:, None] * referencia["nodos"]
+    valores = evaluar_funcion_vectorizada(funcion, nodos.ravel(), formato).reshape(nodos.shape)
+    h = anchos / n
+    return {
+        "resultados": float(referencia["factor"]) * h * (valores @ referencia["pesos"]),
+        "a": a,
+        "b": b,
+        "n": n,
+        "h": h,
+        "evaluaciones": nodos.size
+    }
+
+
+def acumulado_regla(metodo, funcion, formato, a, b, n):
+    regla = REGLAS_NEWTON_COTES[metodo]
+    m = regla["intervalos"]
+    n = ajustar_n(n, m, regla.get("ajuste_arriba", False))
+    if n + 1 > MAX_NODOS_BARRIDO:
+        raise ValueError(f"El barrido excede el máximo de {MAX_NODOS_BARRIDO} nodos")
+
+    # Una sola malla fina: la integral de cada panel se suma de forma acumulada
+    calculo = malla_newton_cotes(a, b, n, m, regla["abierta"])
+    valores = np.zeros(n + 1)
+    valores[calculo["indices"]] = evaluar_funcion_vectorizada(funcion, calculo["nodos"], formato)
+    puntos_panel = np.arange(0, n, m)[:, None] + np.arange(m + 1)
+    paneles = float(calculo["factor"]) * calculo["h"] * (valores[puntos_panel] @ np.array(calculo["patron"]))
+    return {
+        "resultados": np.concatenate(([0.0], np.cumsum(paneles))),
+        "x": np.linspace(a, b, n // m + 1),
+        "n": n,
+        "h": calculo["h"],
+        "evaluaciones": len(calculo["indices"])
+    }
+
+
+def responder_barrido(metodo, data):
+    funcion = data.get('funcion')
+    formato = data.get('formato', 'python')
+    n = int(data.get('n', REGLAS_NEWTON_COTES[metodo]["n_defecto"]))
+    if not funcion:
+        return jsonify({"error": "Falta la función"}), 400
+    validar_n(metodo, n)
+
+    respuesta = {
+        "metodo": REGLAS_NEWTON_COTES[metodo]["nombre"],
+        "funcion": funcion,
+        "formato": formato
+    }
+    if data.get('acumulado'):
+        calculo = acumulado_regla(metodo, funcion, formato, float(data.get('a')), float(data.get('b')), n)
+        respuesta.update({
+            "resultados": calculo["resultados"].tolist(),
+            "x": calculo["x"].tolist(),
+            "acumulado": True,
+            "a": float(data.get('a')),
+            "b": float(data.get('b')),
+            "h": calculo["h"]
+        })
+    else:
+        calculo = barrido_regla(metodo, funcion, formato, data.get('a'), data.get('b'), n)
+        respuesta.update({
+            "resultados": calculo["resultados"].tolist(),
+            "a": calculo["a"].tolist(),
+            "b": calculo["b"].tolist(),
+            "h": calculo["h"].tolist()
+        })
+    respuesta.update({"n": calculo["n"], "evaluaciones": calculo["evaluaciones"],
+                      "niveles_evaluacion": niveles_evaluacion()})
+    return jsonify(respuesta)
+
+
+# Caché de resultados de los cinco métodos clásicos. La clave usa la forma
+# canónica de la expresión (la expresión de sympy para LaTeX, el código
+# normalizado para python), de modo que 'e^{x}' y '\exp{x}' o dos
+# expresiones que solo difieren en espacios comparten el mismo resultado.
+TTL_CACHE_RESULTADOS = 300
+MAX_NODOS_CACHE_RESULTADOS = 200_000
+
+cache_resultados = CacheLRU(capacidad=128, ttl=TTL_CACHE_RESULTADOS)
+
+
+def forma_canonica(funcion, formato="python"):
+    if formato == "latex":
+        expr_sympy, f_numeric = obtener_funcion_compilada(funcion, formato)
+        return str(expr_sympy)
+    return ast.unparse(ast.parse(funcion.strip(), mode="eval"))
+
+
+def integrar_regla_cacheada(metodo, funcion, formato, a, b, n, paralelo=False):
+    regla = REGLAS_NEWTON_COTES[metodo]
+    n = ajustar_n(n, regla["intervalos"], regla.get("ajuste_arriba", False))
+    validar_n(metodo, n)
+    try:
+        canonica = forma_canonica(funcion, formato)
+    except Exception as e:
+        raise ValueError(f"Error al evaluar la función: {str(e)}")
+
+    def calcular():
+        calculo = integrar_regla(metodo, funcion, formato, a, b, n, paralelo)
+        # El resultado se comparte entre peticiones: se protege de escrituras
+        for valor in calculo.values():
+            if isinstance(valor, np.ndarray):
+                valor.flags.writeable = False
+        return calculo
+
+    # Los resultados muy grandes no se guardan, pero las peticiones idénticas
+    # simultáneas se siguen agrupando en un solo cálculo
+    return cache_resultados.obtener((metodo, canonica, a, b, n), calcular,
+                                    guardar=n <= MAX_NODOS_CACHE_RESULTADOS)
+
+
+# Los cinco métodos clásicos también aceptan GET con los parámetros en la
+# query string; esas respuestas llevan ETag y devuelven 304 si el cliente ya
+# tiene la misma versión (If-None-Match). El ETag incluye una huella del
+# código y de las versiones de sympy y NumPy, para que un despliegue nuevo no
+# dé por válidas las respuestas calculadas por el anterior. Las respuestas
+# NDJSON no se cachean: el estado 200 se envía antes de evaluar y el cuerpo
+# puede terminar en un registro de error (p. ej. el plazo agotado).
+with open(__file__, "rb") as _fuente:
+    VERSION_ETAG = hashlib.sha256(_fuente.read() + version_cache_disco().encode("utf-8")).hexdigest()[:16]
+
+
+def leer_datos():
+    if request.method != "GET":
+        return request.get_json()
+    datos = {}
+    for clave, valor in request.args.items():
+        if clave == "funcion":
+            datos[clave] = valor
+            continue
+        try:
+            datos[clave] = json.loads(valor)
+        except ValueError:
+            datos[clave] = valor
+    return datos
+
+
+def con_etag(vista):
+    @wraps(vista)
+    def envoltura(*args, **kwargs):
+        if request.method != "GET" or quiere_ndjson():
+            return vista(*args, **kwargs)
+        # La respuesta depende solo de la versión, la ruta, los parámetros y el formato pedido
+        firma = json.dumps([VERSION_ETAG, request.path, sorted(request.args.items(multi=True)),
+                            request.headers.get("Accept", "")], ensure_ascii=False)
+        etag = hashlib.sha256(firma.encode("utf-8")).hexdigest()[:32]
+        if request.if_none_match.contains(etag):
+            respuesta = Response(status=304)
+        else:
+            respuesta = make_response(vista(*args, **kwargs))
+            if respuesta.status_code != 200 or respuesta.is_streamed:
+                return respuesta
+        respuesta.set_etag(etag)
+        respuesta.headers["Cache-Control"] = f"public, max-age={TTL_CACHE_RESULTADOS}"
+        respuesta.vary.add("Accept")
+        return respuesta
+    return envoltura
+
+
+def leer_parametros(data, n_defecto):
+    funcion = data.get('funcion')
+    formato = data.get('formato', 'python')  # Por defecto 'python', también acepta 'latex'
+    a = float(data.get('a'))  # Límite inferior
+    b = float(data.get('b'))  # Límite superior
+    n = int(data.get('n', n_defecto))  # Número de subintervalos
+    return funcion, formato, a, b, n
+
+
+def quiere_paralelo(data):
+    # Evaluación en el pool de procesos (ver evaluar_ponderado)
+    return data.get('paralelo', False) is True
+
+
+# Formato de la tabla de iteración, elegido con el parámetro 'tabla':
+#   completa  -> una fila por punto (comportamiento por defecto)
+#   none      -> sin tabla
+#   resumen   -> primeras y últimas 'k' filas más los totales
+#   columnar  -> arreglos paralelos por columna (xi, fxi, coef, ...)
+#   paginada  -> filas desde 'offset' hasta 'offset' + 'limit'
+# Las tablas se describen por columnas y solo se construyen filas para lo
+# que realmente se devuelve.
+MODOS_TABLA = ("completa", "none", "resumen", "columnar", "paginada")
+
+NOMBRES_COLUMNARES = {
+    "f(xi)": "fxi",
+    "f(x)": "fx",
+    "coeficiente": "coef",
+    "f(xi) * coef": "fxi_coef",
+    "f(x) * coef": "fx_coef",
+    "f(xi) * peso": "fxi_peso"
+}
+
+
+def a_lista(columna):
+    return columna.tolist() if isinstance(columna, np.ndarray) else list(columna)
+
+
+def filas_tabla(columnas, inicio=0, fin=None):
+    partes = [a_lista(columna[inicio:fin]) for columna in columnas.values()]
+    return [dict(zip(columnas, valores)) for valores in zip(*partes)]
+
+
+def columnas_puntos(calculo):
+    return {"i": calculo["indices"], "xi": calculo["nodos"], "f(xi)": calculo["valores"]}
+
+
+def modo_tabla(data):
+    modo = data.get('tabla', 'completa')
+    if modo not in MODOS_TABLA:
+        raise ValueError(f"El parámetro 'tabla' debe ser uno de: {', '.join(MODOS_TABLA)}")
+    return modo
+
+
+def formatear_tabla(columnas, data, columnas_total=(), arreglos=False):
+    modo = modo_tabla(data)
+    total_filas = len(next(iter(columnas.values())))
+
+    if modo == "none":
+        return {}
+    if modo == "columnar":
+        # Con 'arreglos' se dejan los arreglos de NumPy tal cual para el codificador rápido
+        convertir = (lambda columna: columna) if arreglos else a_lista
+        return {"tabla_iteracion": {NOMBRES_COLUMNARES.get(clave, clave): convertir(columna) for clave, columna in columnas.items()}}
+    if modo == "resumen":
+        k = max(int(data.get('k', 5)), 0)
+        return {"tabla_iteracion": {
+            "primeras": filas_tabla(columnas, 0, min(k, total_filas)),
+            "ultimas": filas_tabla(columnas, max(total_filas - k, k), total_filas),
+            "total_filas": total_filas,
+            "totales": {clave: float(np.sum(columnas[clave])) for clave in columnas_total}
+        }}
+    if modo == "paginada":
+        offset = max(int(data.get('offset', 0)), 0)
+        limit = max(int(data.get('limit', 100)), 0)
+        return {
+            "tabla_iteracion": filas_tabla(columnas, offset, offset + limit),
+            "paginacion": {"offset": offset, "limit": limit, "total_filas": total_filas}
+        }
+    return {"tabla_iteracion": filas_tabla(columnas)}
+
+
+def columnas_segmentos(nodos, valores, patron, puntos_segmento, primer_segmento=1):
+    # Tabla organizada por segmentos (los puntos compartidos entre dos
+    # segmentos aparecen en ambos)
+    segmentos = len(puntos_segmento)
+    coeficientes = np.tile(patron, segmentos)
+    valores = valores[puntos_segmento].ravel()
+    return {
+        "segmento": np.repeat(np.arange(primer_segmento, primer_segmento + segmentos), len(patron)),
+        "punto": [f"x{k}" for k in range(len(patron))] * segmentos,
+        "x": nodos[puntos_segmento].ravel(),
+        "f(x)": valores,
+        "coeficiente": coeficientes,
+        "f(x) * coef": coeficientes * valores
+    }
+
+
+def columnas_newton_cotes(calculo):
+    return {
+        "i": calculo["indices"],
+        "xi": calculo["nodos"],
+        "f(xi)": calculo["valores"],
+        "coeficiente": calculo["pesos"],
+        "f(xi) * coef": calculo["pesos"] * calculo["valores"]
+    }
+
+
+# Codificación de la respuesta negociada con la cabecera Accept:
+#   application/json (por defecto)  -> jsonify, como siempre; con tabla=columnar
+#                                      y orjson instalado, los arreglos de NumPy
+#                                      se serializan directamente
+#   application/msgpack             -> MessagePack (requiere msgpack)
+#   application/octet-stream        -> 4 bytes con la longitud del encabezado
+#                                      JSON (uint32 little-endian), el encabezado
+#                                      y las columnas numéricas como float64
+#                                      little-endian, una tras otra
+FORMATOS_RESPUESTA = (
+    "application/json",
+    "application/msgpack",
+    "application/x-msgpack",
+    "application/octet-stream"
+)
+
+
+def data_segmentos(data, filas_por_segmento):
+    # Tabla de segmentos (Boole) con el mismo modo que la tabla de iteración;
+    # en la paginada se devuelven los segmentos de las filas de la página
+    if data.get('tabla') == "paginada":
+        offset = max(int(data.get('offset', 0)), 0)
+        limit = max(int(data.get('limit', 100)), 0)
+        primero = offset // filas_por_segmento
+        ultimo = -(-(offset + limit) // filas_por_segmento)
+        return {"tabla": "paginada", "offset": primero, "limit": max(ultimo - primero, 0)}
+    return data
+
+
+def formatear_segmentos(segmentos, data, filas_por_segmento, arreglos=False):
+    if segmentos is None:
+        return {}
+    tabla = formatear_tabla(segmentos, data_segmentos(data, filas_por_segmento), ["valor"], arreglos)
+    return {"segmentos": tabla["tabla_iteracion"]} if tabla else {}
+
+
+def responder_tabla(respuesta, columnas, data, columnas_total=(), segmentos=None):
+    respuesta = {**respuesta, "niveles_evaluacion": niveles_evaluacion()}
+    formato = request.accept_mimetypes.best_match(FORMATOS_RESPUESTA) or "application/json"
+    filas_por_segmento = len(next(iter(columnas.values()))) // len(segmentos["valor"]) if segmentos else 1
+
+    if formato == "application/octet-stream":
+        columnas, detalles = recortar_tabla(columnas, data, columnas_total)
+        if segmentos is not None:
+            # Los segmentos viajan como columnas binarias y no en el encabezado
+            segmentos, detalles_segmentos = recortar_tabla(segmentos, data_segmentos(data, filas_por_segmento), ["valor"])
+            columnas.update({f"segmentos.{clave}": columna for clave, columna in segmentos.items()})
+            if detalles_segmentos:
+                detalles["segmentos"] = detalles_segmentos
+        return responder_binario({**respuesta, **detalles}, columnas)
+    if formato in ("application/msgpack", "application/x-msgpack"):
+        if msgpack is None:
+            return jsonify({"error": "El formato MessagePack no está disponible en este servidor"}), 406
+        with medir("serializacion"):
+            cuerpo = msgpack.packb({**respuesta, **formatear_segmentos(segmentos, data, filas_por_segmento),
+                                    **formatear_tabla(columnas, data, columnas_total)})
+        return Response(cuerpo, mimetype="application/msgpack")
+    if orjson is not None and data.get('tabla') == "columnar":
+        with medir("serializacion"):
+            cuerpo = orjson.dumps(
+                {**respuesta, **formatear_segmentos(segmentos, data, filas_por_segmento, arreglos=True),
+                 **formatear_tabla(columnas, data, columnas_total, arreglos=True)},
+                option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_SORT_KEYS
+            )
+        return Response(cuerpo, mimetype="application/json")
+    return jsonify({**respuesta, **formatear_segmentos(segmentos, data, filas_por_segmento),
+                    **formatear_tabla(columnas, data, columnas_total)})
+
+
+def recortar_tabla(columnas, data, columnas_total=()):
+    # Las mismas filas que formatear_tabla, pero como columnas para el formato
+    # binario; devuelve también los datos de la tabla que van en el encabezado
+    modo = modo_tabla(data)
+    total_filas = len(next(iter(columnas.values())))
+
+    if modo == "none":
+        return {}, {}
+    if modo == "resumen":
+        k = max(int(data.get('k', 5)), 0)
+        primeras = min(k, total_filas)
+        desde = max(total_filas - k, k)
+        return {clave: unir_filas(columna, primeras, desde) for clave, columna in columnas.items()}, {"resumen": {
+            "primeras": primeras,
+            "ultimas": max(total_filas - desde, 0),
+            "total_filas": total_filas,
+            "totales": {clave: float(np.sum(columnas[clave])) for clave in columnas_total}
+        }}
+    if modo == "paginada":
+        offset = max(int(data.get('offset', 0)), 0)
+        limit = max(int(data.get('limit', 100)), 0)
+        return {clave: columna[offset:offset + limit] for clave, columna in columnas.items()}, {
+            "paginacion": {"offset": offset, "limit": limit, "total_filas": total_filas}
+        }
+    return dict(columnas), {}
+
+
+def unir_filas(columna, primeras, desde):
+    # Filas [0, primeras) seguidas de [desde, final)
+    if isinstance(columna, np.ndarray):
+        return np.concatenate([columna[:primeras], columna[desde:]])
+    return list(columna[:primeras]) + list(columna[desde:])
+
+
+def responder_binario(respuesta, columnas):
+    with medir("serializacion"):
+        return serializar_binario(respuesta, columnas)
+
+
+def serializar_binario(respuesta, columnas):
+    numericas = {}
+    otras = {}
+    for clave, columna in columnas.items():
+        try:
+            arreglo = np.asarray(columna, dtype="<f8")
+        except (ValueError, TypeError):
+            arreglo = None
+        if arreglo is not None and arreglo.ndim >= 1:
+            numericas[clave] = np.ascontiguousarray(arreglo)
+        else:
+            otras[clave] = a_lista(columna)
+
+    # Las columnas de más de una dimensión (p. ej. los intervalos de los
+    # segmentos) se envían aplanadas por filas e indican su 'forma'
+    encabezado = json.dumps({
+        **respuesta,
+        "columnas": [
+            {"nombre": clave, "tipo": "<f8", "longitud": arreglo.size,
+             **({"forma": list(arreglo.shape)} if arreglo.ndim > 1 else {})}
+            for clave, arreglo in numericas.items()
+        ],
+        "columnas_no_numericas": otras
+    }, ensure_ascii=False).encode("utf-8")
+    cuerpo = b"".join([struct.pack("<I", len(encabezado)), encabezado] + [arreglo.tobytes() for arreglo in numericas.values()])
+    return Response(cuerpo, mimetype="application/octet-stream")
+
+
+# Respuesta en streaming NDJSON (Accept: application/x-ndjson)
+# Los nodos se evalúan por bloques de paneles completos y las filas de la
+# tabla se envían a medida que se calculan; la memoria no crece con n. La
+# primera línea es un encabezado, luego una línea por fila y al final un
+# registro con el resultado.
+TAMANO_BLOQUE_STREAMING = 8192
+
+
+def quiere_ndjson():
+    return request.accept_mimetypes.best_match(["application/json", "application/x-ndjson"]) == "application/x-ndjson"
+
+
+def bloques_newton_cotes(funcion, formato, a, b, n, intervalos, abierta=False):
+    patron, factor = coeficientes_newton_cotes(intervalos, abierta)
+    m = intervalos
+    h = (b - a) / n
+    paneles = n // m
+    por_bloque = max(TAMANO_BLOQUE_STREAMING // m, 1)
+
+    for primero in range(0, paneles, por_bloque):
+        ultimo = min(primero + por_bloque, paneles)
+        # El último nodo de un bloque se repite como primero del siguiente
+        indices = np.arange(primero * m, ultimo * m + 1)
+        nodos = a + indices * h
+        if ultimo == paneles:
+            nodos[-1] = b
+        pesos = pesos_compuestos(patron, len(indices) - 1)
+        if ultimo < paneles:
+            pesos[-1] += patron[0]
+        if primero > 0:
+            pesos[0] += patron[-1]
+
+        usados = pesos != 0
+        valores = np.zeros(len(indices))
+        valores[usados] = evaluar_funcion_vectorizada(funcion, nodos[usados], formato)
+        yield {
+            "primer_panel": primero,
+            "puntos_panel": np.arange(ultimo - primero)[:, None] * m + np.arange(m + 1),
+            "indices": indices,
+            "nodos": nodos,
+            "valores": valores,
+            "pesos": pesos,
+            "usados": usados,
+            "evaluaciones": int(np.count_nonzero(usados)) - (1 if primero > 0 and usados[0] else 0)
+        }
+
+
+def filas_bloque_puntos(bloque, columnas):
+    # Cada punto se envía una sola vez: se omite el nodo repetido al inicio
+    # del bloque y los nodos con peso cero
+    seleccion = bloque["usados"].copy()
+    if bloque["primer_panel"] > 0:
+        seleccion[0] = False
+    return columnas({clave: bloque[clave][seleccion] for clave in ("indices", "nodos", "valores", "pesos")})
+
+
+def responder_ndjson(encabezado, funcion, formato, a, b, n, intervalos, abierta, columnas_bloque):
+    patron, factor = coeficientes_newton_cotes(intervalos, abierta)
+    n = ajustar_n(n, intervalos)
+    h = (b - a) / n
+    # Compilar antes de empezar a responder para que los errores de la
+    # expresión sigan devolviendo 400
     try:
-        if formato == "latex":
-            # Preprocesar para soportar tanto 'e^{...}' como '\exp{...}'
-            def reemplazar_e_exponencial(expr):
-                # Reemplaza e^{...} por \exp{...} usando regex
-                pattern = r"e\s*\^\s*\{([^}]*)\}"
-                return re.sub(pattern, r"\\exp{\1}", expr)
-            funcion_preprocesada = reemplazar_e_exponencial(funcion)
-            try:
-                # Paso 1: Convertir la expresión LaTeX a expresión simbólica
-                expr_sympy = parse_latex(funcion_preprocesada)
-                # Paso 2: Crear una función numérica a partir de la expresión simbólica
-                f_numeric = lambdify('x', expr_sympy, 'numpy')
-                # Paso 3: Evaluar la función numérica con el valor de x
-                try:
-                    resultado = f_numeric(x)
-                    if isinstance(resultado, complex):
-                        if abs(resultado.imag) < 1e-10:
-                            return float(resultado.real)
-                        else:
-                            return float(abs(resultado))
-                    return float(resultado)
-                except Exception as e_eval:
-                    x_symbol = sp.Symbol('x')
-                    resultado = expr_sympy.subs(x_symbol, x).evalf()
-                    return float(resultado)
-            except Exception as e_parse:
-                # Si todo lo anterior falla, intentamos una evaluación alternativa
-                try:
-                    x_sym = symbols('x')
-                    expr = parse_latex(funcion_preprocesada)
-                    resultado = expr.subs(x_sym, x).evalf()
-                    return float(resultado)
-                except Exception as e_final:
-                    raise ValueError(f"No se pudo evaluar la expresión LaTeX. Error: {str(e_final)}")
-        else:
-            # Evaluación estándar para formato python
-            return eval(funcion)
+        obtener_funcion_compilada(funcion, formato)
     except Exception as e:
         raise ValueError(f"Error al evaluar la función: {str(e)}")
 
+    def generar():
+        yield json.dumps({"tipo": "encabezado", **encabezado, "funcion": funcion, "formato": formato,
+                          "a": a, "b": b, "n": n, "h": h}, ensure_ascii=False) + "\n"
+        suma = 0.0
+        evaluaciones = 0
+        try:
+            for bloque in bloques_newton_cotes(funcion, formato, a, b, n, intervalos, abierta):
+                suma += float(np.sum(bloque["valores"][bloque["puntos_panel"]] @ np.array(patron)))
+                evaluaciones += bloque["evaluaciones"]
+                with medir("serializacion"):
+                    lineas = "".join(
+                        json.dumps({"tipo": "fila", **fila}, ensure_ascii=False) + "\n"
+                        for fila in filas_tabla(columnas_bloque(bloque))
+                    )
+                yield lineas
+        except Exception as e:
+            yield json.dumps({"tipo": "error", **detalle_error(e)}, ensure_ascii=False) + "\n"
+            return
+        yield json.dumps({"tipo": "resultado", "resultado": float(factor) * h * suma,
+                          "evaluaciones": evaluaciones, "niveles_evaluacion": niveles_evaluacion()},
+                         ensure_ascii=False) + "\n"
+
+    return Response(stream_with_context(generar()), mimetype="application/x-ndjson")
+
+
+def responder_ndjson_regla(metodo, funcion, formato, a, b, n):
+    regla = REGLAS_NEWTON_COTES[metodo]
+    n = ajustar_n(n, regla["intervalos"], regla.get("ajuste_arriba", False))
+    validar_n(metodo, n)
+    if metodo == "boole":
+        patron, _ = coeficientes_newton_cotes(regla["intervalos"])
+
+        def columnas_bloque(bloque):
+            return columnas_segmentos(bloque["nodos"], bloque["valores"], patron,
+                                      bloque["puntos_panel"], bloque["primer_panel"] + 1)
+    elif regla["abierta"]:
+        def columnas_bloque(bloque):
+            return filas_bloque_puntos(bloque, columnas_puntos)
+    else:
+        def columnas_bloque(bloque):
+            return filas_bloque_puntos(bloque, columnas_newton_cotes)
+    encabezado = {"metodo": regla["nombre"], "formula": regla["formula"]}
+    return responder_ndjson(encabezado, funcion, formato, a, b, n, regla["intervalos"], regla["abierta"], columnas_bloque)
+
 
 # 1. Método del Trapecio    
-@app.route('/trapecio', methods=['POST'])
+@app.route('/trapecio', methods=['GET', 'POST'])
+@con_etag
 def metodo_trapecio():
     try:
-        data = request.get_json()
-        funcion = data.get('funcion')
-        formato = data.get('formato', 'python')  # Por defecto 'python', también acepta 'latex'
-        a = float(data.get('a'))  # Límite inferior
-        b = float(data.get('b'))  # Límite superior
-        n = int(data.get('n', 10))  # Número de subintervalos
+        data = leer_datos()
+        if es_barrido(data):
+            return responder_barrido("trapecio", data)
+        funcion, formato, a, b, n = leer_parametros(data, 10)
         
         if not funcion:
             return jsonify({"error": "Falta la función"}), 400
+        if quiere_ndjson():
+            return responder_ndjson_regla("trapecio", funcion, formato, a, b, n)
         
-        h = (b - a) / n
-        
-        # Crear tabla de iteración
-        tabla_iteracion = []
-        
-        # Agregar los extremos (a y b) a la tabla
-        fa = evaluar_funcion(funcion, a, formato)
-        fb = evaluar_funcion(funcion, b, formato)
-        
-        tabla_iteracion.append({
-            "i": 0,
-            "xi": a,
-            "f(xi)": fa,
-            "coeficiente": 1,
-            "f(xi) * coef": fa
-        })
-        
-        suma = fa
-        # Calcular f(xi) para cada punto intermedio
-        for i in range(1, n):
-            x = a + i * h
-            valor = evaluar_funcion(funcion, x, formato)
-            coef = 2  # En el método del trapecio, todos los puntos intermedios tienen coeficiente 2
-            suma += coef * valor
-            
-            tabla_iteracion.append({
-                "i": i,
-                "xi": x,
-                "f(xi)": valor,
-                "coeficiente": coef,
-                "f(xi) * coef": coef * valor
-            })
-        
-        # Agregar el punto final a la tabla
-        tabla_iteracion.append({
-            "i": n,
-            "xi": b,
-            "f(xi)": fb,
-            "coeficiente": 1,
-            "f(xi) * coef": fb
-        })
-        
-        suma += fb
-        integral = (h/2) * suma
+        calculo = integrar_regla_cacheada("trapecio", funcion, formato, a, b, n, quiere_paralelo(data))
         
-        return jsonify({
-            "resultado": integral,
+        return responder_tabla({
+            "resultado": calculo["resultado"],
             "metodo": "Trapecio",
             "funcion": funcion,
             "formato": formato,
             "a": a,
             "b": b,
-            "n": n,
-            "h": h,
-            "tabla_iteracion": tabla_iteracion,
-            "formula": "(h/2) * [f(a) + 2*f(x1) + 2*f(x2) + ... + 2*f(xn-1) + f(b)]"
-        })
+            "n": calculo["n"],
+            "h": calculo["h"],
+            "formula": REGLAS_NEWTON_COTES["trapecio"]["formula"]
+        }, columnas_newton_cotes(calculo), data, ["f(xi) * coef"])
     except Exception as e:
-        return jsonify({"error": str(e)}), 400
+        return responder_error(e)
 
 # 2. Método de Jorge Boole
-@app.route('/boole', methods=['POST'])
+@app.route('/boole', methods=['GET', 'POST'])
+@con_etag
 def metodo_boole():
     try:
-        data = request.get_json()
-        funcion = data.get('funcion')
-        formato = data.get('formato', 'python')  # Por defecto 'python', también acepta 'latex'
-        a = float(data.get('a'))  # Límite inferior
-        b = float(data.get('b'))  # Límite superior
-        n = int(data.get('n', 4))  # Número de subintervalos (múltiplo de 4)
+        data = leer_datos()
+        if es_barrido(data):
+            return responder_barrido("boole", data)
+        funcion, formato, a, b, n = leer_parametros(data, 4)
         
         if not funcion:
             return jsonify({"error": "Falta la función"}), 400
+        if quiere_ndjson():
+            return responder_ndjson_regla("boole", funcion, formato, a, b, n)
         
-        # Asegurar que n es múltiplo de 4
-        if n % 4 != 0:
-            n = (n // 4) * 4
-            if n == 0:
-                n = 4
-        
-        h = (b - a) / n
-        suma = 0
-        
-        # Crear tabla de iteración
-        tabla_iteracion = []
-        
-        # Aplicar fórmula de Boole: (2h/45)[7f(x₀) + 32f(x₁) + 12f(x₂) + 32f(x₃) + 7f(x₄)]
-        # Para múltiples segmentos
-        segmentos_tabla = []
-        
-        for j in range(0, n, 4):
-            x0 = a + j * h
-            x1 = a + (j + 1) * h
-            x2 = a + (j + 2) * h
-            x3 = a + (j + 3) * h
-            x4 = a + (j + 4) * h
-            
-            f0 = evaluar_funcion(funcion, x0, formato)
-            f1 = evaluar_funcion(funcion, x1, formato)
-            f2 = evaluar_funcion(funcion, x2, formato)
-            f3 = evaluar_funcion(funcion, x3, formato)
-            f4 = evaluar_funcion(funcion, x4, formato)
-            
-            # Agregar puntos a la tabla de iteración
-            tabla_iteracion.append({
-                "segmento": j // 4 + 1,
-                "punto": "x0",
-                "x": x0,
-                "f(x)": f0,
-                "coeficiente": 7,
-                "f(x) * coef": 7 * f0
-            })
-            
-            tabla_iteracion.append({
-                "segmento": j // 4 + 1,
-                "punto": "x1",
-                "x": x1,
-                "f(x)": f1,
-                "coeficiente": 32,
-                "f(x) * coef": 32 * f1
-            })
-            
-            tabla_iteracion.append({
-                "segmento": j // 4 + 1,
-                "punto": "x2",
-                "x": x2,
-                "f(x)": f2,
-                "coeficiente": 12,
-                "f(x) * coef": 12 * f2
-            })
-            
-            tabla_iteracion.append({
-                "segmento": j // 4 + 1,
-                "punto": "x3",
-                "x": x3,
-                "f(x)": f3,
-                "coeficiente": 32,
-                "f(x) * coef": 32 * f3
-            })
-            
-            tabla_iteracion.append({
-                "segmento": j // 4 + 1,
-                "punto": "x4",
-                "x": x4,
-                "f(x)": f4,
-                "coeficiente": 7,
-                "f(x) * coef": 7 * f4
-            })
-            
-            segmento = (2*h/45) * (7*f0 + 32*f1 + 12*f2 + 32*f3 + 7*f4)
-            suma += segmento
-            
-            segmentos_tabla.append({
-                "segmento": j // 4 + 1,
-                "intervalo": [x0, x4],
-                "valor": segmento
-            })
+        calculo = integrar_regla_cacheada("boole", funcion, formato, a, b, n, quiere_paralelo(data))
+        n, h = calculo["n"], calculo["h"]
         
-        return jsonify({
-            "resultado": suma,
+        # Valor de cada segmento: (2h/45)[7f(x₀) + 32f(x₁) + 12f(x₂) + 32f(x₃) + 7f(x₄)]
+        patron = np.array(calculo["patron"])
+        puntos_segmento = np.arange(0, n, 4)[:, None] + np.arange(5)
+        valores_segmento = float(calculo["factor"]) * h * (calculo["valores"][puntos_segmento] @ patron)
+        
+        columnas = columnas_segmentos(calculo["nodos"], calculo["valores"], calculo["patron"], puntos_segmento)
+        
+        segmentos = {
+            "segmento": np.arange(1, len(valores_segmento) + 1),
+            "intervalo": np.column_stack((calculo["nodos"][0:n:4], calculo["nodos"][4::4])),
+            "valor": valores_segmento
+        }
+        
+        return responder_tabla({
+            "resultado": calculo["resultado"],
             "metodo": "Jorge Boole",
             "funcion": funcion,
             "formato": formato,
@@ -248,229 +2270,83 @@ def metodo_boole():
             "b": b,
             "n": n,
             "h": h,
-            "tabla_iteracion": tabla_iteracion,
-            "segmentos": segmentos_tabla,
-            "formula": "(2h/45)[7f(x₀) + 32f(x₁) + 12f(x₂) + 32f(x₃) + 7f(x₄)]"
-        })
+            "formula": REGLAS_NEWTON_COTES["boole"]["formula"]
+        }, columnas, data, ["f(x) * coef"], segmentos)
     except Exception as e:
-        return jsonify({"error": str(e)}), 400
+        return responder_error(e)
 
 # 3. Método de Simpson 3/8
-@app.route('/simpson38', methods=['POST'])
+@app.route('/simpson38', methods=['GET', 'POST'])
+@con_etag
 def metodo_simpson38():
     try:
-        data = request.get_json()
-        funcion = data.get('funcion')
-        formato = data.get('formato', 'python')  # Por defecto 'python', también acepta 'latex'
-        a = float(data.get('a'))  # Límite inferior
-        b = float(data.get('b'))  # Límite superior
-        n = int(data.get('n', 3))  # Número de subintervalos (múltiplo de 3)
+        data = leer_datos()
+        if es_barrido(data):
+            return responder_barrido("simpson38", data)
+        funcion, formato, a, b, n = leer_parametros(data, 3)
         
         if not funcion:
             return jsonify({"error": "Falta la función"}), 400
+        if quiere_ndjson():
+            return responder_ndjson_regla("simpson38", funcion, formato, a, b, n)
         
-        # Asegurar que n es múltiplo de 3
-        if n % 3 != 0:
-            n = (n // 3) * 3
-            if n == 0:
-                n = 3
-        
-        h = (b - a) / n
-        
-        # Crear tabla de iteración
-        tabla_iteracion = []
-        
-        # Evaluar el extremo a
-        fa = evaluar_funcion(funcion, a, formato)
-        tabla_iteracion.append({
-            "i": 0,
-            "xi": a,
-            "f(xi)": fa,
-            "coeficiente": 1,
-            "f(xi) * coef": fa
-        })
-        
-        suma = fa
-        
-        # Sumar términos con coeficientes 3 (puntos con índice 1, 4, 7, ...)
-        for i in range(1, n, 3):
-            x = a + i * h
-            valor = evaluar_funcion(funcion, x, formato)
-            coef = 3
-            suma += coef * valor
-            
-            tabla_iteracion.append({
-                "i": i,
-                "xi": x,
-                "f(xi)": valor,
-                "coeficiente": coef,
-                "f(xi) * coef": coef * valor
-            })
-        
-        # Sumar términos con coeficientes 3 (puntos con índice 2, 5, 8, ...)
-        for i in range(2, n, 3):
-            x = a + i * h
-            valor = evaluar_funcion(funcion, x, formato)
-            coef = 3
-            suma += coef * valor
-            
-            tabla_iteracion.append({
-                "i": i,
-                "xi": x,
-                "f(xi)": valor,
-                "coeficiente": coef,
-                "f(xi) * coef": coef * valor
-            })
-        
-        # Sumar términos con coeficientes 2 (puntos con índice 3, 6, 9, ...)
-        for i in range(3, n, 3):
-            x = a + i * h
-            valor = evaluar_funcion(funcion, x, formato)
-            coef = 2
-            suma += coef * valor
-            
-            tabla_iteracion.append({
-                "i": i,
-                "xi": x,
-                "f(xi)": valor,
-                "coeficiente": coef,
-                "f(xi) * coef": coef * valor
-            })
-        
-        # Evaluar el extremo b
-        fb = evaluar_funcion(funcion, b, formato)
-        tabla_iteracion.append({
-            "i": n,
-            "xi": b,
-            "f(xi)": fb,
-            "coeficiente": 1,
-            "f(xi) * coef": fb
-        })
-        
-        suma += fb
-        integral = (3*h/8) * suma
-        
-        # Ordenar tabla por el índice i
-        tabla_iteracion.sort(key=lambda x: x["i"])
+        calculo = integrar_regla_cacheada("simpson38", funcion, formato, a, b, n, quiere_paralelo(data))
         
-        return jsonify({
-            "resultado": integral,
+        return responder_tabla({
+            "resultado": calculo["resultado"],
             "metodo": "Simpson 3/8",
             "funcion": funcion,
             "formato": formato,
             "a": a,
             "b": b,
-            "n": n,
-            "h": h,
-            "tabla_iteracion": tabla_iteracion,
-            "formula": "(3h/8) * [f(x0) + 3f(x1) + 3f(x2) + 2f(x3) + 3f(x4) + ... + f(xn)]"
-        })
+            "n": calculo["n"],
+            "h": calculo["h"],
+            "formula": REGLAS_NEWTON_COTES["simpson38"]["formula"]
+        }, columnas_newton_cotes(calculo), data, ["f(xi) * coef"])
     except Exception as e:
-        return jsonify({"error": str(e)}), 400
+        return responder_error(e)
 
 # 4. Método de Simpson 1/3
-@app.route('/simpson13', methods=['POST'])
+@app.route('/simpson13', methods=['GET', 'POST'])
+@con_etag
 def metodo_simpson13():
     try:
-        data = request.get_json()
-        funcion = data.get('funcion')
-        formato = data.get('formato', 'python')  # Por defecto 'python', también acepta 'latex'
-        a = float(data.get('a'))  # Límite inferior
-        b = float(data.get('b'))  # Límite superior
-        n = int(data.get('n', 2))  # Número de subintervalos (par)
+        data = leer_datos()
+        if es_barrido(data):
+            return responder_barrido("simpson13", data)
+        funcion, formato, a, b, n = leer_parametros(data, 2)
         
         if not funcion:
             return jsonify({"error": "Falta la función"}), 400
+        if quiere_ndjson():
+            return responder_ndjson_regla("simpson13", funcion, formato, a, b, n)
         
-        # Asegurar que n es par
-        if n % 2 != 0:
-            n += 1
-        
-        h = (b - a) / n
+        calculo = integrar_regla_cacheada("simpson13", funcion, formato, a, b, n, quiere_paralelo(data))
         
-        # Crear tabla de iteración
-        tabla_iteracion = []
-        
-        # Evaluar el extremo a
-        fa = evaluar_funcion(funcion, a, formato)
-        tabla_iteracion.append({
-            "i": 0,
-            "xi": a,
-            "f(xi)": fa,
-            "coeficiente": 1,
-            "f(xi) * coef": fa
-        })
-        
-        suma = fa
-        
-        # Sumar términos con coeficientes 4 (impares)
-        for i in range(1, n, 2):
-            x = a + i * h
-            valor = evaluar_funcion(funcion, x, formato)
-            coef = 4
-            suma += coef * valor
-            
-            tabla_iteracion.append({
-                "i": i,
-                "xi": x,
-                "f(xi)": valor,
-                "coeficiente": coef,
-                "f(xi) * coef": coef * valor
-            })
-        
-        # Sumar términos con coeficientes 2 (pares)
-        for i in range(2, n, 2):
-            x = a + i * h
-            valor = evaluar_funcion(funcion, x, formato)
-            coef = 2
-            suma += coef * valor
-            
-            tabla_iteracion.append({
-                "i": i,
-                "xi": x,
-                "f(xi)": valor,
-                "coeficiente": coef,
-                "f(xi) * coef": coef * valor
-            })
-        
-        # Evaluar el extremo b
-        fb = evaluar_funcion(funcion, b, formato)
-        tabla_iteracion.append({
-            "i": n,
-            "xi": b,
-            "f(xi)": fb,
-            "coeficiente": 1,
-            "f(xi) * coef": fb
-        })
-        
-        suma += fb
-        integral = (h/3) * suma
-        
-        # Ordenar tabla por el índice i
-        tabla_iteracion.sort(key=lambda x: x["i"])
-        
-        return jsonify({
-            "resultado": integral,
+        return responder_tabla({
+            "resultado": calculo["resultado"],
             "metodo": "Simpson 1/3",
             "funcion": funcion,
             "formato": formato,
             "a": a,
             "b": b,
-            "n": n,
-            "h": h,
-            "tabla_iteracion": tabla_iteracion,
-            "formula": "(h/3) * [f(x0) + 4f(x1) + 2f(x2) + 4f(x3) + ... + f(xn)]"
-        })
+            "n": calculo["n"],
+            "h": calculo["h"],
+            "formula": REGLAS_NEWTON_COTES["simpson13"]["formula"]
+        }, columnas_newton_cotes(calculo), data, ["f(xi) * coef"])
     except Exception as e:
-        return jsonify({"error": str(e)}), 400
+        return responder_error(e)
 
 # 5. Método de Simpson Abierto
-@app.route('/simpson_abierto', methods=['POST'])
+@app.route('/simpson_abierto', methods=['GET', 'POST'])
+@con_etag
 def metodo_simpson_abierto():
     try:
-        data = request.get_json()
+        data = leer_datos()
         if data is None:
             return jsonify({"error": "No se recibieron datos JSON válidos"}), 400
+        if es_barrido(data):
+            return responder_barrido("simpson_abierto", data)
 
         funcion = data.get('funcion')
         if not funcion:
@@ -482,43 +2358,563 @@ def metodo_simpson_abierto():
             b = float(data.get('b'))
         except (ValueError, TypeError):
             return jsonify({"error": "Los parámetros 'a' y 'b' deben ser números"}), 400
+        n = int(data.get('n', 4))  # Número de subintervalos (múltiplo de 4)
+        if quiere_ndjson():
+            return responder_ndjson_regla("simpson_abierto", funcion, formato, a, b, n)
 
         # ---- CÁLCULO DE SIMPSON ABIERTO 1/3 ----
-        h = (b - a) / 4.0
+        # Los extremos de cada panel de 4 subintervalos no se evalúan
+        calculo = integrar_regla_cacheada("simpson_abierto", funcion, formato, a, b, n, quiere_paralelo(data))
+
+        # Tabla de iteración (solo los puntos internos evaluados)
+        columnas = columnas_puntos(calculo)
+
+        return responder_tabla({
+            "resultado": calculo["resultado"],
+            "metodo": "Simpson Abierto 1/3",
+            "funcion": funcion,
+            "formato": formato,
+            "a": a,
+            "b": b,
+            "n": calculo["n"],
+            "h": calculo["h"],
+            "formula": REGLAS_NEWTON_COTES["simpson_abierto"]["formula"],
+        }, columnas, data)
+    except Exception as e:
+        return responder_error(e)
+
+# 6. Newton-Cotes de orden arbitrario
+@app.route('/newton_cotes', methods=['POST'])
+def metodo_newton_cotes():
+    try:
+        data = request.get_json()
+        funcion, formato, a, b, n = leer_parametros(data, 0)
+        puntos = int(data.get('puntos', 3))  # Puntos evaluados en cada panel
+        tipo = data.get('tipo', 'cerrada')  # 'cerrada' o 'abierta'
+        
+        if not funcion:
+            return jsonify({"error": "Falta la función"}), 400
+        if tipo not in ("cerrada", "abierta"):
+            return jsonify({"error": "El parámetro 'tipo' debe ser 'cerrada' o 'abierta'"}), 400
+        if not (1 if tipo == "abierta" else 2) <= puntos <= MAX_PUNTOS_NEWTON_COTES:
+            return jsonify({"error": f"El parámetro 'puntos' debe estar entre {1 if tipo == 'abierta' else 2} y {MAX_PUNTOS_NEWTON_COTES}"}), 400
+        
+        abierta = tipo == "abierta"
+        intervalos = puntos + 1 if abierta else puntos - 1
+        n = ajustar_n(n or intervalos, intervalos)
+        validar_n("newton_cotes", n)
+        if quiere_ndjson():
+            encabezado = {"metodo": f"Newton-Cotes {tipo} de {puntos} puntos"}
+            return responder_ndjson(encabezado, funcion, formato, a, b, n, intervalos, abierta,
+                                    lambda bloque: filas_bloque_puntos(bloque, columnas_newton_cotes))
+        calculo = integrar_newton_cotes(funcion, formato, a, b, n, intervalos, abierta, quiere_paralelo(data))
+        
+        patron, factor = calculo["patron"], calculo["factor"]
+        terminos = " + ".join(f"{c}f(x{i})" for i, c in enumerate(patron) if c != 0).replace("+ -", "- ")
+        
+        return responder_tabla({
+            "resultado": calculo["resultado"],
+            "metodo": f"Newton-Cotes {tipo} de {puntos} puntos",
+            "funcion": funcion,
+            "formato": formato,
+            "a": a,
+            "b": b,
+            "n": n,
+            "h": calculo["h"],
+            "coeficientes": list(patron),
+            "factor": str(factor),
+            "formula": f"({factor})h [{terminos}] en cada panel de {intervalos} subintervalos"
+        }, columnas_newton_cotes(calculo), data, ["f(xi) * coef"])
+    except Exception as e:
+        return responder_error(e)
+# Simpson adaptativo por niveles
+# En lugar de recursión punto a punto, en cada nivel se evalúan a la vez los
+# puntos medios nuevos de todos los subintervalos que aún no cumplen su
+# tolerancia, de modo que cada nivel es una sola llamada vectorizada.
+MAX_PROFUNDIDAD_ADAPTATIVO = 50
 
-        # Puntos internos
-        x1 = a + h
-        x2 = a + 2*h
-        x3 = a + 3*h
 
-        # Evaluación de la función
-        f1 = evaluar_funcion(funcion, x1, formato)
-        f2 = evaluar_funcion(funcion, x2, formato)
-        f3 = evaluar_funcion(funcion, x3, formato)
+def integrar_simpson_adaptativo(funcion, formato, a, b, tol, max_evaluaciones):
+    m = (a + b) / 2
+    fa, fm, fb = evaluar_funcion_vectorizada(funcion, [a, m, b], formato).tolist()
+    evaluaciones = 3
 
-        # Fórmula de Simpson abierto
-        integral = (4*h/3) * (2*f1 - f2 + 2*f3)
+    # Cada subintervalo activo: (a, b, f(a), f(m), f(b), simpson, tolerancia)
+    activos = [(a, b, fa, fm, fb, (b - a) / 6 * (fa + 4 * fm + fb), tol)]
+    aceptados = []
+    convergio = True
 
-        # Tabla de iteración (opcional, muestra solo 3 puntos)
-        tabla_iteracion = [
-            {"i": 1, "xi": x1, "f(xi)": f1},
-            {"i": 2, "xi": x2, "f(xi)": f2},
-            {"i": 3, "xi": x3, "f(xi)": f3},
-        ]
+    for profundidad in range(MAX_PROFUNDIDAD_ADAPTATIVO + 1):
+        if not activos:
+            break
+        if profundidad == MAX_PROFUNDIDAD_ADAPTATIVO or evaluaciones + 2 * len(activos) > max_evaluaciones:
+            # Sin presupuesto: se aceptan las estimaciones actuales tal como están
+            convergio = False
+            aceptados.extend((ai, bi, total, abs(total)) for ai, bi, _, _, _, total, _ in activos)
+            break
 
-        return jsonify({
-            "resultado": integral,
-            "metodo": "Simpson Abierto 1/3",
+        puntos = []
+        for ai, bi, _, _, _, _, _ in activos:
+            puntos.append((3 * ai + bi) / 4)
+            puntos.append((ai + 3 * bi) / 4)
+        try:
+            valores = evaluar_funcion_vectorizada(funcion, puntos, formato).tolist()
+        except PresupuestoExcedido as e:
+            e.parcial = {
+                "resultado": sum(valor for _, _, valor, _ in aceptados) + sum(total for *_, total, _ in activos),
+                "subintervalos_aceptados": len(aceptados),
+                "subintervalos_pendientes": len(activos)
+            }
+            raise
+        evaluaciones += len(puntos)
+
+        siguientes = []
+        for k, (ai, bi, fai, fmi, fbi, total, tol_i) in enumerate(activos):
+            fi, fd = valores[2 * k], valores[2 * k + 1]
+            mi = (ai + bi) / 2
+            izquierda = (mi - ai) / 6 * (fai + 4 * fi + fmi)
+            derecha = (bi - mi) / 6 * (fmi + 4 * fd + fbi)
+            delta = izquierda + derecha - total
+            if abs(delta) <= 15 * tol_i:
+                # Extrapolación de Richardson sobre las dos estimaciones de Simpson
+                aceptados.append((ai, bi, izquierda + derecha + delta / 15, abs(delta) / 15))
+            else:
+                siguientes.append((ai, mi, fai, fi, fmi, izquierda, tol_i / 2))
+                siguientes.append((mi, bi, fmi, fd, fbi, derecha, tol_i / 2))
+        activos = siguientes
+
+    aceptados.sort(key=lambda intervalo: intervalo[0])
+    return {
+        "resultado": sum(valor for _, _, valor, _ in aceptados),
+        "error_estimado": sum(error for _, _, _, error in aceptados),
+        "evaluaciones": evaluaciones,
+        "convergio": convergio,
+        "subintervalos": aceptados
+    }
+
+
+# 7. Método Adaptativo
+@app.route('/adaptativo', methods=['POST'])
+def metodo_adaptativo():
+    try:
+        data = request.get_json()
+        funcion = data.get('funcion')
+        formato = data.get('formato', 'python')  # Por defecto 'python', también acepta 'latex'
+        a = float(data.get('a'))  # Límite inferior
+        b = float(data.get('b'))  # Límite superior
+        tol = float(data.get('tol', 1e-8))  # Tolerancia absoluta
+        max_evaluaciones = int(data.get('max_evaluaciones', 10000))  # Presupuesto de evaluaciones
+        
+        if not funcion:
+            return jsonify({"error": "Falta la función"}), 400
+        if tol <= 0:
+            return jsonify({"error": "La tolerancia 'tol' debe ser positiva"}), 400
+        if max_evaluaciones < 3:
+            return jsonify({"error": "'max_evaluaciones' debe ser al menos 3"}), 400
+        
+        validar_n("adaptativo", max_evaluaciones)
+        calculo = integrar_simpson_adaptativo(funcion, formato, a, b, tol, max_evaluaciones)
+        
+        subintervalos = calculo["subintervalos"]
+        columnas = {
+            "intervalo": [[ai, bi] for ai, bi, _, _ in subintervalos],
+            "valor": [valor for _, _, valor, _ in subintervalos],
+            "error_estimado": [error for _, _, _, error in subintervalos]
+        }
+        
+        return responder_tabla({
+            "resultado": calculo["resultado"],
+            "metodo": "Simpson Adaptativo",
             "funcion": funcion,
             "formato": formato,
             "a": a,
             "b": b,
-            "h": h,
-            "tabla_iteracion": tabla_iteracion,
-            "formula": "(4h/3) [2f(x₁) - f(x₂) + 2f(x₃)]",
+            "tol": tol,
+            "max_evaluaciones": max_evaluaciones,
+            "evaluaciones": calculo["evaluaciones"],
+            "error_estimado": calculo["error_estimado"],
+            "convergio": calculo["convergio"],
+            "formula": "S(a,b) = (b-a)/6 [f(a) + 4f(m) + f(b)]; se divide [a,b] mientras |S(a,m) + S(m,b) - S(a,b)| > 15·tol"
+        }, columnas, data, ["valor", "error_estimado"])
+    except Exception as e:
+        return responder_error(e)
+
+# Tabla de nodos y pesos de Gauss-Legendre en [-1, 1], calculada una sola
+# vez por orden y compartida por todo el proceso
+MAX_ORDEN_GAUSS = 100
+
+
+@lru_cache(maxsize=None)
+def nodos_gauss_legendre(orden):
+    nodos, pesos = np.polynomial.legendre.leggauss(orden)
+    nodos.flags.writeable = False
+    pesos.flags.writeable = False
+    return nodos, pesos
+
+
+def integrar_gauss_legendre(funcion, formato, a, b, orden, paneles, paralelo=False):
+    t, w = nodos_gauss_legendre(orden)
+    # Trasladar los nodos de [-1, 1] a cada panel [x_j, x_j+1]
+    bordes = np.linspace(a, b, paneles + 1)
+    centros = (bordes[:-1] + bordes[1:]) / 2
+    semianchos = (bordes[1:] - bordes[:-1]) / 2
+    nodos = (centros[:, None] + semianchos[:, None] * t).ravel()
+    pesos = (semianchos[:, None] * w).ravel()
+
+    valores, suma = evaluar_ponderado(funcion, formato, nodos, pesos, paralelo)
+    return {
+        "resultado": suma,
+        "h": (b - a) / paneles,
+        "nodos": nodos,
+        "pesos": pesos,
+        "valores": valores
+    }
+
+
+# 8. Método de Gauss-Legendre
+@app.route('/gauss_legendre', methods=['POST'])
+def metodo_gauss_legendre():
+    try:
+        data = request.get_json()
+        funcion = data.get('funcion')
+        formato = data.get('formato', 'python')  # Por defecto 'python', también acepta 'latex'
+        a = float(data.get('a'))  # Límite inferior
+        b = float(data.get('b'))  # Límite superior
+        orden = int(data.get('orden', 5))  # Puntos de Gauss por panel
+        paneles = int(data.get('paneles', 1))  # Número de paneles compuestos
+        
+        if not funcion:
+            return jsonify({"error": "Falta la función"}), 400
+        if not 1 <= orden <= MAX_ORDEN_GAUSS:
+            return jsonify({"error": f"El parámetro 'orden' debe estar entre 1 y {MAX_ORDEN_GAUSS}"}), 400
+        if paneles < 1:
+            return jsonify({"error": "El parámetro 'paneles' debe ser positivo"}), 400
+        
+        validar_n("gauss_legendre", orden * paneles)
+        calculo = integrar_gauss_legendre(funcion, formato, a, b, orden, paneles, quiere_paralelo(data))
+        
+        puntos = np.arange(orden * paneles)
+        columnas = {
+            "panel": puntos // orden + 1,
+            "i": puntos % orden + 1,
+            "xi": calculo["nodos"],
+            "f(xi)": calculo["valores"],
+            "peso": calculo["pesos"],
+            "f(xi) * peso": calculo["pesos"] * calculo["valores"]
+        }
+        
+        return responder_tabla({
+            "resultado": calculo["resultado"],
+            "metodo": "Gauss-Legendre",
+            "funcion": funcion,
+            "formato": formato,
+            "a": a,
+            "b": b,
+            "orden": orden,
+            "paneles": paneles,
+            "n": orden * paneles,
+            "h": calculo["h"],
+            "formula": "I = Σ (h/2) Σ wᵢ f(c + (h/2)tᵢ), con tᵢ, wᵢ los nodos y pesos de Legendre de cada panel de centro c"
+        }, columnas, data, ["f(xi) * peso"])
+    except Exception as e:
+        return responder_error(e)
+
+# Romberg: trapecios sobre mallas anidadas (solo se evalúan los puntos medios
+# nuevos de cada nivel) con extrapolación de Richardson
+MAX_NIVELES_ROMBERG = 20
+
+
+def integrar_romberg(funcion, formato, a, b, tol, max_niveles):
+    fa, fb = evaluar_funcion_vectorizada(funcion, [a, b], formato).tolist()
+    evaluaciones = 2
+    romberg = [[(b - a) / 2 * (fa + fb)]]
+    niveles = [{"nivel": 0, "n": 1, "h": b - a, "trapecio": romberg[0][0], "nuevas_evaluaciones": 2}]
+    convergio = False
+    error = None
+
+    for k in range(1, max_niveles + 1):
+        h = (b - a) / 2 ** k
+        # Puntos medios de la malla anterior: a + (2i - 1)h, i = 1..2^(k-1)
+        nuevos = a + h * np.arange(1, 2 ** k, 2)
+        try:
+            valores = evaluar_funcion_vectorizada(funcion, nuevos, formato)
+        except PresupuestoExcedido as e:
+            e.parcial = {"resultado": romberg[-1][-1], "error_estimado": error, "niveles": k - 1}
+            raise
+        evaluaciones += len(nuevos)
+
+        fila = [romberg[k - 1][0] / 2 + h * float(np.sum(valores))]
+        for j in range(1, k + 1):
+            fila.append(fila[j - 1] + (fila[j - 1] - romberg[k - 1][j - 1]) / (4 ** j - 1))
+        romberg.append(fila)
+        niveles.append({"nivel": k, "n": 2 ** k, "h": h, "trapecio": fila[0], "nuevas_evaluaciones": len(nuevos)})
+
+        error = abs(fila[k] - romberg[k - 1][k - 1])
+        if error <= tol:
+            convergio = True
+            break
+
+    return {
+        "resultado": romberg[-1][-1],
+        "error_estimado": error,
+        "evaluaciones": evaluaciones,
+        "convergio": convergio,
+        "tabla_romberg": romberg,
+        "niveles": niveles
+    }
+
+
+# 9. Método de Romberg
+@app.route('/romberg', methods=['POST'])
+def metodo_romberg():
+    try:
+        data = request.get_json()
+        funcion = data.get('funcion')
+        formato = data.get('formato', 'python')  # Por defecto 'python', también acepta 'latex'
+        a = float(data.get('a'))  # Límite inferior
+        b = float(data.get('b'))  # Límite superior
+        tol = float(data.get('tol', 1e-10))  # Tolerancia entre diagonales sucesivas
+        max_niveles = int(data.get('max_niveles', 16))  # Máximo de refinamientos (n = 2^nivel)
+        
+        if not funcion:
+            return jsonify({"error": "Falta la función"}), 400
+        if tol <= 0:
+            return jsonify({"error": "La tolerancia 'tol' debe ser positiva"}), 400
+        if not 1 <= max_niveles <= MAX_NIVELES_ROMBERG:
+            return jsonify({"error": f"El parámetro 'max_niveles' debe estar entre 1 y {MAX_NIVELES_ROMBERG}"}), 400
+        
+        calculo = integrar_romberg(funcion, formato, a, b, tol, max_niveles)
+        columnas = {
+            clave: [nivel[clave] for nivel in calculo["niveles"]]
+            for clave in ("nivel", "n", "h", "trapecio", "nuevas_evaluaciones")
+        }
+        
+        return responder_tabla({
+            "resultado": calculo["resultado"],
+            "metodo": "Romberg",
+            "funcion": funcion,
+            "formato": formato,
+            "a": a,
+            "b": b,
+            "n": calculo["niveles"][-1]["n"],
+            "h": calculo["niveles"][-1]["h"],
+            "tol": tol,
+            "evaluaciones": calculo["evaluaciones"],
+            "error_estimado": calculo["error_estimado"],
+            "convergio": calculo["convergio"],
+            "tabla_romberg": calculo["tabla_romberg"],
+            "formula": "R(k,0) = R(k-1,0)/2 + h Σ f(a + (2i-1)h);  R(k,j) = R(k,j-1) + [R(k,j-1) - R(k-1,j-1)] / (4^j - 1)"
+        }, columnas, data, ["nuevas_evaluaciones"])
+    except Exception as e:
+        return responder_error(e)
+
+# Comparación de reglas de Newton-Cotes sobre una malla compartida: f se
+# evalúa una sola vez y cada regla aplica sus pesos a los mismos valores
+def comparar_reglas(funcion, formato, a, b, n, metodos):
+    reglas = [REGLAS_NEWTON_COTES[metodo] for metodo in metodos]
+    # n debe ser múltiplo del tamaño de panel de todas las reglas pedidas
+    multiplo = lcm(*(regla["intervalos"] for regla in reglas))
+    n = ajustar_n(n, multiplo, hacia_arriba=True)
+    h = (b - a) / n
+    nodos = np.linspace(a, b, n + 1)
+
+    pesos_por_regla = []
+    for regla in reglas:
+        patron, factor = coeficientes_newton_cotes(regla["intervalos"], regla["abierta"])
+        pesos_por_regla.append((pesos_compuestos(patron, n), factor))
+
+    # Solo se evalúan los nodos que usa al menos una de las reglas
+    usados = np.zeros(n + 1, dtype=bool)
+    for pesos, _ in pesos_por_regla:
+        usados |= pesos != 0
+    indices = np.flatnonzero(usados)
+    valores = np.zeros(n + 1)
+    valores[indices] = evaluar_funcion_vectorizada(funcion, nodos[indices], formato)
+
+    resultados = [
+        {
+            "metodo": metodo,
+            "nombre": regla["nombre"],
+            "resultado": float(factor) * h * float(np.dot(pesos, valores)),
+            "puntos_usados": int(np.count_nonzero(pesos))
+        }
+        for metodo, regla, (pesos, factor) in zip(metodos, reglas, pesos_por_regla)
+    ]
+    return {
+        "resultados": resultados,
+        "n": n,
+        "h": h,
+        "indices": indices,
+        "nodos": nodos[indices],
+        "valores": valores[indices]
+    }
+
+
+# 10. Comparación de métodos
+@app.route('/comparar', methods=['POST'])
+def comparar_metodos():
+    try:
+        data = request.get_json()
+        funcion, formato, a, b, n = leer_parametros(data, 12)
+        metodos = data.get('metodos', ["trapecio", "simpson13", "simpson38", "boole"])
+        
+        if not funcion:
+            return jsonify({"error": "Falta la función"}), 400
+        if not isinstance(metodos, list) or not metodos:
+            return jsonify({"error": "'metodos' debe ser una lista no vacía"}), 400
+        desconocidos = [metodo for metodo in metodos if metodo not in REGLAS_NEWTON_COTES]
+        if desconocidos:
+            return jsonify({"error": f"Métodos desconocidos: {', '.join(map(str, desconocidos))}. Disponibles: {', '.join(REGLAS_NEWTON_COTES)}"}), 400
+        
+        validar_n("comparar", n)
+        calculo = comparar_reglas(funcion, formato, a, b, n, metodos)
+        
+        columnas = columnas_puntos(calculo)
+        
+        return responder_tabla({
+            "resultados": calculo["resultados"],
+            "metodo": "Comparación",
+            "funcion": funcion,
+            "formato": formato,
+            "a": a,
+            "b": b,
+            "n": calculo["n"],
+            "h": calculo["h"],
+            "evaluaciones": len(calculo["indices"])
+        }, columnas, data)
+    except Exception as e:
+        return responder_error(e)
+
+# Lote de trabajos agrupados por expresión: cada expresión se compila una
+# vez y todos los nodos de sus trabajos se evalúan en una sola pasada
+MAX_TRABAJOS_LOTE = 10000
+
+
+def preparar_trabajo(trabajo):
+    if not isinstance(trabajo, dict):
+        raise ValueError("Cada trabajo debe ser un objeto JSON")
+    metodo = trabajo.get('metodo')
+    if metodo not in REGLAS_NEWTON_COTES:
+        raise ValueError(f"Método desconocido: {metodo}. Disponibles: {', '.join(REGLAS_NEWTON_COTES)}")
+    funcion, formato, a, b, n = leer_parametros(trabajo, REGLAS_NEWTON_COTES[metodo]["n_defecto"])
+    if not funcion:
+        raise ValueError("Falta la función")
+    validar_n(metodo, n)
+    return metodo, funcion, formato, a, b, malla_regla(metodo, a, b, n)
+
+
+def resolver_lote(trabajos):
+    resultados = [None] * len(trabajos)
+    grupos = {}
+    for k, trabajo in enumerate(trabajos):
+        try:
+            metodo, funcion, formato, a, b, calculo = preparar_trabajo(trabajo)
+        except Exception as e:
+            resultados[k] = {"error": str(e)}
+            continue
+        grupos.setdefault((funcion, formato), []).append((k, metodo, calculo))
+
+    evaluaciones = 0
+    for (funcion, formato), miembros in grupos.items():
+        # Solo cuentan las evaluaciones cuyos valores se usan: si la pasada
+        # conjunta falla, se descartan sus contadores
+        antes = instantanea_medicion()
+        try:
+            todos = np.concatenate([calculo["nodos"] for _, _, calculo in miembros])
+            valores = np.split(
+                evaluar_funcion_vectorizada(funcion, todos, formato),
+                np.cumsum([len(calculo["nodos"]) for _, _, calculo in miembros])[:-1]
+            )
+            evaluaciones += len(todos)
+        except PresupuestoExcedido:
+            raise
+        except Exception:
+            # Algún trabajo del grupo falla: se evalúan por separado para
+            # que el error quede solo en los trabajos afectados
+            restaurar_medicion(antes)
+            valores = []
+            for _, _, calculo in miembros:
+                antes = instantanea_medicion()
+                try:
+                    valores.append(evaluar_funcion_vectorizada(funcion, calculo["nodos"], formato))
+                    evaluaciones += len(calculo["nodos"])
+                except PresupuestoExcedido:
+                    raise
+                except Exception as e:
+                    restaurar_medicion(antes)
+                    valores.append(e)
+
+        for (k, metodo, calculo), valores_trabajo in zip(miembros, valores):
+            if isinstance(valores_trabajo, Exception):
+                resultados[k] = detalle_error(valores_trabajo)
+                continue
+            aplicar_pesos(calculo, valores_trabajo)
+            resultados[k] = {
+                "resultado": calculo["resultado"],
+                "metodo": metodo,
+                "n": calculo["n"],
+                "h": calculo["h"]
+            }
+
+    return {"resultados": resultados, "grupos": len(grupos), "evaluaciones": evaluaciones}
+
+
+# 11. Lote de integrales
+@app.route('/lote', methods=['POST'])
+def integrar_lote():
+    try:
+        data = request.get_json()
+        trabajos = data.get('trabajos')
+        
+        if not isinstance(trabajos, list) or not trabajos:
+            return jsonify({"error": "'trabajos' debe ser una lista no vacía"}), 400
+        if len(trabajos) > MAX_TRABAJOS_LOTE:
+            return jsonify({"error": f"El lote admite como máximo {MAX_TRABAJOS_LOTE} trabajos"}), 400
+        
+        lote = resolver_lote(trabajos)
+        
+        return jsonify({
+            "resultados": lote["resultados"],
+            "trabajos": len(trabajos),
+            "errores": sum(1 for resultado in lote["resultados"] if "error" in resultado),
+            "grupos": lote["grupos"],
+            "evaluaciones": lote["evaluaciones"],
+            "niveles_evaluacion": niveles_evaluacion()
         })
     except Exception as e:
-        return jsonify({"error": str(e)}), 400
+        return responder_error(e)
+
+# Endpoint con las estadísticas de las cachés (GET) y para vaciarlas (DELETE)
+# Vaciarlas requiere la cabecera 'Authorization: Bearer <TOKEN_CACHE>'; sin
+# la variable de entorno TOKEN_CACHE el vaciado está deshabilitado.
+TOKEN_CACHE = os.environ.get("TOKEN_CACHE")
+
+
+def autorizado_vaciar_cache():
+    credencial = request.headers.get("Authorization", "")
+    return credencial.startswith("Bearer ") and hmac.compare_digest(
+        credencial[len("Bearer "):].encode("utf-8"), TOKEN_CACHE.encode("utf-8"))
+
+
+@app.route('/cache', methods=['GET', 'DELETE'])
+def estadisticas_cache():
+    if request.method == 'DELETE':
+        if not TOKEN_CACHE:
+            return jsonify({"error": "El vaciado de las cachés está deshabilitado en este servidor"}), 403
+        if not autorizado_vaciar_cache():
+            respuesta = jsonify({"error": "Se requiere un token válido para vaciar las cachés"})
+            respuesta.headers["WWW-Authenticate"] = "Bearer"
+            return respuesta, 401
+        cache_funciones.limpiar()
+        cache_resultados.limpiar()
+        if cache_disco is not None:
+            cache_disco.limpiar()
+    return jsonify({
+        "funciones_compiladas": cache_funciones.estadisticas(),
+        "resultados": cache_resultados.estadisticas(),
+        "disco": cache_disco.estadisticas() if cache_disco is not None else None
+    })
+
 # Endpoint para obtener información de los métodos disponibles
 @app.route('/metodos', methods=['GET'])
 def obtener_metodos():
@@ -563,6 +2959,54 @@ def obtener_metodos():
                 "formula": "I = 3h[f(x₁) + 2f(x₂) + f(x₃) + 2f(x₄) + ... ]",
                 "formato_soportado": ["python", "latex"],
                 "tabla_iteracion": "Incluye detalles de los puntos internos evaluados (los extremos no se evalúan en este método)"
+            },
+            {
+                "nombre": "Newton-Cotes",
+                "endpoint": "/newton_cotes",
+                "descripcion": "Regla compuesta de Newton-Cotes cerrada o abierta con el número de puntos por panel indicado en 'puntos'",
+                "formula": "I = factor·h[c₀f(x₀) + c₁f(x₁) + ... + cₘf(xₘ)] en cada panel",
+                "formato_soportado": ["python", "latex"],
+                "tabla_iteracion": "Incluye detalles de cada punto evaluado con su coeficiente compuesto"
+            },
+            {
+                "nombre": "Simpson Adaptativo",
+                "endpoint": "/adaptativo",
+                "descripcion": "Simpson adaptativo que refina solo donde la estimación de error supera la tolerancia 'tol', con un presupuesto 'max_evaluaciones'",
+                "formula": "S(a,b) = (b-a)/6 [f(a) + 4f(m) + f(b)], refinado hasta |S(a,m) + S(m,b) - S(a,b)| ≤ 15·tol",
+                "formato_soportado": ["python", "latex"],
+                "tabla_iteracion": "Incluye los subintervalos aceptados con su valor y error estimado"
+            },
+            {
+                "nombre": "Gauss-Legendre",
+                "endpoint": "/gauss_legendre",
+                "descripcion": "Cuadratura de Gauss-Legendre de 'orden' puntos, opcionalmente compuesta en 'paneles' subintervalos",
+                "formula": "I = (h/2) Σ wᵢ f(c + (h/2)tᵢ) en cada panel",
+                "formato_soportado": ["python", "latex"],
+                "tabla_iteracion": "Incluye el panel, el nodo, f(x), el peso y el producto de cada punto evaluado"
+            },
+            {
+                "nombre": "Romberg",
+                "endpoint": "/romberg",
+                "descripcion": "Trapecios sobre mallas anidadas con extrapolación de Richardson hasta alcanzar la tolerancia 'tol'",
+                "formula": "R(k,j) = R(k,j-1) + [R(k,j-1) - R(k-1,j-1)] / (4^j - 1)",
+                "formato_soportado": ["python", "latex"],
+                "tabla_iteracion": "Incluye cada nivel de refinamiento con su trapecio y las evaluaciones nuevas; la tabla de Romberg completa va en 'tabla_romberg'"
+            },
+            {
+                "nombre": "Comparación",
+                "endpoint": "/comparar",
+                "descripcion": "Aplica varios métodos de Newton-Cotes ('metodos') sobre una misma malla, evaluando la función una sola vez",
+                "formula": "n se ajusta al mínimo común múltiplo de los paneles de los métodos pedidos",
+                "formato_soportado": ["python", "latex"],
+                "tabla_iteracion": "Incluye cada punto de la malla compartida con su valor de x y f(x)"
+            },
+            {
+                "nombre": "Lote",
+                "endpoint": "/lote",
+                "descripcion": "Resuelve una lista de 'trabajos' (metodo, funcion, formato, a, b, n) agrupándolos por expresión",
+                "formula": "Cada trabajo usa la fórmula de su método de Newton-Cotes",
+                "formato_soportado": ["python", "latex"],
+                "tabla_iteracion": "No incluye tabla; cada trabajo devuelve su resultado o su propio error"
             }
         ],
         "formatos": {
@@ -583,12 +3027,66 @@ def obtener_metodos():
             "formato": "Formato de la función (python o latex)",
             "a": "Límite inferior",
             "b": "Límite superior",
-            "n": "Número de subintervalos",
-            "h": "Tamaño del paso",
+            "n": "Número de subintervalos (en Gauss-Legendre, total de puntos evaluados)",
+            "h": "Tamaño del paso (en Gauss-Legendre, ancho de cada panel)",
             "tabla_iteracion": "Tabla con los detalles de cada punto evaluado durante el cálculo",
             "formula": "Fórmula matemática aplicada"
         }
     })
 
+# Métricas agregadas de las rutas de integración en formato Prometheus
+@app.route('/metricas', methods=['GET'])
+def exponer_metricas():
+    return Response(metricas.texto(), content_type="text/plain; version=0.0.4; charset=utf-8")
+
+# Endpoint con el desglose del tiempo de arranque
+@app.route('/arranque', methods=['GET'])
+def informacion_arranque():
+    return jsonify({
+        "tiempos": TIEMPOS_ARRANQUE,
+        "sympy_cargado": _modulos_sympy is not None,
+        "parser_latex_cargado": _parser_latex is not None,
+        "precalentamiento": PRECALENTAMIENTO
+    })
+
+
+# Precalentamiento opcional: compila al arrancar las expresiones de la
+# variable de entorno PRECALENTAR_EXPRESIONES, una lista JSON de cadenas
+# (formato python) u objetos {"funcion": ..., "formato": ...}. Si incluye
+# alguna expresión LaTeX, sympy se importa aquí y no en la primera petición.
+def precalentar(expresiones):
+    resultados = []
+    for expresion in expresiones:
+        if not isinstance(expresion, dict):
+            expresion = {"funcion": expresion}
+        funcion = expresion.get("funcion")
+        formato = expresion.get("formato", "python")
+        inicio = time.perf_counter()
+        try:
+            obtener_funcion_compilada(funcion, formato)
+            error = None
+        except Exception as e:
+            error = str(e)
+        resultados.append({
+            "funcion": funcion,
+            "formato": formato,
+            "segundos": time.perf_counter() - inicio,
+            "error": error
+        })
+    return resultados
+
+
+PRECALENTAMIENTO = []
+# Los trabajadores de evaluación importan este módulo: no repiten el precalentamiento
+if os.environ.get("PRECALENTAR_EXPRESIONES") and multiprocessing.parent_process() is None:
+    _inicio_precalentamiento = time.perf_counter()
+    try:
+        PRECALENTAMIENTO = precalentar(json.loads(os.environ["PRECALENTAR_EXPRESIONES"]))
+    except ValueError as e:
+        PRECALENTAMIENTO = [{"error": f"PRECALENTAR_EXPRESIONES no es una lista JSON válida: {str(e)}"}]
+    TIEMPOS_ARRANQUE["precalentamiento"] = time.perf_counter() - _inicio_precalentamiento
+
+TIEMPOS_ARRANQUE["carga_modulo"] = time.perf_counter() - _inicio_carga
+
 if __name__ == '__main__':
     app.run(debug=True)
\ No newline at end of file
@@ -0,0 +1,256 @@
+"""Reproducción de tráfico y prueba de carga.
+
+Lee uno o varios registros JSONL de peticiones y los reenvía a la aplicación,
+en el mismo proceso (cliente de pruebas de Flask) o contra un servidor local
+(--url). Cada línea describe una petición:
+
+    {"metodo": "POST", "ruta": "/simpson13", "json": {"funcion": "x**2", "a": 0, "b": 1, "n": 100}}
+    {"metodo": "GET", "ruta": "/trapecio", "query": {"funcion": "x**2", "a": 0, "b": 1}}
+    {"ruta": "/simpson38", "json": {...}, "cabeceras": {"Accept": "application/x-ndjson"}}
+
+'metodo' es POST por defecto (GET si solo hay 'query'). Las líneas sin 'ruta'
+se ignoran y se cuentan aparte. Los valores de 'query' que no son cadenas se
+codifican en JSON, igual que los lee la API.
+
+Uso:
+    python benchmarks/carga.py benchmarks/trafico_ejemplo.jsonl --concurrencia 8 --duracion 30
+    python benchmarks/carga.py registro.jsonl --url http://127.0.0.1:5000 --tasa 50
+
+Informa, por ruta y en total, peticiones, errores (estado >= 400 o fallo de
+conexión), rendimiento en peticiones por segundo y latencia p50/p95/p99.
+"""
+import argparse
+import http.client
+import json
+import os
+import sys
+import threading
+import time
+from urllib.parse import urlencode, urlsplit
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def leer_registro(rutas_archivos):
+    peticiones = []
+    ignoradas = 0
+    for ruta_archivo in rutas_archivos:
+        with open(ruta_archivo, encoding="utf-8") as archivo:
+            for linea in archivo:
+                linea = linea.strip()
+                if not linea:
+                    continue
+                try:
+                    entrada = json.loads(linea)
+                except ValueError:
+                    ignoradas += 1
+                    continue
+                if not isinstance(entrada, dict) or not isinstance(entrada.get("ruta"), str):
+                    ignoradas += 1
+                    continue
+                peticiones.append(preparar_peticion(entrada))
+    return peticiones, ignoradas
+
+
+def preparar_peticion(entrada):
+    ruta = entrada["ruta"]
+    query = entrada.get("query")
+    if query:
+        parametros = {clave: valor if isinstance(valor, str) else json.dumps(valor) for clave, valor in query.items()}
+        ruta += ("&" if "?" in ruta else "?") + urlencode(parametros)
+    cuerpo = entrada.get("json")
+    metodo = entrada.get("metodo") or ("GET" if cuerpo is None else "POST")
+    cabeceras = dict(entrada.get("cabeceras") or {})
+    if cuerpo is not None:
+        cabeceras.setdefault("Content-Type", "application/json")
+    return {
+        "metodo": metodo.upper(),
+        "ruta": ruta,
+        # Etiqueta para agrupar: la ruta sin query string
+        "etiqueta": ruta.split("?", 1)[0],
+        "cuerpo": json.dumps(cuerpo).encode("utf-8") if cuerpo is not None else None,
+        "cabeceras": cabeceras
+    }
+
+
+class ClienteLocal:
+    # Cliente de pruebas de Flask, uno por hilo
+    def __init__(self):
+        sys.path.insert(0, os.path.join(RAIZ, "api"))
+        import index
+        self.cliente = index.app.test_client()
+
+    def enviar(self, peticion):
+        respuesta = self.cliente.open(peticion["ruta"], method=peticion["metodo"],
+                                      data=peticion["cuerpo"], headers=peticion["cabeceras"])
+        return respuesta.status_code, len(respuesta.get_data())
+
+
+class ClienteHTTP:
+    # Conexión persistente (keep-alive) por hilo; se reabre si falla
+    def __init__(self, url, tiempo_limite):
+        partes = urlsplit(url)
+        self.host = partes.hostname
+        self.puerto = partes.port or (443 if partes.scheme == "https" else 80)
+        self.clase = http.client.HTTPSConnection if partes.scheme == "https" else http.client.HTTPConnection
+        self.prefijo = partes.path.rstrip("/")
+        self.tiempo_limite = tiempo_limite
+        self.conexion = None
+
+    def enviar(self, peticion):
+        if self.conexion is None:
+            self.conexion = self.clase(self.host, self.puerto, timeout=self.tiempo_limite)
+        try:
+            self.conexion.request(peticion["metodo"], self.prefijo + peticion["ruta"],
+                                  body=peticion["cuerpo"], headers=peticion["cabeceras"])
+            respuesta = self.conexion.getresponse()
+            return respuesta.status, len(respuesta.read())
+        except Exception:
+            self.conexion.close()
+            self.conexion = None
+            raise
+
+
+class Planificador:
+    # Reparte las peticiones del registro entre los hilos, en orden y en
+    # bucle si hay duración. Con 'tasa' cada petición tiene su instante de
+    # envío (i / tasa) y el hilo espera hasta ese momento.
+    def __init__(self, peticiones, tasa, duracion):
+        self.peticiones = peticiones
+        self.tasa = tasa
+        self.duracion = duracion
+        self._lock = threading.Lock()
+        self._siguiente = 0
+        self.inicio = None
+
+    def tomar(self):
+        with self._lock:
+            i = self._siguiente
+            self._siguiente += 1
+        if self.duracion is None and i >= len(self.peticiones):
+            return None
+        programada = self.inicio + i / self.tasa if self.tasa else None
+        if self.duracion is not None:
+            limite = self.inicio + self.duracion
+            if time.perf_counter() >= limite or (programada is not None and programada >= limite):
+                return None
+        if programada is not None:
+            espera = programada - time.perf_counter()
+            if espera > 0:
+                time.sleep(espera)
+        return self.peticiones[i % len(self.peticiones)]
+
+
+def percentil(valores, p):
+    # Percentil por rango más cercano
+    ordenados = sorted(valores)
+    return ordenados[max(int(-(-p * len(ordenados) // 100)) - 1, 0)]
+
+
+def resumir(muestras, segundos):
+    latencias = [latencia for latencia, _, _ in muestras]
+    errores = sum(1 for _, estado, _ in muestras if estado is None or estado >= 400)
+    estados = {}
+    for _, estado, _ in muestras:
+        clave = str(estado) if estado is not None else "conexion"
+        estados[clave] = estados.get(clave, 0) + 1
+    return {
+        "peticiones": len(muestras),
+        "errores": errores,
+        "tasa_error": errores / len(muestras),
+        "peticiones_por_segundo": len(muestras) / segundos if segundos > 0 else None,
+        "p50_ms": percentil(latencias, 50) * 1000,
+        "p95_ms": percentil(latencias, 95) * 1000,
+        "p99_ms": percentil(latencias, 99) * 1000,
+        "max_ms": max(latencias) * 1000,
+        "bytes_respuesta": sum(tamano for _, _, tamano in muestras),
+        "estados": estados
+    }
+
+
+def ejecutar(peticiones, crear_cliente, concurrencia, tasa, duracion):
+    planificador = Planificador(peticiones, tasa, duracion)
+    muestras = {}
+    lock_muestras = threading.Lock()
+
+    def trabajador(cliente):
+        propias = []
+        while True:
+            peticion = planificador.tomar()
+            if peticion is None:
+                break
+            inicio = time.perf_counter()
+            try:
+                estado, tamano = cliente.enviar(peticion)
+            except Exception:
+                estado, tamano = None, 0
+            propias.append((peticion["etiqueta"], time.perf_counter() - inicio, estado, tamano))
+        with lock_muestras:
+            for etiqueta, latencia, estado, tamano in propias:
+                muestras.setdefault(etiqueta, []).append((latencia, estado, tamano))
+
+    # Los clientes se crean antes de medir (el cliente local importa la app)
+    clientes = [crear_cliente() for _ in range(concurrencia)]
+    hilos = [threading.Thread(target=trabajador, args=(cliente,)) for cliente in clientes]
+    planificador.inicio = time.perf_counter()
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join()
+    segundos = time.perf_counter() - planificador.inicio
+
+    todas = [muestra for lista in muestras.values() for muestra in lista]
+    return {
+        "segundos": segundos,
+        "total": resumir(todas, segundos) if todas else None,
+        "rutas": {etiqueta: resumir(lista, segundos) for etiqueta, lista in sorted(muestras.items())}
+    }
+
+
+def imprimir(informe):
+    print(f"{'ruta':<20} {'peticiones':>10} {'errores':>8} {'pet/s':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    filas = list(informe["rutas"].items()) + ([("TOTAL", informe["total"])] if informe["total"] else [])
+    for etiqueta, datos in filas:
+        print(f"{etiqueta:<20} {datos['peticiones']:>10} {datos['errores']:>8} {datos['peticiones_por_segundo']:>9.1f} "
+              f"{datos['p50_ms']:>9.2f} {datos['p95_ms']:>9.2f} {datos['p99_ms']:>9.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Reproduce registros JSONL de peticiones contra la API")
+    parser.add_argument("registros", nargs="+", help="Archivos JSONL con una petición por línea")
+    parser.add_argument("--url", help="Servidor al que enviar las peticiones (por defecto, en el mismo proceso)")
+    parser.add_argument("--concurrencia", type=int, default=1, help="Hilos enviando peticiones a la vez")
+    parser.add_argument("--tasa", type=float, default=0, help="Peticiones por segundo en total (0 = sin límite)")
+    parser.add_argument("--duracion", type=float,
+                        help="Segundos de prueba repitiendo el registro en bucle (por defecto, una sola pasada)")
+    parser.add_argument("--tiempo-limite", type=float, default=60, help="Timeout de cada petición HTTP en segundos")
+    parser.add_argument("--salida", help="Archivo JSON donde guardar el informe")
+    args = parser.parse_args()
+
+    peticiones, ignoradas = leer_registro(args.registros)
+    if ignoradas:
+        print(f"Se ignoraron {ignoradas} líneas que no describen una petición")
+    if not peticiones:
+        print("El registro no contiene peticiones")
+        return 1
+
+    if args.url:
+        def crear_cliente():
+            return ClienteHTTP(args.url, args.tiempo_limite)
+    else:
+        crear_cliente = ClienteLocal
+
+    informe = ejecutar(peticiones, crear_cliente, max(args.concurrencia, 1), args.tasa, args.duracion)
+    informe["parametros"] = {
+        "registros": args.registros, "url": args.url, "concurrencia": args.concurrencia,
+        "tasa": args.tasa, "duracion": args.duracion
+    }
+    imprimir(informe)
+    if args.salida:
+        with open(args.salida, "w", encoding="utf-8") as archivo:
+            json.dump(informe, archivo, indent=2, ensure_ascii=False)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
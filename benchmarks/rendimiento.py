@@ -0,0 +1,217 @@
+"""Benchmark de las rutas de integración.
+
+Recorre las rutas clásicas con el cliente de pruebas de Flask sobre una
+matriz de formatos (python / latex), tipos de expresión (polinomio,
+trascendente y una que obliga a usar los niveles de respaldo) y valores de n.
+Por caso informa latencias (p50, p95, p99), evaluaciones por segundo,
+memoria pico y bytes de respuesta.
+
+Uso:
+    python benchmarks/rendimiento.py                    # compara con la línea base si existe
+    python benchmarks/rendimiento.py --guardar          # guarda la línea base
+    python benchmarks/rendimiento.py --n 10 1000 --rutas /trapecio
+
+Sale con código 1 si algún caso empeora más que --umbral respecto a la línea
+base (latencia p50 o memoria pico) o si cambia el resultado numérico.
+"""
+import argparse
+import gc
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(RAIZ, "api"))
+
+import numpy as np  # noqa: E402
+import index  # noqa: E402
+
+RUTAS = ["/trapecio", "/simpson13", "/simpson38", "/boole", "/simpson_abierto"]
+VALORES_N = [10, 1000, 100_000, 1_000_000]
+
+# (formato, tipo) -> (expresión, n máximo). Las expresiones de respaldo se
+# evalúan punto a punto, así que se limitan a mallas más pequeñas.
+EXPRESIONES = {
+    ("python", "polinomio"): ("x**3 - 2*x + 1", None),
+    ("python", "trascendente"): ("sin(x)*exp(-x/3) + cos(x)**2", None),
+    ("python", "respaldo"): ("x if x > 0.5 else x**2", 100_000),
+    ("latex", "polinomio"): ("x^{3} - 2x + 1", None),
+    ("latex", "trascendente"): ("\\sin(x) e^{-x/3} + \\cos^{2}(x)", None),
+    # \ln se traduce a log(x, E), que NumPy no admite: se resuelve con mpmath
+    ("latex", "respaldo"): ("\\sqrt{x}\\cdot\\ln(x+1)", 10_000),
+}
+
+A, B = 0.0, 2.0
+RUTA_BASE = os.path.join(RAIZ, "benchmarks", "linea_base.json")
+
+
+def percentil(valores, p):
+    # Percentil por rango más cercano
+    ordenados = sorted(valores)
+    return ordenados[max(int(np.ceil(p / 100 * len(ordenados))) - 1, 0)]
+
+
+def peticion(cliente, ruta, cuerpo):
+    # Cada repetición recalcula: solo se conserva la caché de funciones compiladas
+    index.cache_resultados.limpiar()
+    inicio = time.perf_counter()
+    respuesta = cliente.post(ruta, json=cuerpo)
+    datos = respuesta.get_data()
+    return time.perf_counter() - inicio, respuesta, datos
+
+
+def medir_caso(cliente, ruta, formato, funcion, n, repeticiones, tabla):
+    cuerpo = {"funcion": funcion, "formato": formato, "a": A, "b": B, "n": n, "tabla": tabla}
+
+    # Calentamiento: compila la expresión (y carga sympy en LaTeX)
+    _, respuesta, _ = peticion(cliente, ruta, cuerpo)
+    if respuesta.status_code != 200:
+        return {"error": respuesta.get_json().get("error"), "estado": respuesta.status_code}
+
+    latencias = []
+    for _ in range(repeticiones):
+        gc.collect()
+        segundos, respuesta, datos = peticion(cliente, ruta, cuerpo)
+        latencias.append(segundos)
+
+    # La memoria se mide aparte porque tracemalloc hace más lenta la petición
+    gc.collect()
+    tracemalloc.start()
+    peticion(cliente, ruta, cuerpo)
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    contenido = respuesta.get_json()
+    evaluaciones = sum((contenido.get("niveles_evaluacion") or {}).values())
+    p50 = percentil(latencias, 50)
+    return {
+        "resultado": contenido["resultado"],
+        "n": contenido["n"],
+        "evaluaciones": evaluaciones,
+        "niveles_evaluacion": contenido.get("niveles_evaluacion"),
+        "p50_ms": p50 * 1000,
+        "p95_ms": percentil(latencias, 95) * 1000,
+        "p99_ms": percentil(latencias, 99) * 1000,
+        "media_ms": float(np.mean(latencias)) * 1000,
+        "evaluaciones_por_segundo": evaluaciones / p50 if p50 > 0 else None,
+        "memoria_pico_bytes": pico,
+        "bytes_respuesta": len(datos)
+    }
+
+
+def ejecutar(rutas, formatos, tipos, valores_n, repeticiones, tabla):
+    cliente = index.app.test_client()
+    casos = {}
+    for ruta in rutas:
+        for formato in formatos:
+            for tipo in tipos:
+                funcion, n_maximo = EXPRESIONES[(formato, tipo)]
+                for n in valores_n:
+                    if n_maximo is not None and n > n_maximo:
+                        continue
+                    clave = f"{ruta} {formato} {tipo} n={n}"
+                    casos[clave] = medir_caso(cliente, ruta, formato, funcion, n, repeticiones, tabla)
+                    imprimir_caso(clave, casos[clave])
+    return casos
+
+
+def entorno():
+    try:
+        import importlib.metadata
+        version_sympy = importlib.metadata.version("sympy")
+    except Exception:
+        version_sympy = None
+    return {
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "sympy": version_sympy,
+        "plataforma": platform.platform(),
+        "procesador": platform.processor() or platform.machine()
+    }
+
+
+def imprimir_caso(clave, caso):
+    if "error" in caso:
+        print(f"{clave:<45} ERROR {caso['estado']}: {caso['error']}")
+        return
+    print(f"{clave:<45} p50 {caso['p50_ms']:10.3f} ms  p95 {caso['p95_ms']:10.3f} ms  "
+          f"p99 {caso['p99_ms']:10.3f} ms  {caso['evaluaciones_por_segundo'] or 0:14,.0f} eval/s  "
+          f"{caso['memoria_pico_bytes'] / 1024:10.1f} KiB  {caso['bytes_respuesta']:8d} B")
+
+
+def comparar(casos, base, umbral, tolerancia_ms):
+    regresiones = []
+    for clave, caso in casos.items():
+        anterior = base.get("casos", {}).get(clave)
+        if anterior is None or "error" in anterior:
+            continue
+        if "error" in caso:
+            regresiones.append(f"{clave}: ahora falla ({caso['error']})")
+            continue
+        if not np.isclose(caso["resultado"], anterior["resultado"], rtol=1e-9, atol=1e-12, equal_nan=True):
+            regresiones.append(f"{clave}: resultado {caso['resultado']!r} (antes {anterior['resultado']!r})")
+        # En latencia se ignoran diferencias absolutas menores que tolerancia_ms (ruido)
+        for metrica, minimo in (("p50_ms", tolerancia_ms), ("memoria_pico_bytes", 0)):
+            if caso[metrica] > anterior[metrica] * (1 + umbral) and caso[metrica] - anterior[metrica] > minimo:
+                regresiones.append(f"{clave}: {metrica} {caso[metrica]:.3f} (antes {anterior[metrica]:.3f}, "
+                                   f"+{(caso[metrica] / anterior[metrica] - 1) * 100:.0f}%)")
+    return regresiones
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de las rutas de integración")
+    parser.add_argument("--rutas", nargs="+", default=RUTAS)
+    parser.add_argument("--formatos", nargs="+", default=["python", "latex"], choices=["python", "latex"])
+    parser.add_argument("--tipos", nargs="+", default=["polinomio", "trascendente", "respaldo"],
+                        choices=["polinomio", "trascendente", "respaldo"])
+    parser.add_argument("--n", nargs="+", type=int, default=VALORES_N)
+    parser.add_argument("--repeticiones", type=int, default=5)
+    parser.add_argument("--tabla", default="none", choices=index.MODOS_TABLA,
+                        help="Modo de tabla pedido en cada petición (afecta a los bytes de respuesta)")
+    parser.add_argument("--base", default=RUTA_BASE, help="Archivo JSON con la línea base")
+    parser.add_argument("--guardar", action="store_true", help="Guarda los resultados como nueva línea base")
+    parser.add_argument("--umbral", type=float, default=0.25,
+                        help="Empeoramiento relativo tolerado en latencia p50 y memoria pico (0.25 = 25%%)")
+    parser.add_argument("--tolerancia-ms", type=float, default=1.0,
+                        help="Diferencia absoluta de latencia que nunca cuenta como regresión")
+    parser.add_argument("--salida", help="Archivo JSON donde guardar también los resultados de esta ejecución")
+    args = parser.parse_args()
+
+    resultados = {
+        "entorno": entorno(),
+        "parametros": {"a": A, "b": B, "repeticiones": args.repeticiones, "tabla": args.tabla},
+        "casos": ejecutar(args.rutas, args.formatos, args.tipos, args.n, args.repeticiones, args.tabla)
+    }
+    if args.salida:
+        with open(args.salida, "w", encoding="utf-8") as archivo:
+            json.dump(resultados, archivo, indent=2, ensure_ascii=False)
+
+    if args.guardar:
+        with open(args.base, "w", encoding="utf-8") as archivo:
+            json.dump(resultados, archivo, indent=2, ensure_ascii=False)
+        print(f"Línea base guardada en {args.base}")
+        return 0
+
+    if not os.path.exists(args.base):
+        print(f"No hay línea base en {args.base}; usa --guardar para crearla")
+        return 0
+    with open(args.base, encoding="utf-8") as archivo:
+        base = json.load(archivo)
+    if base.get("entorno") != resultados["entorno"]:
+        print("Aviso: la línea base se tomó en otro entorno", base.get("entorno"))
+
+    regresiones = comparar(resultados["casos"], base, args.umbral, args.tolerancia_ms)
+    if regresiones:
+        print(f"\n{len(regresiones)} regresiones respecto a la línea base:")
+        for regresion in regresiones:
+            print("  " + regresion)
+        return 1
+    print("\nSin regresiones respecto a la línea base")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,21 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "api"))
+
+import index  # noqa: E402
+
+
+@pytest.fixture(autouse=True)
+def caches_vacias():
+    # Cada prueba calcula desde cero: los resultados no vienen de otra prueba
+    index.cache_resultados.limpiar()
+    index.cache_funciones.limpiar()
+    yield
+
+
+@pytest.fixture
+def cliente():
+    return index.app.test_client()
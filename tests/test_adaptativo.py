@@ -0,0 +1,70 @@
+import math
+
+import pytest
+
+
+def adaptativo(cliente, **cuerpo):
+    return cliente.post("/adaptativo", json={"a": 0, "b": 1, **cuerpo})
+
+
+def simpson_recursivo(f, a, b, tol):
+    # Referencia clásica: recursión punto a punto con la misma regla de aceptación
+    def paso(a, b, fa, fm, fb, total, tol):
+        m = (a + b) / 2
+        fi, fd = f((a + m) / 2), f((m + b) / 2)
+        izquierda = (m - a) / 6 * (fa + 4 * fi + fm)
+        derecha = (b - m) / 6 * (fm + 4 * fd + fb)
+        delta = izquierda + derecha - total
+        if abs(delta) <= 15 * tol:
+            return izquierda + derecha + delta / 15
+        return paso(a, m, fa, fi, fm, izquierda, tol / 2) + paso(m, b, fm, fd, fb, derecha, tol / 2)
+
+    fa, fm, fb = f(a), f((a + b) / 2), f(b)
+    return paso(a, b, fa, fm, fb, (b - a) / 6 * (fa + 4 * fm + fb), tol)
+
+
+@pytest.mark.parametrize("funcion,formato,f,a,b", [
+    ("\\sqrt{x}", "latex", math.sqrt, 0, 1),
+    ("np.sin(10*x)", "python", lambda x: math.sin(10 * x), 0, 3),
+    ("e^{-x^{2}}", "latex", lambda x: math.exp(-x * x), -2, 2),
+])
+def test_coincide_con_la_recursion(cliente, funcion, formato, f, a, b):
+    datos = adaptativo(cliente, funcion=funcion, formato=formato, a=a, b=b, tol=1e-9).get_json()
+    assert datos["convergio"] is True
+    assert datos["resultado"] == pytest.approx(simpson_recursivo(f, a, b, 1e-9), abs=1e-12)
+
+
+def test_raiz_cuadrada(cliente):
+    datos = adaptativo(cliente, funcion="\\sqrt{x}", formato="latex", tol=1e-8).get_json()
+    assert datos["resultado"] == pytest.approx(2 / 3, abs=1e-8)
+    assert datos["evaluaciones"] < 10000
+    intervalos = [fila["intervalo"] for fila in datos["tabla_iteracion"]]
+    # Los subintervalos aceptados cubren [a, b] sin huecos
+    assert intervalos[0][0] == 0 and intervalos[-1][1] == 1
+    assert all(anterior[1] == siguiente[0] for anterior, siguiente in zip(intervalos, intervalos[1:]))
+    assert sum(fila["valor"] for fila in datos["tabla_iteracion"]) == pytest.approx(datos["resultado"])
+
+
+def test_polinomio_cubico_en_un_nivel(cliente):
+    datos = adaptativo(cliente, funcion="x**3", b=2).get_json()
+    assert datos["resultado"] == pytest.approx(4.0)
+    assert datos["evaluaciones"] == 5
+    assert len(datos["tabla_iteracion"]) == 1
+
+
+def test_presupuesto_de_evaluaciones_agotado(cliente):
+    datos = adaptativo(cliente, funcion="\\sqrt{x}", formato="latex", tol=1e-14, max_evaluaciones=20).get_json()
+    assert datos["convergio"] is False
+    assert datos["evaluaciones"] <= 20
+    assert datos["resultado"] == pytest.approx(2 / 3, abs=1e-2)
+
+
+@pytest.mark.parametrize("cuerpo,estado", [
+    ({"tol": 0}, 400),
+    ({"tol": -1e-8}, 400),
+    ({"max_evaluaciones": 2}, 400),
+    ({"max_evaluaciones": 10_000_000}, 422),
+    ({"funcion": ""}, 400),
+])
+def test_parametros_invalidos(cliente, cuerpo, estado):
+    assert adaptativo(cliente, **{"funcion": "x", **cuerpo}).status_code == estado
@@ -0,0 +1,58 @@
+import json
+import os
+import subprocess
+import sys
+
+import index
+
+API = os.path.dirname(os.path.abspath(index.__file__))
+
+
+def ejecutar(codigo, **entorno):
+    # Proceso nuevo: en el de pytest otras pruebas ya importaron sympy
+    salida = subprocess.run(
+        [sys.executable, "-c", "import sys; sys.path.insert(0, %r)\n" % API + codigo],
+        capture_output=True, text=True, timeout=120,
+        env={**os.environ, "EVALUACION_AISLADA": "0", **entorno}
+    )
+    assert salida.returncode == 0, salida.stderr
+    return json.loads(salida.stdout.strip().splitlines()[-1])
+
+
+def test_sympy_solo_se_importa_con_latex():
+    estados = ejecutar("""
+import json
+import index
+cliente = index.app.test_client()
+estados = ["sympy" in sys.modules]
+cliente.post("/trapecio", json={"funcion": "sin(x)", "a": 0, "b": 1, "n": 10})
+estados.append("sympy" in sys.modules)
+estados.append(cliente.get("/arranque").get_json()["sympy_cargado"])
+cliente.post("/trapecio", json={"funcion": "\\\\sin(x)", "formato": "latex", "a": 0, "b": 1, "n": 10})
+estados.append("sympy" in sys.modules)
+arranque = cliente.get("/arranque").get_json()
+estados += [arranque["sympy_cargado"], "importacion_sympy" in arranque["tiempos"]]
+print(json.dumps(estados))
+""")
+    assert estados == [False, False, False, True, True, True]
+
+
+def test_precalentamiento():
+    arranque = ejecutar("""
+import json
+import index
+print(json.dumps(index.app.test_client().get("/arranque").get_json()))
+""", PRECALENTAR_EXPRESIONES=json.dumps(["x**2", {"funcion": "\\frac{1}{x}", "formato": "latex"}, "x +"]))
+    assert arranque["sympy_cargado"]
+    assert "precalentamiento" in arranque["tiempos"]
+    assert [p["funcion"] for p in arranque["precalentamiento"]] == ["x**2", "\\frac{1}{x}", "x +"]
+    assert [p["error"] is None for p in arranque["precalentamiento"]] == [True, True, False]
+
+
+def test_precalentamiento_invalido():
+    arranque = ejecutar("""
+import json
+import index
+print(json.dumps(index.PRECALENTAMIENTO))
+""", PRECALENTAR_EXPRESIONES="no es json")
+    assert "no es una lista JSON válida" in arranque[0]["error"]
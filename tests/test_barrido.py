@@ -0,0 +1,64 @@
+import math
+
+import pytest
+
+import index
+
+CLASICOS = ["trapecio", "simpson13", "simpson38", "boole", "simpson_abierto"]
+
+
+def integrar(cliente, ruta, **cuerpo):
+    return cliente.post("/" + ruta, json={"funcion": "np.exp(x)", **cuerpo})
+
+
+@pytest.mark.parametrize("ruta", CLASICOS)
+def test_varios_intervalos_igual_que_uno_a_uno(cliente, ruta):
+    a, b = [0, 0.5, -1], [1, 2, 3]
+    datos = integrar(cliente, ruta, a=a, b=b, n=12).get_json()
+    assert datos["a"] == a and datos["b"] == b
+    assert "tabla_iteracion" not in datos
+    for ai, bi, resultado, h in zip(a, b, datos["resultados"], datos["h"]):
+        unico = integrar(cliente, ruta, a=ai, b=bi, n=12, tabla="none").get_json()
+        assert resultado == pytest.approx(unico["resultado"], rel=1e-13)
+        assert h == pytest.approx(unico["h"])
+        assert datos["n"] == unico["n"]
+
+
+def test_un_extremo_numerico_se_repite(cliente):
+    datos = integrar(cliente, "trapecio", a=0, b=[1, 2], n=10).get_json()
+    assert datos["a"] == [0.0, 0.0]
+    assert datos["evaluaciones"] == 22
+    assert datos["niveles_evaluacion"] == {"numpy": 22}
+
+
+@pytest.mark.parametrize("ruta", CLASICOS)
+def test_acumulado(cliente, ruta):
+    datos = integrar(cliente, ruta, a=0, b=2, n=24, acumulado=True).get_json()
+    assert datos["acumulado"] is True
+    assert datos["resultados"][0] == 0.0
+    assert len(datos["x"]) == len(datos["resultados"])
+    assert datos["x"][0] == 0.0 and datos["x"][-1] == 2.0
+    for x, resultado in zip(datos["x"], datos["resultados"]):
+        assert resultado == pytest.approx(math.exp(x) - 1, abs=5e-3)
+    total = integrar(cliente, ruta, a=0, b=2, n=24, tabla="none").get_json()["resultado"]
+    assert datos["resultados"][-1] == pytest.approx(total, rel=1e-13)
+
+
+def test_acumulado_por_paneles(cliente):
+    # Boole: un valor por cada panel de 4 subintervalos
+    datos = integrar(cliente, "boole", funcion="x**2", a=0, b=3, n=12, acumulado=True).get_json()
+    assert datos["x"] == [0.0, 1.0, 2.0, 3.0]
+    assert datos["resultados"] == pytest.approx([0.0, 1 / 3, 8 / 3, 9.0])
+    assert datos["evaluaciones"] == 13
+
+
+@pytest.mark.parametrize("a,b", [([0, 1], [1, 2, 3]), (["x"], [1]), ([], [])])
+def test_intervalos_invalidos(cliente, a, b):
+    assert integrar(cliente, "trapecio", a=a, b=b).status_code == 400
+
+
+def test_maximo_de_nodos_del_barrido(cliente, monkeypatch):
+    monkeypatch.setattr(index, "MAX_NODOS_BARRIDO", 100)
+    assert integrar(cliente, "trapecio", a=0, b=[1, 2], n=10).status_code == 200
+    assert integrar(cliente, "trapecio", a=0, b=[1] * 10, n=10).status_code == 400
+    assert integrar(cliente, "trapecio", a=0, b=1, n=200, acumulado=True).status_code == 400
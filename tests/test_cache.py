@@ -0,0 +1,203 @@
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+import index
+
+
+def esperar_vuelo(cache, clave, seguidores=0):
+    # Hasta que el líder esté construyendo y los demás hilos esperen su resultado
+    limite = time.monotonic() + 5
+    while time.monotonic() < limite:
+        with cache._lock:
+            vuelo = cache._en_curso.get(clave)
+            if vuelo is not None and vuelo.esperando >= seguidores:
+                return
+        time.sleep(0.005)
+    raise AssertionError("Los hilos no llegaron a coalescer")
+
+
+def coalescer(cache, clave, lider, seguidores):
+    lider.start()
+    esperar_vuelo(cache, clave)
+    for hilo in seguidores:
+        hilo.start()
+    esperar_vuelo(cache, clave, len(seguidores))
+
+
+def test_peticiones_simultaneas_construyen_una_vez():
+    cache = index.CacheLRU()
+    liberar = threading.Event()
+    llamadas = []
+
+    def construir():
+        llamadas.append(1)
+        liberar.wait(5)
+        return 42
+
+    resultados = []
+    hilos = [threading.Thread(target=lambda: resultados.append(cache.obtener("k", construir))) for _ in range(6)]
+    coalescer(cache, "k", hilos[0], hilos[1:])
+    liberar.set()
+    for hilo in hilos:
+        hilo.join(10)
+
+    assert resultados == [42] * 6
+    assert len(llamadas) == 1
+    estadisticas = cache.estadisticas()
+    assert estadisticas["coalescidas"] == 5
+    assert estadisticas["max_esperando"] == 5
+    assert estadisticas["fallos"] == 1
+    assert cache.obtener("k", construir) == 42
+    assert len(llamadas) == 1
+
+
+def test_el_error_se_comparte_con_los_que_esperan():
+    cache = index.CacheLRU()
+    liberar = threading.Event()
+    llamadas = []
+
+    def construir():
+        llamadas.append(1)
+        liberar.wait(5)
+        raise ValueError("expresión inválida")
+
+    errores = []
+
+    def pedir():
+        try:
+            cache.obtener("k", construir)
+        except ValueError as e:
+            errores.append(e)
+
+    hilos = [threading.Thread(target=pedir) for _ in range(4)]
+    coalescer(cache, "k", hilos[0], hilos[1:])
+    liberar.set()
+    for hilo in hilos:
+        hilo.join(10)
+
+    assert len(errores) == 4
+    assert len(llamadas) == 1
+    # Los errores no se guardan
+    assert cache.estadisticas()["tamano"] == 0
+
+
+@pytest.fixture
+def regla_lenta(monkeypatch):
+    original = index.integrar_regla
+
+    def lenta(*args, **kwargs):
+        time.sleep(0.4)
+        return original(*args, **kwargs)
+
+    monkeypatch.setattr(index, "integrar_regla", lenta)
+
+
+def pedir_en_paralelo(peticiones):
+    resultados = {}
+
+    def pedir(nombre, cuerpo, retraso):
+        time.sleep(retraso)
+        respuesta = index.app.test_client().post("/boole", json=cuerpo)
+        resultados[nombre] = (respuesta.status_code, respuesta.get_json())
+
+    hilos = [threading.Thread(target=pedir, args=peticion) for peticion in peticiones]
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join(10)
+    return resultados
+
+
+def test_rutas_simultaneas_se_coalescen(cliente, regla_lenta):
+    cuerpo = {"funcion": "x**3", "a": 0, "b": 1, "n": 8, "tabla": "none"}
+    resultados = pedir_en_paralelo([(i, cuerpo, 0 if i == 0 else 0.05) for i in range(4)])
+
+    assert {estado for estado, _ in resultados.values()} == {200}
+    assert len({datos["resultado"] for _, datos in resultados.values()}) == 1
+    assert index.cache_resultados.estadisticas()["coalescidas"] == 3
+
+
+def test_presupuesto_del_lider_no_se_comparte():
+    cache = index.CacheLRU()
+    liberar = threading.Event()
+    llamadas = []
+
+    def construir_lider():
+        llamadas.append("lider")
+        liberar.wait(5)
+        raise index.PresupuestoExcedido("Se superó el tiempo", 408, {})
+
+    def construir_seguidor():
+        llamadas.append("seguidor")
+        return 42
+
+    resultados = {}
+
+    def lider():
+        try:
+            cache.obtener("k", construir_lider)
+        except index.PresupuestoExcedido as e:
+            resultados["lider"] = e.estado
+
+    def seguidor(nombre):
+        resultados[nombre] = cache.obtener("k", construir_seguidor)
+
+    seguidores = [threading.Thread(target=seguidor, args=(f"seguidor{i}",)) for i in range(3)]
+    coalescer(cache, "k", threading.Thread(target=lider), seguidores)
+    liberar.set()
+    for hilo in seguidores:
+        hilo.join(10)
+
+    assert resultados == {"lider": 408, "seguidor0": 42, "seguidor1": 42, "seguidor2": 42}
+    # Uno de los seguidores toma el relevo y los otros se coalescen con él
+    assert llamadas == ["lider", "seguidor"]
+    assert cache.obtener("k", construir_seguidor) == 42
+
+
+def test_el_seguidor_espera_solo_su_propio_plazo():
+    cache = index.CacheLRU()
+    liberar = threading.Event()
+    resultado = {}
+
+    def lider():
+        cache.obtener("k", lambda: liberar.wait(5) and 42)
+
+    def seguidor():
+        index._medicion_local.medicion = SimpleNamespace(fases={}, evaluaciones=0, respaldos={},
+                                                         presupuesto=index.Presupuesto(0.1, 10))
+        inicio = time.perf_counter()
+        try:
+            cache.obtener("k", lambda: 0)
+        except index.PresupuestoExcedido as e:
+            resultado["estado"] = e.estado
+        resultado["segundos"] = time.perf_counter() - inicio
+
+    hilo_lider = threading.Thread(target=lider)
+    hilo_seguidor = threading.Thread(target=seguidor)
+    coalescer(cache, "k", hilo_lider, [hilo_seguidor])
+    hilo_seguidor.join(10)
+    liberar.set()
+    hilo_lider.join(10)
+
+    assert resultado["estado"] == 408
+    assert resultado["segundos"] < 1
+    assert cache.obtener("k", lambda: 0) == 42
+
+
+def test_relevo_tras_agotar_el_tiempo_del_lider(cliente, regla_lenta):
+    cliente.post("/trapecio", json={"funcion": "x", "a": 0, "b": 1, "n": 2, "tiempo_limite": 10})
+    index.cache_resultados.limpiar()
+    cuerpo = {"funcion": "x**3", "a": 0, "b": 1, "n": 8, "tabla": "none"}
+    resultados = pedir_en_paralelo([
+        ("lider", {**cuerpo, "tiempo_limite": 0.3}, 0),
+        ("seguidor_largo", {**cuerpo, "tiempo_limite": 5}, 0.05),
+        ("seguidor_corto", {**cuerpo, "tiempo_limite": 0.2}, 0.05),
+    ])
+
+    assert resultados["lider"][0] == 408
+    assert resultados["seguidor_corto"][0] == 408
+    assert resultados["seguidor_largo"][0] == 200
+    assert resultados["seguidor_largo"][1]["resultado"] == pytest.approx(0.25)
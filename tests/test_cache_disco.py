@@ -0,0 +1,145 @@
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+import index
+
+SENO = "\\sin(x)"
+
+
+def crear(directorio, clave="secreta", **opciones):
+    return index.CacheDisco(str(directorio), max_bytes=opciones.get("max_bytes", 10 ** 6),
+                            max_entradas=opciones.get("max_entradas", 100), clave=clave,
+                            directorio_lectura=opciones.get("directorio_lectura"))
+
+
+@pytest.fixture
+def disco(tmp_path, monkeypatch):
+    cache = crear(tmp_path)
+    monkeypatch.setattr(index, "cache_disco", cache)
+    return cache
+
+
+def archivo_de(cache, clave):
+    return os.path.join(cache.directorio, cache._nombre(clave))
+
+
+def test_ida_y_vuelta(disco):
+    expr, f = index.compilar_latex(SENO)
+    assert disco.estadisticas()["escrituras"] == 1
+    cargada, g = index.compilar_latex(SENO)
+    assert isinstance(cargada, index.ExpresionSerializada)
+    assert str(cargada) == str(expr)
+    assert g(0.5) == pytest.approx(f(0.5))
+    assert disco.estadisticas()["aciertos"] == 1
+
+
+def test_entrada_manipulada_no_se_ejecuta(disco, tmp_path):
+    index.compilar_latex(SENO)
+    ruta = archivo_de(disco, ["latex", SENO])
+    marca = tmp_path / "ejecutado"
+    with open(ruta, encoding="utf-8") as archivo:
+        entrada = json.load(archivo)
+    # Se cambia el código conservando la firma original
+    entrada["fuente"] = f"open({str(marca)!r}, 'w').close()\ndef _lambdifygenerated(x):\n    return 42 * x\n"
+    with open(ruta, "w", encoding="utf-8") as archivo:
+        json.dump(entrada, archivo)
+
+    assert disco.leer(["latex", SENO]) is None
+    assert disco.estadisticas()["rechazadas"] == 1
+    _, f = index.compilar_latex(SENO)
+    assert f(0.5) == pytest.approx(0.479425538604203)
+    assert not marca.exists()
+
+
+def test_firma_con_otra_clave_se_rechaza(tmp_path):
+    index.cache_funciones.limpiar()
+    atacante = crear(tmp_path, clave="otra")
+    atacante.guardar(["latex", SENO], {"canonica": "x", "srepr": "Symbol('x')", "fuente": None})
+    cache = crear(tmp_path)
+    assert cache.leer(["latex", SENO]) is None
+    assert cache.estadisticas()["rechazadas"] == 1
+
+
+@pytest.mark.parametrize("firma", [None, "", "0" * 64, 7])
+def test_firma_ausente_o_invalida(disco, firma):
+    index.compilar_latex(SENO)
+    ruta = archivo_de(disco, ["latex", SENO])
+    with open(ruta, encoding="utf-8") as archivo:
+        entrada = json.load(archivo)
+    if firma is None:
+        del entrada["firma"]
+    else:
+        entrada["firma"] = firma
+    with open(ruta, "w", encoding="utf-8") as archivo:
+        json.dump(entrada, archivo)
+    assert disco.leer(["latex", SENO]) is None
+
+
+def test_entrada_de_otra_clave_de_cache(disco):
+    # Firma válida pero guardada bajo el nombre de otra expresión
+    disco.guardar(["latex", SENO], {"canonica": "x", "srepr": "Symbol('x')", "fuente": None})
+    os.replace(archivo_de(disco, ["latex", SENO]), archivo_de(disco, ["latex", "x"]))
+    assert disco.leer(["latex", "x"]) is None
+
+
+def test_archivo_corrupto(disco):
+    with open(archivo_de(disco, ["latex", SENO]), "w") as archivo:
+        archivo.write("{no es json")
+    assert disco.leer(["latex", SENO]) is None
+    assert disco.estadisticas()["errores"] == 1
+
+
+def test_solo_se_borran_directorios_de_version(tmp_path):
+    antigua = tmp_path / "v1-sympy1.0-numpy1.0"
+    antigua.mkdir()
+    (antigua / "entrada.json").write_text("{}")
+    conservados = [tmp_path / "datos", tmp_path / "v1-otra-cosa", tmp_path / "v1-sympy1.0-numpy1.0.bak"]
+    for directorio in conservados:
+        directorio.mkdir()
+        (directorio / "archivo.json").write_text("{}")
+    suelto = tmp_path / "v1-sympy1.0-numpy2.0"
+    suelto.write_text("archivo, no directorio")
+    enlazado = tmp_path / "v0-sympy0-numpy0"
+    enlazado.symlink_to(tmp_path / "datos")
+
+    cache = crear(tmp_path)
+
+    assert not antigua.exists()
+    assert os.path.isdir(cache.directorio)
+    for directorio in conservados:
+        assert (directorio / "archivo.json").exists()
+    assert suelto.read_text() == "archivo, no directorio"
+    assert enlazado.is_symlink()
+
+
+def test_desalojo_por_numero_de_entradas(tmp_path):
+    cache = crear(tmp_path, max_entradas=2)
+    for i in range(3):
+        cache.guardar(["latex", str(i)], {"canonica": str(i), "srepr": f"Integer({i})", "fuente": None})
+        os.utime(archivo_de(cache, ["latex", str(i)]), (i, i))
+    cache._podar()
+    assert cache.estadisticas()["entradas"] == 2
+    assert cache.leer(["latex", "0"]) is None
+    assert cache.leer(["latex", "2"]) is not None
+
+
+def test_directorio_empaquetado_de_solo_lectura(tmp_path):
+    empaquetada = crear(tmp_path / "empaquetada")
+    empaquetada.guardar(["latex", SENO], {"canonica": "sin(x)", "srepr": "sin(Symbol('x'))", "fuente": None})
+    cache = crear(tmp_path / "local", directorio_lectura=str(tmp_path / "empaquetada"))
+    assert cache.leer(["latex", SENO])["canonica"] == "sin(x)"
+    assert cache.estadisticas()["entradas"] == 0
+
+
+@pytest.mark.parametrize("clave,activa", [("", False), ("secreta", True)])
+def test_sin_clave_no_hay_cache(tmp_path, clave, activa):
+    codigo = f"import sys; sys.path.insert(0, {os.path.dirname(index.__file__)!r}); import index; print(index.cache_disco is not None)"
+    salida = subprocess.run([sys.executable, "-c", codigo], capture_output=True, text=True, timeout=120,
+                            env={**os.environ, "CACHE_EXPRESIONES_DIR": str(tmp_path), "CACHE_EXPRESIONES_CLAVE": clave})
+    assert salida.returncode == 0, salida.stderr
+    assert salida.stdout.strip() == str(activa)
+    assert any(tmp_path.iterdir()) == activa
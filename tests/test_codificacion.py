@@ -0,0 +1,107 @@
+import json
+import struct
+
+import numpy as np
+import pytest
+
+import index
+
+msgpack = pytest.importorskip("msgpack")
+
+BINARIO = {"Accept": "application/octet-stream"}
+MSGPACK = {"Accept": "application/msgpack"}
+
+
+def decodificar_binario(respuesta):
+    cuerpo = respuesta.data
+    longitud = struct.unpack("<I", cuerpo[:4])[0]
+    encabezado = json.loads(cuerpo[4:4 + longitud])
+    columnas = {}
+    posicion = 4 + longitud
+    for columna in encabezado["columnas"]:
+        fin = posicion + 8 * columna["longitud"]
+        arreglo = np.frombuffer(cuerpo[posicion:fin], dtype="<f8")
+        columnas[columna["nombre"]] = arreglo.reshape(columna.get("forma", arreglo.shape))
+        posicion = fin
+    assert posicion == len(cuerpo)
+    return encabezado, columnas
+
+
+def columnas_de_filas(filas):
+    return {clave: [fila[clave] for fila in filas] for clave in filas[0]}
+
+
+@pytest.mark.parametrize("ruta", ["trapecio", "simpson13", "simpson38", "boole", "simpson_abierto"])
+@pytest.mark.parametrize("tabla", ["completa", "none", "resumen", "columnar", "paginada"])
+def test_msgpack_coincide_con_json(cliente, ruta, tabla):
+    cuerpo = {"funcion": "x**2", "a": 0, "b": 1, "n": 24, "tabla": tabla, "k": 2, "offset": 3, "limit": 4}
+    respuesta = cliente.post("/" + ruta, json=cuerpo, headers=MSGPACK)
+    assert respuesta.mimetype == "application/msgpack"
+    # Sin la caché de resultados, para que 'niveles_evaluacion' coincida
+    index.cache_resultados.limpiar()
+    assert msgpack.unpackb(respuesta.data) == cliente.post("/" + ruta, json=cuerpo).get_json()
+
+
+def test_msgpack_no_disponible(cliente, monkeypatch):
+    monkeypatch.setattr(index, "msgpack", None)
+    respuesta = cliente.post("/trapecio", json={"funcion": "x", "a": 0, "b": 1}, headers=MSGPACK)
+    assert respuesta.status_code == 406
+
+
+def test_columnar_con_orjson_coincide_con_jsonify(cliente, monkeypatch):
+    cuerpo = {"funcion": "x**2", "a": 0, "b": 1, "n": 10, "tabla": "columnar"}
+    rapida = cliente.post("/boole", json=cuerpo).get_json()
+    monkeypatch.setattr(index, "orjson", None)
+    index.cache_resultados.limpiar()
+    assert cliente.post("/boole", json=cuerpo).get_json() == rapida
+
+
+@pytest.mark.parametrize("ruta", ["trapecio", "simpson38", "boole"])
+def test_binario_completo(cliente, ruta):
+    cuerpo = {"funcion": "x**2", "a": 0, "b": 1, "n": 24}
+    respuesta = cliente.post("/" + ruta, json=cuerpo, headers=BINARIO)
+    assert respuesta.mimetype == "application/octet-stream"
+    encabezado, columnas = decodificar_binario(respuesta)
+    completa = cliente.post("/" + ruta, json=cuerpo).get_json()
+    assert encabezado["resultado"] == completa["resultado"]
+    for clave, valores in columnas_de_filas(completa["tabla_iteracion"]).items():
+        if clave in columnas:
+            assert columnas[clave].tolist() == valores
+        else:
+            assert encabezado["columnas_no_numericas"][clave] == valores
+
+
+def test_binario_paginado(cliente):
+    cuerpo = {"funcion": "x**2", "a": 0, "b": 1, "n": 1000, "tabla": "paginada", "offset": 10, "limit": 2}
+    encabezado, columnas = decodificar_binario(cliente.post("/trapecio", json=cuerpo, headers=BINARIO))
+    pagina = cliente.post("/trapecio", json=cuerpo).get_json()
+    assert encabezado["paginacion"] == pagina["paginacion"] == {"offset": 10, "limit": 2, "total_filas": 1001}
+    assert {clave: valores.tolist() for clave, valores in columnas.items()} == \
+        columnas_de_filas(pagina["tabla_iteracion"])
+
+
+def test_binario_resumen(cliente):
+    cuerpo = {"funcion": "x**2", "a": 0, "b": 1, "n": 1000, "tabla": "resumen", "k": 3}
+    encabezado, columnas = decodificar_binario(cliente.post("/trapecio", json=cuerpo, headers=BINARIO))
+    resumen = cliente.post("/trapecio", json=cuerpo).get_json()["tabla_iteracion"]
+    assert encabezado["resumen"] == {"primeras": 3, "ultimas": 3, "total_filas": 1001,
+                                     "totales": resumen["totales"]}
+    assert {clave: valores.tolist() for clave, valores in columnas.items()} == \
+        columnas_de_filas(resumen["primeras"] + resumen["ultimas"])
+
+
+def test_binario_boole_con_segmentos_paginados(cliente):
+    cuerpo = {"funcion": "x**2", "a": 0, "b": 1, "n": 40, "tabla": "paginada", "offset": 3, "limit": 4}
+    encabezado, columnas = decodificar_binario(cliente.post("/boole", json=cuerpo, headers=BINARIO))
+    pagina = cliente.post("/boole", json=cuerpo).get_json()
+    assert columnas["x"].tolist() == [fila["x"] for fila in pagina["tabla_iteracion"]]
+    assert columnas["segmentos.valor"].tolist() == [segmento["valor"] for segmento in pagina["segmentos"]]
+    assert columnas["segmentos.intervalo"].shape == (2, 2)
+    assert encabezado["segmentos"]["paginacion"]["total_filas"] == 10
+
+
+def test_binario_sin_tabla(cliente):
+    encabezado, columnas = decodificar_binario(cliente.post(
+        "/trapecio", json={"funcion": "x", "a": 0, "b": 1, "tabla": "none"}, headers=BINARIO))
+    assert columnas == {}
+    assert encabezado["resultado"] == pytest.approx(0.5)
@@ -0,0 +1,51 @@
+import pytest
+
+CLASICOS = ["trapecio", "simpson13", "simpson38", "boole", "simpson_abierto"]
+
+
+def comparar(cliente, **cuerpo):
+    return cliente.post("/comparar", json={"funcion": "e^{x} \\sin(x)", "formato": "latex", "a": 0, "b": 2,
+                                           **cuerpo})
+
+
+def test_cada_metodo_coincide_con_su_ruta(cliente):
+    datos = comparar(cliente, n=24, metodos=CLASICOS).get_json()
+    assert datos["n"] == 24
+    assert [resultado["metodo"] for resultado in datos["resultados"]] == CLASICOS
+    for resultado in datos["resultados"]:
+        ruta = cliente.post("/" + resultado["metodo"], json={"funcion": "e^{x} \\sin(x)", "formato": "latex",
+                                                             "a": 0, "b": 2, "n": 24, "tabla": "none"})
+        assert resultado["resultado"] == pytest.approx(ruta.get_json()["resultado"], rel=1e-14)
+
+
+def test_n_se_ajusta_al_minimo_comun_multiplo(cliente):
+    # Paneles de 2, 3 y 4 subintervalos: n múltiplo de 12
+    assert comparar(cliente, n=13).get_json()["n"] == 24
+    assert comparar(cliente, n=5, metodos=["simpson13", "simpson38"]).get_json()["n"] == 6
+
+
+def test_la_malla_se_evalua_una_sola_vez(cliente):
+    datos = comparar(cliente, n=12).get_json()
+    assert datos["evaluaciones"] == 13
+    assert len(datos["tabla_iteracion"]) == 13
+    assert datos["niveles_evaluacion"] == {"numpy": 13}
+    assert {resultado["metodo"]: resultado["puntos_usados"] for resultado in datos["resultados"]} == \
+        {"trapecio": 13, "simpson13": 13, "simpson38": 13, "boole": 13}
+
+
+def test_solo_se_evaluan_los_nodos_usados(cliente):
+    # Simpson abierto no usa los extremos de cada panel
+    datos = comparar(cliente, n=8, metodos=["simpson_abierto"]).get_json()
+    assert datos["evaluaciones"] == 6
+    assert [fila["i"] for fila in datos["tabla_iteracion"]] == [1, 2, 3, 5, 6, 7]
+
+
+@pytest.mark.parametrize("cuerpo,estado", [
+    ({"metodos": []}, 400),
+    ({"metodos": "trapecio"}, 400),
+    ({"metodos": ["trapecio", "gauss"]}, 400),
+    ({"funcion": ""}, 400),
+    ({"n": 20_000_000}, 422),
+])
+def test_parametros_invalidos(cliente, cuerpo, estado):
+    assert comparar(cliente, **cuerpo).status_code == estado
@@ -0,0 +1,110 @@
+import json
+
+import pytest
+
+import index
+
+NDJSON = {"Accept": "application/x-ndjson"}
+CONSULTA = "/simpson13?funcion=x**2&a=0&b=1&n=10&tabla=none"
+
+
+def test_get_con_etag_y_304(cliente):
+    respuesta = cliente.get(CONSULTA)
+    assert respuesta.status_code == 200
+    assert respuesta.get_json()["resultado"] == pytest.approx(1 / 3)
+    etag = respuesta.headers["ETag"]
+    assert respuesta.headers["Cache-Control"] == f"public, max-age={index.TTL_CACHE_RESULTADOS}"
+    assert "Accept" in respuesta.headers["Vary"]
+
+    repetida = cliente.get(CONSULTA, headers={"If-None-Match": etag})
+    assert repetida.status_code == 304
+    assert repetida.data == b""
+    assert repetida.headers["ETag"] == etag
+
+
+def test_etag_depende_de_los_parametros_del_formato_y_la_version(cliente, monkeypatch):
+    etag = cliente.get(CONSULTA).headers["ETag"]
+    assert cliente.get(CONSULTA.replace("n=10", "n=12")).headers["ETag"] != etag
+    assert cliente.get(CONSULTA, headers={"Accept": "application/msgpack"}).headers["ETag"] != etag
+    monkeypatch.setattr(index, "VERSION_ETAG", "otra")
+    nueva = cliente.get(CONSULTA, headers={"If-None-Match": etag})
+    # Otro despliegue no da por válida la respuesta anterior
+    assert nueva.status_code == 200
+    assert nueva.headers["ETag"] != etag
+
+
+def test_sin_etag_en_post_ni_en_errores(cliente):
+    assert "ETag" not in cliente.post("/simpson13", json={"funcion": "x", "a": 0, "b": 1}).headers
+    error = cliente.get("/simpson13?funcion=y&a=0&b=1")
+    assert error.status_code == 400
+    assert "ETag" not in error.headers
+    assert "Cache-Control" not in error.headers
+
+
+def test_ndjson_no_se_cachea(cliente):
+    respuesta = cliente.get("/trapecio?funcion=x&a=0&b=1&n=10", headers=NDJSON)
+    assert respuesta.status_code == 200
+    assert respuesta.mimetype == "application/x-ndjson"
+    assert "ETag" not in respuesta.headers
+    assert "Cache-Control" not in respuesta.headers
+
+
+def test_ndjson_con_error_al_final_no_se_cachea(cliente):
+    respuesta = cliente.get("/trapecio?funcion=1/(x-0.5)&a=0&b=1&n=10", headers=NDJSON)
+    assert respuesta.status_code == 200
+    lineas = [json.loads(linea) for linea in respuesta.get_data(as_text=True).splitlines()]
+    assert lineas[-1]["tipo"] == "error"
+    assert "ETag" not in respuesta.headers
+    assert "Cache-Control" not in respuesta.headers
+
+
+@pytest.mark.parametrize("formato,primera,segunda", [
+    ("python", "x**2", " x ** 2 "),
+    ("python", "x**2", "(x**2)"),
+    ("latex", "x^{2}", "x^2"),
+])
+def test_clave_canonica_de_los_resultados(cliente, formato, primera, segunda):
+    cuerpo = {"formato": formato, "a": 0, "b": 1, "n": 10, "tabla": "none"}
+    uno = cliente.post("/trapecio", json={**cuerpo, "funcion": primera}).get_json()
+    aciertos = index.cache_resultados.estadisticas()["aciertos"]
+    dos = cliente.post("/trapecio", json={**cuerpo, "funcion": segunda}).get_json()
+    assert index.cache_resultados.estadisticas()["aciertos"] == aciertos + 1
+    assert dos["resultado"] == uno["resultado"]
+    # La respuesta conserva la función tal como se pidió
+    assert dos["funcion"] == segunda
+
+
+def test_la_clave_incluye_limites_y_n(cliente):
+    cuerpo = {"funcion": "x**2", "a": 0, "b": 1, "n": 10, "tabla": "none"}
+    aciertos = index.cache_resultados.estadisticas()["aciertos"]
+    cliente.post("/trapecio", json=cuerpo)
+    for cambio in ({"a": 0.5}, {"b": 2}, {"n": 20}):
+        cliente.post("/trapecio", json={**cuerpo, **cambio})
+    assert index.cache_resultados.estadisticas()["aciertos"] == aciertos
+
+
+def test_vaciar_cache_deshabilitado_sin_token(cliente, monkeypatch):
+    monkeypatch.setattr(index, "TOKEN_CACHE", None)
+    assert cliente.delete("/cache").status_code == 403
+    assert cliente.delete("/cache", headers={"Authorization": "Bearer algo"}).status_code == 403
+
+
+def test_vaciar_cache_con_token(cliente, monkeypatch):
+    monkeypatch.setattr(index, "TOKEN_CACHE", "secreto")
+    cliente.post("/trapecio", json={"funcion": "x**2", "a": 0, "b": 1})
+    assert index.cache_resultados.estadisticas()["tamano"] == 1
+
+    assert cliente.delete("/cache").status_code == 401
+    assert cliente.delete("/cache", headers={"Authorization": "Bearer otro"}).status_code == 401
+    assert cliente.delete("/cache", headers={"Authorization": "secreto"}).status_code == 401
+    assert index.cache_resultados.estadisticas()["tamano"] == 1
+
+    respuesta = cliente.delete("/cache", headers={"Authorization": "Bearer secreto"})
+    assert respuesta.status_code == 200
+    assert index.cache_resultados.estadisticas()["tamano"] == 0
+    assert index.cache_funciones.estadisticas()["tamano"] == 0
+
+
+def test_estadisticas_de_cache(cliente):
+    datos = cliente.get("/cache").get_json()
+    assert {"funciones_compiladas", "resultados"} <= set(datos)
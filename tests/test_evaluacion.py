@@ -0,0 +1,71 @@
+import math
+
+import pytest
+
+import index
+
+
+def integrar(cliente, funcion, formato="latex", a=0, b=1, n=100):
+    return cliente.post("/trapecio", json={"funcion": funcion, "formato": formato, "a": a, "b": b, "n": n,
+                                           "tabla": "none"})
+
+
+@pytest.mark.parametrize("funcion,esperado", [
+    ("\\ln(x+1)", 2 * math.log(2) - 1),
+    ("\\log(x+1)", 2 * math.log(2) - 1),
+    ("\\log_{2}(x+1)", (2 * math.log(2) - 1) / math.log(2)),
+    ("\\ln(\\ln(x+3))", None),
+])
+def test_logaritmos_se_evaluan_vectorizados(cliente, funcion, esperado):
+    respuesta = integrar(cliente, funcion, n=1000)
+    assert respuesta.status_code == 200
+    datos = respuesta.get_json()
+    assert datos["niveles_evaluacion"] == {"numpy": 1001}
+    if esperado is not None:
+        assert datos["resultado"] == pytest.approx(esperado, rel=1e-6)
+
+
+def test_logaritmo_sin_base_en_la_expresion_compilada():
+    expr, _ = index.obtener_funcion_compilada("\\ln(x+1) + \\log_{3}(x)", "latex")
+    sympy = index.cargar_sympy().sympy
+    assert all(len(logaritmo.args) == 1 for logaritmo in expr.atoms(sympy.log))
+
+
+def test_niveles_de_respaldo(cliente):
+    # Raíz de negativos: NumPy en complejo solo para la mitad negativa
+    datos = integrar(cliente, "\\sqrt{x}", a=-1, b=1, n=100).get_json()
+    assert datos["niveles_evaluacion"] == {"numpy": 51, "complejo": 50}
+
+
+def test_nivel_mpmath_sobre_los_pendientes(cliente):
+    # El factorial no existe en NumPy: todos los puntos pasan a mpmath
+    datos = integrar(cliente, "x!", a=1, b=2, n=200).get_json()
+    assert datos["niveles_evaluacion"] == {"numpy": 0, "mpmath": 201}
+    assert datos["resultado"] == pytest.approx(
+        sum((0.5 if i in (0, 200) else 1) * math.gamma(2 + i / 200) for i in range(201)) / 200)
+
+
+def test_evaluar_mpmath_arreglo():
+    f_mpmath = index.cargar_sympy().lambdify("x", index.cargar_sympy().sympy.sympify("1/(x - 1)"), "mpmath")
+    assert index.evaluar_mpmath_arreglo(f_mpmath, index.np.array([0.0, 2.0])).tolist() == [-1.0, 1.0]
+    # Un polo lanza ZeroDivisionError: el bloque se separa punto a punto
+    assert index.evaluar_mpmath_arreglo(f_mpmath, index.np.array([0.0, 1.0])) is None
+
+
+def test_puntos_singulares(cliente):
+    respuesta = integrar(cliente, "\\frac{1}{x - 0.5}", n=10)
+    assert respuesta.status_code == 400
+    datos = respuesta.get_json()
+    assert datos["singulares"] == [0.5]
+    assert datos["total_singulares"] == 1
+
+
+@pytest.mark.parametrize("funcion,mensaje", [
+    ("\\operatorname{erf}(x)", "Variables no permitidas"),
+    ("x + y", "Variables no permitidas: y"),
+    ("\\Gamma(x)", "Funciones no reconocidas: Gamma"),
+])
+def test_expresiones_no_evaluables_se_rechazan_al_compilar(cliente, funcion, mensaje):
+    respuesta = integrar(cliente, funcion, n=1000)
+    assert respuesta.status_code == 400
+    assert mensaje in respuesta.get_json()["error"]
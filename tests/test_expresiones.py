@@ -0,0 +1,58 @@
+import math
+
+import pytest
+
+import index
+
+
+def integrar(cliente, funcion, n=100):
+    return cliente.post("/simpson13", json={"funcion": funcion, "a": 0, "b": 1, "n": n, "tabla": "none"})
+
+
+@pytest.mark.parametrize("funcion,esperado", [
+    ("max(x, 0.5)", 0.625),
+    ("min(x, 0.5)", 0.375),
+    ("max(x, 0.1, 0.5)", 0.625),
+    ("pow(x, 2)", 1 / 3),
+    ("math.pow(x, 3)", 0.25),
+    ("np.maximum(x, 0.5)", 0.625),
+    ("where(x > 0.5, 1, 0)", 0.5),
+    ("hypot(x, 0)", 0.5),
+    ("arctan2(x, 1)", math.pi / 4 - math.log(2) / 2),
+    ("log1p(x)", 2 * math.log(2) - 1),
+    ("round(x * 0 + 2.6)", 3.0),
+])
+def test_funciones_permitidas(cliente, funcion, esperado):
+    respuesta = integrar(cliente, funcion, n=1000)
+    assert respuesta.status_code == 200
+    datos = respuesta.get_json()
+    # Los tramos no suaves limitan la precisión de Simpson
+    assert datos["resultado"] == pytest.approx(esperado, abs=1e-3)
+    # Siguen evaluándose sobre el arreglo completo
+    assert datos["niveles_evaluacion"] == {"numpy": 1001}
+
+
+@pytest.mark.parametrize("funcion", [
+    "__import__('os').system('true')",
+    "x.__class__",
+    "np.linalg.inv(x)",
+    "open('/etc/passwd')",
+    "(lambda: x)()",
+    "'a' * 3",
+    "sin(x=1)",
+])
+def test_expresiones_rechazadas(cliente, funcion):
+    assert integrar(cliente, funcion).status_code == 400
+
+
+def test_constantes_como_punto_flotante(cliente):
+    # Con enteros de Python esta potencia ocuparía el proceso durante minutos
+    assert integrar(cliente, "x*0 + 9**9**8").status_code == 400
+    assert integrar(cliente, "x*0 + 10**400").status_code == 400
+    assert integrar(cliente, "x*0 + 7//2").get_json()["resultado"] == pytest.approx(3.0)
+
+
+def test_max_escalar_y_vectorial_coinciden():
+    _, f = index.compilar_python("max(x, 0.5)")
+    assert f(0.2) == 0.5
+    assert f(index.np.array([0.2, 0.8])).tolist() == [0.5, 0.8]
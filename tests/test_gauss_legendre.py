@@ -0,0 +1,51 @@
+import math
+
+import numpy as np
+import pytest
+
+import index
+
+
+def gauss(cliente, **cuerpo):
+    return cliente.post("/gauss_legendre", json={"a": 0, "b": 1, **cuerpo})
+
+
+@pytest.mark.parametrize("orden", [1, 2, 3, 5, 10])
+def test_gauss_exacto_hasta_grado_2n_menos_1(cliente, orden):
+    grado = 2 * orden - 1
+    datos = gauss(cliente, funcion=f"x**{grado} + 1", a=-1, b=2, orden=orden).get_json()
+    assert datos["resultado"] == pytest.approx((2 ** (grado + 1) - 1) / (grado + 1) + 3, rel=1e-13)
+
+
+def test_gauss_compuesto(cliente):
+    datos = gauss(cliente, funcion="np.sin(x)", b=math.pi, orden=4, paneles=8).get_json()
+    assert datos["resultado"] == pytest.approx(2.0, rel=1e-12)
+    assert datos["n"] == 32
+    tabla = datos["tabla_iteracion"]
+    assert [fila["panel"] for fila in tabla[:5]] == [1, 1, 1, 1, 2]
+    assert sum(fila["peso"] for fila in tabla) == pytest.approx(math.pi)
+    assert sum(fila["f(xi) * peso"] for fila in tabla) == pytest.approx(datos["resultado"])
+
+
+def test_gauss_latex(cliente):
+    datos = gauss(cliente, funcion="e^{-x^{2}}", formato="latex", orden=20).get_json()
+    assert datos["resultado"] == pytest.approx(math.sqrt(math.pi) / 2 * math.erf(1), rel=1e-14)
+
+
+def test_gauss_nodos_y_pesos_compartidos():
+    nodos, pesos = index.nodos_gauss_legendre(7)
+    assert index.nodos_gauss_legendre(7)[0] is nodos
+    assert not nodos.flags.writeable and not pesos.flags.writeable
+    esperados = np.polynomial.legendre.leggauss(7)
+    assert nodos.tolist() == esperados[0].tolist()
+    assert pesos.tolist() == esperados[1].tolist()
+
+
+@pytest.mark.parametrize("cuerpo,estado", [
+    ({"orden": 0}, 400),
+    ({"orden": 101}, 400),
+    ({"paneles": 0}, 400),
+    ({"orden": 100, "paneles": 200_000}, 422),
+])
+def test_gauss_parametros_invalidos(cliente, cuerpo, estado):
+    assert gauss(cliente, funcion="x", **cuerpo).status_code == estado
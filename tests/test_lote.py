@@ -0,0 +1,81 @@
+import pytest
+
+import index
+
+
+def lote(cliente, trabajos):
+    return cliente.post("/lote", json={"trabajos": trabajos})
+
+
+def test_resultados_iguales_a_las_rutas(cliente):
+    trabajos = [
+        {"metodo": "trapecio", "funcion": "x**2", "a": 0, "b": 1, "n": 10},
+        {"metodo": "boole", "funcion": "x**2", "a": 1, "b": 2, "n": 8},
+        {"metodo": "simpson38", "funcion": "e^{x}", "formato": "latex", "a": 0, "b": 1, "n": 9},
+        {"metodo": "simpson_abierto", "funcion": "np.cos(x)", "a": 0, "b": 1},
+    ]
+    datos = lote(cliente, trabajos).get_json()
+    assert datos["trabajos"] == 4
+    assert datos["errores"] == 0
+    assert datos["grupos"] == 3
+    for trabajo, resultado in zip(trabajos, datos["resultados"]):
+        cuerpo = {clave: valor for clave, valor in trabajo.items() if clave != "metodo"}
+        ruta = cliente.post("/" + trabajo["metodo"], json={**cuerpo, "tabla": "none"}).get_json()
+        assert resultado["metodo"] == trabajo["metodo"]
+        assert resultado["n"] == ruta["n"]
+        assert resultado["resultado"] == pytest.approx(ruta["resultado"], rel=1e-14)
+
+
+def test_una_pasada_por_expresion(cliente):
+    trabajos = [{"metodo": "trapecio", "funcion": "x**3", "a": k, "b": k + 1, "n": 10} for k in range(5)]
+    datos = lote(cliente, trabajos).get_json()
+    assert datos["grupos"] == 1
+    assert datos["evaluaciones"] == 55
+    assert datos["niveles_evaluacion"] == {"numpy": 55}
+
+
+def test_errores_por_trabajo(cliente):
+    datos = lote(cliente, [
+        {"metodo": "trapecio", "funcion": "x", "a": 0, "b": 1},
+        {"metodo": "gauss", "funcion": "x", "a": 0, "b": 1},
+        {"metodo": "trapecio", "a": 0, "b": 1},
+        {"metodo": "trapecio", "funcion": "y", "a": 0, "b": 1},
+        "no es un objeto",
+        {"metodo": "trapecio", "funcion": "x", "a": 0, "b": 1, "n": 20_000_000},
+    ]).get_json()
+    resultados = datos["resultados"]
+    assert resultados[0]["resultado"] == pytest.approx(0.5)
+    assert "Método desconocido" in resultados[1]["error"]
+    assert resultados[2]["error"] == "Falta la función"
+    assert "error" in resultados[3]
+    assert "objeto" in resultados[4]["error"]
+    assert "error" in resultados[5]
+    assert datos["errores"] == 5
+
+
+def test_un_trabajo_con_polo_no_afecta_a_los_demas(cliente):
+    # Misma expresión: la pasada conjunta falla y se evalúa cada trabajo por separado
+    datos = lote(cliente, [
+        {"metodo": "trapecio", "funcion": "\\frac{1}{x}", "formato": "latex", "a": 1, "b": 2, "n": 10},
+        {"metodo": "trapecio", "funcion": "\\frac{1}{x}", "formato": "latex", "a": -1, "b": 1, "n": 10},
+        {"metodo": "simpson13", "funcion": "\\frac{1}{x}", "formato": "latex", "a": 2, "b": 4, "n": 10},
+    ]).get_json()
+    resultados = datos["resultados"]
+    assert resultados[0]["resultado"] == pytest.approx(0.6937714031754, rel=1e-10)
+    assert resultados[1]["singulares"] == [0.0]
+    assert resultados[2]["resultado"] == pytest.approx(0.6931502, rel=1e-6)
+    assert datos["errores"] == 1
+    # Solo cuentan las evaluaciones de los trabajos que dieron resultado
+    assert datos["evaluaciones"] == 22
+
+
+@pytest.mark.parametrize("trabajos", [[], "trapecio", None])
+def test_lote_invalido(cliente, trabajos):
+    assert lote(cliente, trabajos).status_code == 400
+
+
+def test_maximo_de_trabajos(cliente, monkeypatch):
+    monkeypatch.setattr(index, "MAX_TRABAJOS_LOTE", 2)
+    trabajo = {"metodo": "trapecio", "funcion": "x", "a": 0, "b": 1}
+    assert lote(cliente, [trabajo] * 2).status_code == 200
+    assert lote(cliente, [trabajo] * 3).status_code == 400
@@ -0,0 +1,86 @@
+import re
+
+import pytest
+
+LINEA = re.compile(r'^(\w+)(?:\{(.*)\})? (\S+)$')
+
+
+def leer_metricas(cliente):
+    respuesta = cliente.get("/metricas")
+    assert respuesta.status_code == 200
+    assert respuesta.content_type.startswith("text/plain; version=0.0.4")
+    valores = {}
+    for linea in respuesta.get_data(as_text=True).splitlines():
+        if linea.startswith("#"):
+            assert re.match(r"^# (HELP|TYPE) integracion_\w+ ", linea)
+            continue
+        nombre, etiquetas, valor = LINEA.match(linea).groups()
+        valores[(nombre, etiquetas or "")] = float(valor)
+    return valores
+
+
+def diferencia(antes, despues, nombre, etiquetas):
+    return despues.get((nombre, etiquetas), 0) - antes.get((nombre, etiquetas), 0)
+
+
+def fases(respuesta):
+    return dict(parte.split(";", 1) for parte in respuesta.headers["Server-Timing"].split(", "))
+
+
+def test_contadores_por_ruta_y_estado(cliente):
+    antes = leer_metricas(cliente)
+    cliente.post("/trapecio", json={"funcion": "x**2", "a": 0, "b": 1, "n": 10})
+    cliente.post("/trapecio", json={"funcion": "x**2", "a": 0, "b": 1, "n": 20})
+    cliente.post("/trapecio", json={"funcion": "x +", "a": 0, "b": 1})
+    despues = leer_metricas(cliente)
+    assert diferencia(antes, despues, "integracion_peticiones_total", 'ruta="/trapecio",metodo="POST",estado="200"') == 2
+    assert diferencia(antes, despues, "integracion_peticiones_total", 'ruta="/trapecio",metodo="POST",estado="400"') == 1
+    assert diferencia(antes, despues, "integracion_latencia_segundos_count", 'ruta="/trapecio"') == 3
+    # Histograma acumulado: el último cubo cuenta todas las observaciones
+    assert despues[("integracion_latencia_segundos_bucket", 'ruta="/trapecio",le="+Inf"')] == \
+        despues[("integracion_latencia_segundos_count", 'ruta="/trapecio"')]
+    assert diferencia(antes, despues, "integracion_evaluaciones_sum", 'ruta="/trapecio"') == 11 + 21
+
+
+def test_rutas_no_instrumentadas(cliente):
+    antes = leer_metricas(cliente)
+    cliente.get("/metodos")
+    despues = leer_metricas(cliente)
+    assert cliente.get("/metodos").headers.get("Server-Timing") is None
+    assert not any('ruta="/metodos"' in etiquetas for _, etiquetas in despues)
+    assert antes.keys() <= despues.keys()
+
+
+def test_respaldos(cliente):
+    antes = leer_metricas(cliente)
+    cliente.post("/trapecio", json={"funcion": "\\sqrt{x}", "formato": "latex", "a": -1, "b": 1, "n": 100})
+    cliente.post("/trapecio", json={"funcion": "x!", "formato": "latex", "a": 1, "b": 2, "n": 200})
+    despues = leer_metricas(cliente)
+    assert diferencia(antes, despues, "integracion_respaldos_total", 'ruta="/trapecio",tipo="complejo"') == 50
+    assert diferencia(antes, despues, "integracion_respaldos_total", 'ruta="/trapecio",tipo="mpmath"') == 201
+    assert diferencia(antes, despues, "integracion_fase_segundos_count", 'ruta="/trapecio",fase="mpmath"') == 1
+
+
+def test_cabecera_server_timing(cliente):
+    respuesta = cliente.post("/simpson13", json={"funcion": "\\cos(x)", "formato": "latex", "a": 0, "b": 1, "n": 50})
+    partes = fases(respuesta)
+    assert partes["evaluaciones"] == 'desc="51"'
+    assert {"parseo", "lambdify", "evaluacion", "serializacion", "total"} <= partes.keys()
+    for fase, valor in partes.items():
+        if fase != "evaluaciones":
+            assert float(valor.removeprefix("dur=")) >= 0
+    assert respuesta.headers["Timing-Allow-Origin"] == "*"
+
+    # Segunda vez: la función compilada y el resultado vienen de las cachés
+    partes = fases(cliente.post("/simpson13", json={"funcion": "\\cos(x)", "formato": "latex", "a": 0, "b": 1, "n": 50}))
+    assert "parseo" not in partes
+    assert partes["evaluaciones"] == 'desc="0"'
+
+
+@pytest.mark.parametrize("ruta,cuerpo,evaluaciones", [
+    ("/gauss_legendre", {"orden": 5, "paneles": 3}, 15),
+    ("/boole", {"n": 8}, 9),
+])
+def test_evaluaciones_en_la_cabecera(cliente, ruta, cuerpo, evaluaciones):
+    respuesta = cliente.post(ruta, json={"funcion": "x**3", "a": 0, "b": 1, **cuerpo})
+    assert fases(respuesta)["evaluaciones"] == f'desc="{evaluaciones}"'
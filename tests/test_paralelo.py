@@ -0,0 +1,90 @@
+import time
+
+import pytest
+
+import index
+
+EXPRESION = "e^{-x^{2}} \\sin(x)"
+
+
+@pytest.fixture
+def paralelo(monkeypatch):
+    # Dos trabajadores propios aunque la máquina tenga un solo núcleo
+    pool = index.PoolTrabajadores(2)
+    monkeypatch.setattr(index, "trabajadores_evaluacion", pool)
+    monkeypatch.setattr(index, "PROCESOS_EVALUACION", 2)
+    monkeypatch.setattr(index, "MIN_NODOS_PARALELO", 100)
+    yield pool
+    for trabajador in pool._libres:
+        trabajador.terminar()
+
+
+@pytest.mark.parametrize("ruta,extra", [
+    ("trapecio", {"n": 1000}),
+    ("simpson13", {"n": 1000}),
+    ("simpson38", {"n": 999}),
+    ("boole", {"n": 1000}),
+    ("simpson_abierto", {"n": 999}),
+    ("newton_cotes", {"n": 1000, "puntos": 5}),
+    ("gauss_legendre", {"orden": 5, "paneles": 200}),
+])
+def test_paralelo_coincide_con_serie(cliente, paralelo, ruta, extra):
+    cuerpo = {"funcion": EXPRESION, "formato": "latex", "a": 0, "b": 2, **extra}
+    serie = cliente.post("/" + ruta, json=cuerpo).get_json()
+    index.cache_resultados.limpiar()
+    respuesta = cliente.post("/" + ruta, json={**cuerpo, "paralelo": True})
+    assert respuesta.status_code == 200
+    assert "paralelo" in respuesta.headers["Server-Timing"]
+    datos = respuesta.get_json()
+    assert datos["resultado"] == pytest.approx(serie["resultado"], rel=1e-13)
+    assert datos["tabla_iteracion"] == serie["tabla_iteracion"]
+
+
+def test_paralelo_bajo_el_umbral_se_evalua_en_el_servidor(cliente, paralelo, monkeypatch):
+    monkeypatch.setattr(index, "MIN_NODOS_PARALELO", 10_000)
+    respuesta = cliente.post("/trapecio", json={"funcion": EXPRESION, "formato": "latex", "a": 0, "b": 2,
+                                                "n": 1000, "paralelo": True})
+    assert respuesta.status_code == 200
+    assert "paralelo" not in respuesta.headers["Server-Timing"]
+
+
+def test_la_expresion_compilada_se_envia_una_vez(cliente, paralelo, monkeypatch):
+    enviadas = []
+    enviar = index.TrabajadorEvaluacion.enviar
+
+    def espiar(trabajador, tarea, args, plazo, compiladas):
+        enviadas.append(sorted(clave for clave in compiladas if clave not in trabajador.compiladas))
+        return enviar(trabajador, tarea, args, plazo, compiladas)
+
+    monkeypatch.setattr(index.TrabajadorEvaluacion, "enviar", espiar)
+    cuerpo = {"funcion": EXPRESION, "formato": "latex", "a": 0, "b": 2, "n": 1000, "tabla": "none",
+              "paralelo": True}
+    resultados = []
+    for b in (2, 3, 4):
+        respuesta = cliente.post("/trapecio", json={**cuerpo, "b": b})
+        assert respuesta.status_code == 200
+        resultados.append(respuesta.get_json()["resultado"])
+
+    clave = (EXPRESION, "latex")
+    # Un envío por trabajador en la primera petición y ninguno después
+    assert enviadas[:2] == [[clave], [clave]]
+    assert all(nuevas == [] for nuevas in enviadas[2:])
+    assert len(enviadas) == 6
+    # Los trabajadores siguen evaluando con la expresión recibida antes
+    for b, resultado in zip((2, 3, 4), resultados):
+        index.cache_resultados.limpiar()
+        serie = cliente.post("/trapecio", json={**cuerpo, "b": b, "paralelo": False}).get_json()
+        assert resultado == pytest.approx(serie["resultado"], rel=1e-13)
+
+
+def test_tiempo_agotado_en_modo_paralelo(cliente, paralelo):
+    index.obtener_funcion_compilada("x^{9^{9^{9}}}", "latex")
+    # Arranca los dos trabajadores antes de medir
+    assert cliente.post("/trapecio", json={"funcion": EXPRESION, "formato": "latex", "a": 0, "b": 1,
+                                           "n": 1000, "paralelo": True}).status_code == 200
+    inicio = time.perf_counter()
+    respuesta = cliente.post("/trapecio", json={"funcion": "x^{9^{9^{9}}}", "formato": "latex", "a": 0, "b": 1,
+                                                "n": 1000, "paralelo": True, "tiempo_limite": 0.5})
+    assert respuesta.status_code == 408
+    assert time.perf_counter() - inicio < 1.5
+    assert paralelo.terminados == 2
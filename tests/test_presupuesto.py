@@ -0,0 +1,106 @@
+import pickle
+import time
+
+import pytest
+
+import index
+
+EXPRESION_COSTOSA = "x^{9^{9^{9}}}"
+
+
+def calentar_trabajador(cliente):
+    # Que el arranque de un trabajador nuevo no consuma el plazo de la prueba
+    respuesta = cliente.post("/trapecio", json={"funcion": "x", "a": 0, "b": 1, "n": 2, "tiempo_limite": 10})
+    assert respuesta.status_code == 200
+    index.cache_resultados.limpiar()
+
+
+def test_tiempo_agotado_termina_la_evaluacion(cliente):
+    # Una sola llamada vectorizada que no termina nunca (potencia de enteros enorme)
+    index.obtener_funcion_compilada(EXPRESION_COSTOSA, "latex")
+    calentar_trabajador(cliente)
+    terminados = index.trabajadores_evaluacion.terminados
+    inicio = time.perf_counter()
+    respuesta = cliente.post("/trapecio", json={"funcion": EXPRESION_COSTOSA, "formato": "latex", "a": 0, "b": 1,
+                                                "n": 10, "tiempo_limite": 0.5})
+    duracion = time.perf_counter() - inicio
+    assert respuesta.status_code == 408
+    datos = respuesta.get_json()
+    assert datos["progreso"]["tiempo_maximo"] == 0.5
+    assert duracion < 1.5
+    assert index.trabajadores_evaluacion.terminados == terminados + 1
+
+
+def test_romberg_devuelve_la_estimacion_parcial(cliente):
+    calentar_trabajador(cliente)
+    # Sin evaluación vectorizada: cada punto pasa por el nivel escalar
+    respuesta = cliente.post("/romberg", json={"funcion": "x if x > 0.5 else x**2", "a": 0, "b": 1, "tol": 1e-15,
+                                               "max_niveles": 20, "tiempo_limite": 0.3})
+    assert respuesta.status_code == 408
+    datos = respuesta.get_json()
+    assert datos["progreso"]["evaluaciones"] > 0
+    assert datos["progreso"]["segundos"] < 0.3 + 0.5
+    assert datos["parcial"]["resultado"] == pytest.approx(5 / 12, abs=1e-3)
+
+
+def test_maximo_de_evaluaciones(cliente, monkeypatch):
+    monkeypatch.setattr(index, "MAX_EVALUACIONES_PETICION", 100)
+    respuesta = cliente.post("/simpson13", json={"funcion": "x**2", "a": 0, "b": 1, "n": 1000})
+    assert respuesta.status_code == 422
+    progreso = respuesta.get_json()["progreso"]
+    # Se rechaza antes de evaluar
+    assert progreso["evaluaciones"] == 0
+    assert progreso["max_evaluaciones"] == 100
+
+
+def test_n_maximo_por_metodo(cliente, monkeypatch):
+    monkeypatch.setitem(index.LIMITES_N, "trapecio", 1000)
+    respuesta = cliente.post("/trapecio", json={"funcion": "x", "a": 0, "b": 1, "n": 1001})
+    assert respuesta.status_code == 422
+    assert respuesta.get_json()["progreso"] == {"n": 1001, "max_n": 1000}
+    assert cliente.post("/trapecio", json={"funcion": "x", "a": 0, "b": 1, "n": 1000}).status_code == 200
+
+
+@pytest.mark.parametrize("tiempo_limite", ["abc", -1, 0])
+def test_tiempo_limite_invalido(cliente, tiempo_limite):
+    respuesta = cliente.post("/trapecio", json={"funcion": "x", "a": 0, "b": 1, "tiempo_limite": tiempo_limite})
+    assert respuesta.status_code == 400
+
+
+def test_tiempo_limite_en_la_query_string(cliente):
+    respuesta = cliente.get("/trapecio?funcion=x&a=0&b=1&n=10&tiempo_limite=5")
+    assert respuesta.status_code == 200
+    assert respuesta.get_json()["resultado"] == pytest.approx(0.5)
+
+
+@pytest.mark.parametrize("aislada,cuerpo,esperada", [
+    # Por defecto solo con un tiempo_limite menor que el del servidor
+    ("", {}, False),
+    ("", {"tiempo_limite": 5}, True),
+    ("", {"tiempo_limite": 60}, False),
+    ("1", {}, True),
+    ("0", {"tiempo_limite": 5}, False),
+])
+def test_cuando_se_evalua_en_un_trabajador(cliente, monkeypatch, aislada, cuerpo, esperada):
+    monkeypatch.setattr(index, "EVALUACION_AISLADA", aislada)
+    respuesta = cliente.post("/trapecio", json={"funcion": "x**2", "a": 0, "b": 1, "n": 10, **cuerpo})
+    assert respuesta.status_code == 200
+    assert respuesta.get_json()["resultado"] == pytest.approx(0.335)
+    assert ("aislamiento" in respuesta.headers["Server-Timing"]) == esperada
+
+
+def test_sin_aislar_el_plazo_se_comprueba_entre_llamadas(cliente, monkeypatch):
+    monkeypatch.setattr(index, "EVALUACION_AISLADA", "0")
+    # Cada punto pasa por el nivel escalar, con controles del plazo entre llamadas
+    respuesta = cliente.post("/trapecio", json={"funcion": "x if x > 0.5 else x**2", "a": 0, "b": 1,
+                                                "n": 2_000_000, "tabla": "none", "tiempo_limite": 0.2})
+    assert respuesta.status_code == 408
+    assert respuesta.get_json()["progreso"]["segundos"] < 1
+
+
+def test_presupuesto_excedido_viaja_entre_procesos():
+    error = index.PresupuestoExcedido("Se superó el tiempo", 408, {"evaluaciones": 3})
+    copia = pickle.loads(pickle.dumps(error))
+    assert str(copia) == "Se superó el tiempo"
+    assert copia.estado == 408
+    assert copia.progreso == {"evaluaciones": 3}
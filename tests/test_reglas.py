@@ -0,0 +1,141 @@
+import math
+from fractions import Fraction
+
+import pytest
+
+import index
+
+FUNCIONES = [
+    ("x**3 - 2*x + 1", "python", lambda x: x ** 3 - 2 * x + 1),
+    ("sin(x) * exp(-x)", "python", lambda x: math.sin(x) * math.exp(-x)),
+    ("e^{-x^{2}}", "latex", lambda x: math.exp(-x ** 2)),
+]
+
+
+# Fórmulas de las rutas originales, punto a punto, como referencia
+def trapecio_original(f, a, b, n):
+    h = (b - a) / n
+    suma = f(a) + f(b) + sum(2 * f(a + i * h) for i in range(1, n))
+    return (h / 2) * suma, [1] + [2] * (n - 1) + [1]
+
+
+def simpson13_original(f, a, b, n):
+    if n % 2 != 0:
+        n += 1
+    h = (b - a) / n
+    coeficientes = [1] + [4 if i % 2 else 2 for i in range(1, n)] + [1]
+    suma = sum(c * f(a + i * h) for i, c in enumerate(coeficientes))
+    return (h / 3) * suma, coeficientes
+
+
+def simpson38_original(f, a, b, n):
+    if n % 3 != 0:
+        n = max((n // 3) * 3, 3)
+    h = (b - a) / n
+    coeficientes = [1] + [2 if i % 3 == 0 else 3 for i in range(1, n)] + [1]
+    suma = sum(c * f(a + i * h) for i, c in enumerate(coeficientes))
+    return (3 * h / 8) * suma, coeficientes
+
+
+def boole_original(f, a, b, n):
+    if n % 4 != 0:
+        n = max((n // 4) * 4, 4)
+    h = (b - a) / n
+    suma = 0
+    coeficientes = []
+    for j in range(0, n, 4):
+        f0, f1, f2, f3, f4 = (f(a + (j + k) * h) for k in range(5))
+        suma += (2 * h / 45) * (7 * f0 + 32 * f1 + 12 * f2 + 32 * f3 + 7 * f4)
+        coeficientes += [7, 32, 12, 32, 7]
+    return suma, coeficientes
+
+
+def simpson_abierto_original(f, a, b):
+    # La ruta original solo tenía un panel de 4 subintervalos
+    h = (b - a) / 4.0
+    return (4 * h / 3) * (2 * f(a + h) - f(a + 2 * h) + 2 * f(a + 3 * h))
+
+
+def coeficientes_tabla(tabla):
+    return [fila.get("coeficiente") for fila in tabla]
+
+
+@pytest.mark.parametrize("funcion,formato,f", FUNCIONES)
+@pytest.mark.parametrize("ruta,referencia,n,n_ajustado", [
+    ("trapecio", trapecio_original, 10, 10),
+    ("trapecio", trapecio_original, 1, 1),
+    ("simpson13", simpson13_original, 12, 12),
+    ("simpson13", simpson13_original, 7, 8),
+    ("simpson38", simpson38_original, 12, 12),
+    ("simpson38", simpson38_original, 11, 9),
+    ("boole", boole_original, 16, 16),
+    ("boole", boole_original, 10, 8),
+])
+def test_reglas_cerradas_coinciden_con_las_formulas_originales(cliente, ruta, referencia, n, n_ajustado,
+                                                               funcion, formato, f):
+    respuesta = cliente.post("/" + ruta, json={"funcion": funcion, "formato": formato, "a": 0.5, "b": 2, "n": n})
+    assert respuesta.status_code == 200
+    datos = respuesta.get_json()
+    esperado, coeficientes = referencia(f, 0.5, 2.0, n)
+    assert datos["resultado"] == pytest.approx(esperado, rel=1e-12)
+    assert datos["n"] == n_ajustado
+    assert coeficientes_tabla(datos["tabla_iteracion"]) == coeficientes
+
+
+def test_boole_segmentos_suman_el_resultado(cliente):
+    datos = cliente.post("/boole", json={"funcion": "x**4", "a": 0, "b": 2, "n": 12}).get_json()
+    assert [s["segmento"] for s in datos["segmentos"]] == [1, 2, 3]
+    assert [x for s in datos["segmentos"] for x in s["intervalo"]] == pytest.approx([0, 2 / 3, 2 / 3, 4 / 3, 4 / 3, 2])
+    assert math.fsum(s["valor"] for s in datos["segmentos"]) == pytest.approx(datos["resultado"], rel=1e-14)
+
+
+@pytest.mark.parametrize("funcion,formato,f", FUNCIONES)
+def test_simpson_abierto_coincide_con_la_formula_original(cliente, funcion, formato, f):
+    datos = cliente.post("/simpson_abierto", json={"funcion": funcion, "formato": formato, "a": 0.5, "b": 2}).get_json()
+    assert datos["resultado"] == pytest.approx(simpson_abierto_original(f, 0.5, 2.0), rel=1e-12)
+    assert [fila["i"] for fila in datos["tabla_iteracion"]] == [1, 2, 3]
+
+
+def test_simpson_abierto_compuesto_suma_los_paneles(cliente):
+    f = FUNCIONES[1][2]
+    datos = cliente.post("/simpson_abierto", json={"funcion": "sin(x) * exp(-x)", "a": 0, "b": 3, "n": 12}).get_json()
+    esperado = sum(simpson_abierto_original(f, k, k + 1) for k in range(3))
+    assert datos["resultado"] == pytest.approx(esperado, rel=1e-12)
+    # Los extremos de cada panel no se evalúan
+    assert [fila["i"] for fila in datos["tabla_iteracion"]] == [1, 2, 3, 5, 6, 7, 9, 10, 11]
+
+
+@pytest.mark.parametrize("puntos,tipo,coeficientes,factor", [
+    (2, "cerrada", [1, 1], "1/2"),
+    (3, "cerrada", [1, 4, 1], "1/3"),
+    (4, "cerrada", [1, 3, 3, 1], "3/8"),
+    (5, "cerrada", [7, 32, 12, 32, 7], "2/45"),
+    (7, "cerrada", [41, 216, 27, 272, 27, 216, 41], "1/140"),
+    (1, "abierta", [0, 1, 0], "2"),
+    (2, "abierta", [0, 1, 1, 0], "3/2"),
+    (3, "abierta", [0, 2, -1, 2, 0], "4/3"),
+])
+def test_newton_cotes_coeficientes(cliente, puntos, tipo, coeficientes, factor):
+    datos = cliente.post("/newton_cotes", json={"funcion": "x**2", "a": 0, "b": 1, "puntos": puntos,
+                                                "tipo": tipo, "tabla": "none"}).get_json()
+    assert datos["coeficientes"] == coeficientes
+    assert datos["factor"] == factor
+
+
+@pytest.mark.parametrize("intervalos,abierta", [(m, False) for m in range(1, 11)] + [(m, True) for m in range(2, 12)])
+def test_newton_cotes_integra_exactamente_los_polinomios_de_su_grado(intervalos, abierta):
+    patron, factor = index.coeficientes_newton_cotes(intervalos, abierta)
+    puntos = intervalos - 1 if abierta else intervalos + 1
+    # Con pesos exactos la regla de k puntos integra t^j en [0, m] sin error para j < k
+    for j in range(puntos):
+        integral = factor * sum(c * Fraction(t) ** j for t, c in enumerate(patron))
+        assert integral == Fraction(intervalos ** (j + 1), j + 1)
+
+
+def test_newton_cotes_coincide_con_las_rutas_clasicas(cliente):
+    cuerpo = {"funcion": "sin(x) * exp(-x)", "a": 0, "b": 3, "n": 12, "tabla": "none"}
+    for ruta, puntos, tipo in [("trapecio", 2, "cerrada"), ("simpson13", 3, "cerrada"), ("simpson38", 4, "cerrada"),
+                               ("boole", 5, "cerrada"), ("simpson_abierto", 3, "abierta")]:
+        clasica = cliente.post("/" + ruta, json=cuerpo).get_json()
+        general = cliente.post("/newton_cotes", json={**cuerpo, "puntos": puntos, "tipo": tipo}).get_json()
+        assert general["resultado"] == clasica["resultado"]
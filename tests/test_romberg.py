@@ -0,0 +1,39 @@
+import math
+
+import numpy as np
+import pytest
+
+
+def romberg(cliente, **cuerpo):
+    return cliente.post("/romberg", json={"a": 0, "b": 1, **cuerpo})
+
+
+def test_romberg_converge(cliente):
+    datos = romberg(cliente, funcion="e^{x}", formato="latex", tol=1e-12).get_json()
+    assert datos["convergio"] is True
+    assert datos["resultado"] == pytest.approx(math.e - 1, rel=1e-12)
+    assert datos["error_estimado"] <= 1e-12
+
+
+def test_romberg_reutiliza_los_puntos_de_cada_nivel(cliente):
+    datos = romberg(cliente, funcion="np.sin(x)", b=math.pi, tol=1e-300, max_niveles=6).get_json()
+    assert datos["convergio"] is False
+    niveles = datos["tabla_iteracion"]
+    assert [nivel["nuevas_evaluaciones"] for nivel in niveles] == [2, 1, 2, 4, 8, 16, 32]
+    # Solo se evalúan los 2^k + 1 puntos de la malla más fina
+    assert datos["evaluaciones"] == 2 ** 6 + 1
+    # La primera columna son los trapecios compuestos de cada nivel
+    for nivel in niveles:
+        n = nivel["n"]
+        x = np.linspace(0, math.pi, n + 1)
+        trapecio = math.pi / n * (np.sum(np.sin(x)) - (np.sin(x[0]) + np.sin(x[-1])) / 2)
+        assert nivel["trapecio"] == pytest.approx(trapecio, abs=1e-14)
+    tabla = datos["tabla_romberg"]
+    assert [len(fila) for fila in tabla] == list(range(1, 8))
+    # R(k, 1) = (4 R(k, 0) - R(k-1, 0)) / 3: Simpson
+    assert tabla[1][1] == pytest.approx((4 * tabla[1][0] - tabla[0][0]) / 3)
+
+
+@pytest.mark.parametrize("cuerpo", [{"tol": 0}, {"max_niveles": 0}, {"max_niveles": 21}])
+def test_romberg_parametros_invalidos(cliente, cuerpo):
+    assert romberg(cliente, funcion="x", **cuerpo).status_code == 400
@@ -0,0 +1,72 @@
+import json
+
+import pytest
+
+import index
+
+NDJSON = {"Accept": "application/x-ndjson"}
+
+
+def lineas_ndjson(respuesta):
+    return [json.loads(linea) for linea in respuesta.get_data(as_text=True).splitlines()]
+
+
+def filas_iguales(filas, tabla):
+    assert len(filas) == len(tabla)
+    for fila, esperada in zip(filas, tabla):
+        assert fila.keys() == esperada.keys()
+        for clave, valor in esperada.items():
+            if isinstance(valor, float):
+                assert fila[clave] == pytest.approx(valor, rel=1e-14, abs=1e-300)
+            else:
+                assert fila[clave] == valor
+
+
+@pytest.mark.parametrize("tamano_bloque", [1, 7, 8, 8192])
+@pytest.mark.parametrize("ruta,extra", [
+    ("trapecio", {"n": 30}),
+    ("simpson13", {"n": 30}),
+    ("simpson38", {"n": 33}),
+    ("boole", {"n": 36}),
+    ("simpson_abierto", {"n": 36}),
+    ("newton_cotes", {"n": 36, "puntos": 5}),
+    ("newton_cotes", {"n": 36, "puntos": 3, "tipo": "abierta"}),
+])
+def test_ndjson_coincide_con_la_respuesta_completa(cliente, monkeypatch, ruta, extra, tamano_bloque):
+    # Con bloques pequeños los paneles quedan repartidos entre varias líneas de bloque
+    monkeypatch.setattr(index, "TAMANO_BLOQUE_STREAMING", tamano_bloque)
+    cuerpo = {"funcion": "e^{-x^{2}}", "formato": "latex", "a": 0, "b": 2, **extra}
+    completa = cliente.post("/" + ruta, json=cuerpo).get_json()
+    respuesta = cliente.post("/" + ruta, json=cuerpo, headers=NDJSON)
+    assert respuesta.status_code == 200
+    assert respuesta.mimetype == "application/x-ndjson"
+
+    lineas = lineas_ndjson(respuesta)
+    encabezado, resultado = lineas[0], lineas[-1]
+    assert encabezado["tipo"] == "encabezado"
+    assert encabezado["metodo"] == completa["metodo"]
+    assert encabezado["n"] == completa["n"]
+    assert encabezado["h"] == completa["h"]
+    assert resultado["tipo"] == "resultado"
+    assert resultado["resultado"] == pytest.approx(completa["resultado"], rel=1e-13)
+    assert all(linea["tipo"] == "fila" for linea in lineas[1:-1])
+    filas_iguales([{k: v for k, v in linea.items() if k != "tipo"} for linea in lineas[1:-1]],
+                  completa["tabla_iteracion"])
+
+
+def test_ndjson_error_de_la_expresion_antes_de_empezar(cliente):
+    respuesta = cliente.post("/trapecio", json={"funcion": "y", "a": 0, "b": 1}, headers=NDJSON)
+    assert respuesta.status_code == 400
+    assert "error" in respuesta.get_json()
+
+
+def test_ndjson_error_durante_la_evaluacion(cliente, monkeypatch):
+    monkeypatch.setattr(index, "TAMANO_BLOQUE_STREAMING", 4)
+    cuerpo = {"funcion": "\\frac{1}{x - 0.75}", "formato": "latex", "a": 0, "b": 1, "n": 20}
+    respuesta = cliente.post("/trapecio", json=cuerpo, headers=NDJSON)
+    assert respuesta.status_code == 200
+    lineas = lineas_ndjson(respuesta)
+    # Los bloques anteriores al polo ya se enviaron
+    assert lineas[1]["tipo"] == "fila"
+    assert lineas[-1]["tipo"] == "error"
+    assert lineas[-1]["singulares"] == [0.75]
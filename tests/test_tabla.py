@@ -0,0 +1,76 @@
+import pytest
+
+import index
+
+CLASICOS = ["trapecio", "simpson13", "simpson38", "boole", "simpson_abierto"]
+
+
+def integrar(cliente, ruta, **cuerpo):
+    return cliente.post("/" + ruta, json={"funcion": "x**2", "a": 0, "b": 1, "n": 24, **cuerpo}).get_json()
+
+
+@pytest.mark.parametrize("ruta", CLASICOS)
+def test_none_sin_tabla(cliente, ruta):
+    datos = integrar(cliente, ruta, tabla="none")
+    assert "tabla_iteracion" not in datos
+    assert "segmentos" not in datos
+    assert datos["resultado"] == pytest.approx(integrar(cliente, ruta)["resultado"])
+
+
+@pytest.mark.parametrize("ruta", CLASICOS)
+def test_columnar_igual_a_completa(cliente, ruta):
+    completa = integrar(cliente, ruta)["tabla_iteracion"]
+    columnar = integrar(cliente, ruta, tabla="columnar")["tabla_iteracion"]
+    for clave in completa[0]:
+        assert columnar[index.NOMBRES_COLUMNARES.get(clave, clave)] == [fila[clave] for fila in completa]
+
+
+@pytest.mark.parametrize("ruta", CLASICOS)
+def test_resumen(cliente, ruta):
+    completa = integrar(cliente, ruta)["tabla_iteracion"]
+    resumen = integrar(cliente, ruta, tabla="resumen", k=3)["tabla_iteracion"]
+    assert resumen["primeras"] == completa[:3]
+    assert resumen["ultimas"] == completa[-3:]
+    assert resumen["total_filas"] == len(completa)
+    for clave, total in resumen["totales"].items():
+        assert total == pytest.approx(sum(fila[clave] for fila in completa))
+
+
+def test_resumen_sin_filas_repetidas(cliente):
+    completa = integrar(cliente, "trapecio", n=4)["tabla_iteracion"]
+    resumen = integrar(cliente, "trapecio", n=4, tabla="resumen", k=4)["tabla_iteracion"]
+    assert resumen["primeras"] + resumen["ultimas"] == completa
+
+
+@pytest.mark.parametrize("ruta", CLASICOS)
+def test_paginada(cliente, ruta):
+    completa = integrar(cliente, ruta)["tabla_iteracion"]
+    datos = integrar(cliente, ruta, tabla="paginada", offset=5, limit=4)
+    assert datos["tabla_iteracion"] == completa[5:9]
+    assert datos["paginacion"] == {"offset": 5, "limit": 4, "total_filas": len(completa)}
+    assert integrar(cliente, ruta, tabla="paginada", offset=1000)["tabla_iteracion"] == []
+
+
+@pytest.mark.parametrize("tabla,extra", [
+    ("completa", {}), ("resumen", {"k": 2}), ("columnar", {}), ("paginada", {"offset": 6, "limit": 7}),
+])
+def test_segmentos_de_boole_con_el_mismo_modo(cliente, tabla, extra):
+    segmentos = integrar(cliente, "boole")["segmentos"]
+    datos = integrar(cliente, "boole", tabla=tabla, **extra)
+    if tabla == "completa":
+        assert datos["segmentos"] == segmentos
+    elif tabla == "resumen":
+        assert datos["segmentos"]["primeras"] == segmentos[:2]
+        assert datos["segmentos"]["ultimas"] == segmentos[-2:]
+        assert datos["segmentos"]["totales"]["valor"] == pytest.approx(datos["resultado"])
+    elif tabla == "columnar":
+        assert datos["segmentos"]["valor"] == [segmento["valor"] for segmento in segmentos]
+    else:
+        # Filas 6 a 12 de la tabla (5 filas por segmento): segmentos 2 y 3
+        assert [fila["segmento"] for fila in datos["tabla_iteracion"]] == [2, 2, 2, 2, 3, 3, 3]
+        assert datos["segmentos"] == segmentos[1:3]
+
+
+def test_modo_invalido(cliente):
+    respuesta = cliente.post("/trapecio", json={"funcion": "x", "a": 0, "b": 1, "tabla": "otra"})
+    assert respuesta.status_code == 400